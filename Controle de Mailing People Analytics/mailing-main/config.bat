@@ -1,3 +1,3 @@
 python.exe -m pip install --upgrade --trusted-host pypi.org --trusted-host pypi.python.org --trusted-host files.pythonhosted.org pip
-pip install --upgrade --trusted-host pypi.org --trusted-host pypi.python.org --trusted-host files.pythonhosted.org openpyxl pandas pyinstaller pyxlsb xlrd psycopg2 sqlalchemy requests matplotlib tabulate tqdm
+pip install --upgrade --trusted-host pypi.org --trusted-host pypi.python.org --trusted-host files.pythonhosted.org openpyxl pandas pyinstaller pyxlsb xlrd psycopg2 sqlalchemy requests matplotlib tabulate tqdm pyarrow python-calamine xlsxwriter
 pause
\ No newline at end of file
@@ -0,0 +1,498 @@
+import pandas as pd
+import json
+import math
+import os
+import tempfile
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from config import config
+from normalizacao import clean_text
+from limpeza import limpa_nome
+from snapshot import carrega_snapshot
+from planilhas import le_excel, EscritorExcel, GravacaoExcel
+
+
+def le_csv_posicional(logger, path, colunas, sep=None, engine=None):
+    """
+    Lê um CSV sem cabeçalho utilizável (ex.: exportações CONFIDENCIAL do Indeed), carregando
+    apenas as colunas posicionais informadas, como texto, e pulando a linha de cabeçalho
+    durante a leitura.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        path (str): Caminho do arquivo CSV.
+        colunas (list[int]): Posições das colunas a serem lidas.
+        sep (str, opcional): Separador do arquivo.
+        engine (str, opcional): Engine do pandas ("c" ou "pyarrow"). Padrão é config["engine_csv"].
+    Returns:
+        pd.DataFrame: Colunas lidas, nomeadas pela posição original no arquivo.
+    """
+    engine = engine or config.get("engine_csv", "c")
+    posicoes = sorted(set(colunas))
+    parametros = dict(encoding="utf-8", header=None, skiprows=1, sep=sep,
+                      usecols=posicoes, dtype=str)
+    if engine == "pyarrow":
+        try:
+            df = pd.read_csv(path, engine="pyarrow", **parametros)
+        except (ImportError, ValueError) as e:
+            logger.debug(
+                f"Leitura de '{path}' com pyarrow indisponível ({e}). Usando engine C.")
+            df = pd.read_csv(path, engine="c", **parametros)
+    else:
+        df = pd.read_csv(path, engine=engine, **parametros)
+    # O pyarrow renumera as colunas lidas; mantém as posições originais como nome
+    df.columns = posicoes
+    return df
+
+
+def le_entrada(logger, folder, sheet_name, sheet_info, layouts, usar_cache=True):
+    """
+    Lê um arquivo de entrada e renomeia as colunas de acordo com o layout.
+    O tipo do arquivo é determinado pelo final do nome do arquivo.
+    Args:
+        logger: Instância do logger para registrar logs.
+        folder (str): Pasta dos arquivos de entrada.
+        sheet_name (str): Nome da entrada na configuração.
+        sheet_info (dict): Informações do arquivo (path, sheet, layout, sep, fonte_padrao).
+        layouts (dict): Mapeamento de layouts para renomear colunas.
+        usar_cache (bool): Se True, reaproveita o snapshot do arquivo quando ele não mudou.
+    Returns:
+        Optional[pd.DataFrame]: Dados do arquivo ou None se o arquivo não puder ser lido.
+    """
+    inicio = time.perf_counter()
+    path = folder + '/' + sheet_info.get("path")
+    logger.debug(f"Path definido para {path}")
+    aba = sheet_info.get("sheet")  # Apenas relevante para Excel
+    layout_name = sheet_info.get("layout")
+    # Valor padrão para a coluna "Fonte"
+    fonte_padrao = sheet_info.get("fonte_padrao")
+    layout = layouts.get(layout_name)
+    if not path or not layout_name:
+        logger.warning(
+            f"Informações incompletas para a aba {sheet_name}. Pulando...")
+        return None
+    if not layout:
+        logger.warning(
+            f"Layout {layout_name} não encontrado. Pulando aba {sheet_name}...")
+        return None
+    # Determinar o tipo do arquivo pelo final do nome do arquivo
+    if path.endswith(".xlsx") or path.endswith(".xls"):
+        file_type = "excel"
+    elif path.endswith(".csv"):
+        file_type = "csv"
+    else:
+        logger.warning(
+            f"Tipo de arquivo não suportado para {path}. Pulando {sheet_name}...")
+        return None
+    logger.debug(
+        f"Lendo o arquivo {path} do tipo {file_type} com layout {layout_name}")
+    if file_type == "excel" and not aba:
+        logger.warning(
+            f"Aba não especificada para o arquivo Excel {path}. Pulando...")
+        return None
+
+    def ler():
+        if file_type == "excel":
+            df = le_excel(logger, path, sheet_name=aba)
+        elif 'CONFIDENCIAL' in path:
+            # Layout posicional: apenas as colunas do layout, como texto
+            df = le_csv_posicional(
+                logger, path, list(layout.values()), sheet_info.get('sep'))
+        else:
+            df = pd.read_csv(path, encoding="utf-8",
+                             sep=sheet_info.get('sep'))
+        logger.debug(
+            f"LEITURA REALIZADA: Arquivo '{sheet_name}' em '{path}': {df.shape[0]} linhas e {df.shape[1]} colunas")
+        # Renomear colunas e filtrar
+        df = df[layout.values()]
+        return df.rename(columns={v: k for k, v in layout.items()})
+
+    try:
+        if usar_cache:
+            # O cache guarda o resultado já filtrado e renomeado pelo layout
+            df = carrega_snapshot(
+                logger, path, ler,
+                chave=f"{aba}|{sheet_info.get('sep')}|{json.dumps(layout)}")
+        else:
+            df = ler()
+        logger.info(
+            f"LEITURA REALIZADA - '{sheet_name}': {df.shape[0]} LEADS ({time.perf_counter() - inicio:.2f}s)")
+        # Definir a coluna "Fonte" com o valor padrão, se especificado
+        if fonte_padrao:
+            logger.debug(
+                f"Definindo a coluna 'Fonte' com o valor padrão '{fonte_padrao}' para a aba {sheet_name}")
+            df["Fonte"] = fonte_padrao
+        return df
+    except FileNotFoundError:
+        logger.debug(
+            f"LEITURA NÃO REALIZADA: Arquivo '{sheet_name}' em  '{path}' não encontrado")
+    except KeyError as e:
+        logger.error(f"Erro ao processar colunas do arquivo {path}: {e}")
+    except Exception as e:
+        logger.error(f"Erro inesperado ao processar o arquivo {path}: {e}")
+    return None
+
+
+def get_all_sheets(logger, folder, sheets, layouts, workers=None, usar_cache=True):
+    """
+    Lê todas as abas especificadas no JSON, renomeia as colunas de acordo com o layout
+    e combina os dados em um único DataFrame. Os arquivos são lidos em paralelo em um pool
+    de threads e concatenados uma única vez, na ordem da configuração.
+    Args:
+        logger: Instância do logger para registrar logs.
+        sheets (dict): Informações sobre as planilhas e abas a serem lidas.
+        layouts (dict): Mapeamento de layouts para renomear colunas.
+        workers (int, opcional): Quantidade de leituras simultâneas. Padrão é config["workers_leitura"].
+        usar_cache (bool): Se False, ignora os snapshots e lê todos os arquivos novamente.
+    Returns:
+        pd.DataFrame: DataFrame combinado contendo os dados de todas as abas especificadas.
+    """
+    inicio = time.perf_counter()
+    workers = workers or config["workers_leitura"]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        resultados = list(executor.map(
+            lambda item: le_entrada(
+                logger, folder, item[0], item[1], layouts, usar_cache),
+            sheets.items()))
+    frames = [df for df in resultados if df is not None and len(df) > 0]
+    if len(frames) == 0:
+        combined_df = pd.DataFrame()
+    elif len(frames) == 1:
+        combined_df = frames[0]
+    else:
+        combined_df = pd.concat(frames, ignore_index=True)
+    logger.info(
+        f"Leitura de {len(frames)} arquivos concluída em {time.perf_counter() - inicio:.2f}s")
+    logger.debug(
+        f"Processamento concluído. DataFrame final contém {combined_df.shape[0]} linhas e {combined_df.shape[1]} colunas")
+    return combined_df
+
+
+def substitui_arquivo(logger, temporario, destino):
+    """
+    Move um arquivo temporário para o destino, substituindo-o de forma atômica.
+    Caso o destino esteja aberto, solicita ao usuário que feche o arquivo e tente novamente.
+    Args:
+        logger (logging.Logger): Logger para registrar informações.
+        temporario (str): Caminho do arquivo gravado.
+        destino (str): Caminho final do arquivo.
+    """
+    while True:
+        try:
+            os.replace(temporario, destino)
+            break
+        except PermissionError:
+            logger.error(
+                f"Falha ao salvar o arquivo {destino}. Verifique se o arquivo está aberto e feche-o.")
+            input("Erro: Não foi possível salvar o arquivo. Certifique-se de que o arquivo está fechado e pressione ENTER para tentar novamente.")
+
+
+def overwrite_excel(logger, df, output_file, sheet_name='Mailing', em_segundo_plano=False):
+    """
+    Sobrescreve um arquivo Excel com um novo DataFrame. O arquivo é gravado linha a linha em um
+    temporário e só então substitui o destino; caso o destino esteja aberto, solicita ao usuário
+    que feche o arquivo e tente novamente.
+    Args:
+        logger (logging.Logger): Logger para registrar informações.
+        df (pd.DataFrame): DataFrame a ser salvo.
+        output_file (str): Caminho do arquivo Excel de saída.
+        sheet_name (str): Nome da aba a ser sobrescrita.
+        em_segundo_plano (bool): Se True, grava em uma thread e retorna imediatamente.
+    Returns:
+        Optional[GravacaoExcel]: Gravação em andamento (se em segundo plano). Chame
+            `aguarda_gravacao` para concluir a substituição do arquivo.
+    """
+    logger.debug(f"Escrevendo o DataFrame no arquivo {output_file}")
+    gravacao = GravacaoExcel(logger, df, output_file, sheet_name)
+    gravacao.start()
+    if em_segundo_plano:
+        return gravacao
+    aguarda_gravacao(logger, gravacao)
+    return None
+
+
+def aguarda_gravacao(logger, gravacao):
+    """
+    Aguarda uma gravação de Excel em segundo plano e substitui o arquivo de destino.
+    Args:
+        logger (logging.Logger): Logger para registrar informações.
+        gravacao (GravacaoExcel): Gravação iniciada por `overwrite_excel`.
+    Returns:
+        float: Duração da gravação, em segundos.
+    """
+    duracao = gravacao.aguarda(
+        lambda temporario, destino: substitui_arquivo(logger, temporario, destino))
+    logger.debug(f"DataFrame salvo com sucesso na aba {gravacao.aba}")
+    return duracao
+
+
+class GravacaoExcelEmBlocos:
+    """
+    Grava o Mailing.xlsx a partir de blocos de leads (processamento em blocos), em um arquivo
+    temporário na mesma pasta do destino, que só substitui o destino em `conclui`.
+    """
+
+    def __init__(self, logger, output_file, sheet_name='Mailing'):
+        self.logger = logger
+        self.destino = output_file
+        descritor, self.temporario = tempfile.mkstemp(
+            prefix="~gravando_", suffix=".xlsx", dir=os.path.dirname(os.path.abspath(output_file)))
+        os.close(descritor)
+        self.escritor = EscritorExcel(logger, self.temporario, sheet_name)
+        self.inicio = time.perf_counter()
+
+    def acrescenta(self, df):
+        self.escritor.acrescenta(df)
+
+    def conclui(self):
+        """
+        Fecha o arquivo e substitui o destino.
+        Returns:
+            float: Duração total da gravação, em segundos.
+        """
+        try:
+            self.escritor.fecha()
+            substitui_arquivo(self.logger, self.temporario, self.destino)
+        finally:
+            self.cancela()
+        return time.perf_counter() - self.inicio
+
+    def cancela(self):
+        if os.path.exists(self.temporario):
+            os.remove(self.temporario)
+
+
+def determine_planilha(linha, quebra_fonte):
+    """
+    Determina o nome da planilha com base nas informações normalizadas de cidade e fonte.
+    Args:
+        linha (dict): Uma linha de um dataframe contendo as chaves 'Cidade_Normalizada' e 'Fonte_Normalizada'.
+        quebra_fonte (list): Uma lista de substrings para comparar com a fonte normalizada (definido nas configurações).
+    Returns:
+        str: Uma string representando o nome da planilha no formato "{planilha}_{cidade}".
+             O `planilha` é determinado ao comparar substrings em `quebra_fonte` com a fonte 
+             normalizada, e `cidade` é definido como "URA" ou "UDIA" com base na cidade normalizada.
+    """
+    cidade = linha['Cidade_Normalizada'].upper()
+    fonte = linha['Fonte_Normalizada']
+    planilha = 'DEMAIS'
+    for subfonte in quebra_fonte:
+        if subfonte.lower() in fonte:
+            planilha = subfonte
+    return f"{planilha}_{cidade}"
+
+
+def decide_planilha(logger, df, quebra_fonte, fonte_col='Fonte Limpa'):
+    """
+    Define a coluna "Planilha" no DataFrame com base em regras específicas.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): DataFrame contendo os dados.
+        sala_aberta (Optional[bool]): Indica se o evento Sala Aberta está ativo.
+        fonte_col (str): Nome da coluna que contém as fontes. Padrão é "Fonte".
+    Returns:
+        pd.DataFrame: DataFrame atualizado com a coluna "Planilha".
+    """
+    logger.debug("Iniciando a definição da coluna 'Planilha'.")
+    # Normalizar as colunas para comparação
+    df["Cidade_Normalizada"] = df["Cidade"].apply(
+        lambda x: clean_text(x) if isinstance(x, str) else "")
+    df["Fonte_Normalizada"] = df[fonte_col].apply(
+        lambda x: clean_text(x) if isinstance(x, str) else "")
+    df["Planilha"] = df.apply(
+        lambda x: determine_planilha(x, quebra_fonte), axis=1)
+    # Remover colunas normalizadas auxiliares
+    df.drop(columns=["Cidade_Normalizada", "Fonte_Normalizada"], inplace=True)
+    logger.debug("Coluna 'Planilha' definida com sucesso.")
+    return df
+
+
+def formata_mailing(logger, mailing):
+    """
+    Seleciona e formata as colunas do mailing de importação na Central.
+    Args:
+        logger: Instância do logger para registrar logs.
+        mailing (pd.DataFrame): Leads recomendados, com a coluna 'Planilha'.
+    Returns:
+        pd.DataFrame: Colunas do arquivo de importação e a coluna 'Planilha'.
+    """
+    logger.debug("Selecionando colunas")
+    mailing = mailing[["Nome Limpo", "CPF Limpo", "Telefone Limpo", "Telefone 2 Limpo",
+                       "Fonte Limpa", "Modalidade da Entrevista", "Cidade", "Planilha"]]
+    mailing.columns = ["NOME", "NUM_CPF", "NUM_TEL_1", "NUM_TEL_2",
+                       "OR_FK_FONTE_ROTULO", "MODALIDADE_ENTREVISTA", "CIDADE", "Planilha"]
+    mailing["NUM_CPF"] = mailing["NUM_CPF"].map(
+        lambda cpf: "" if pd.isna(cpf) else f"{int(cpf):011d}")
+    mailing["NUM_TEL_1"] = mailing["NUM_TEL_1"].map(
+        lambda cpf: "" if pd.isna(cpf) else f"{int(cpf)}")
+    mailing["NUM_TEL_2"] = mailing["NUM_TEL_2"].map(
+        lambda cpf: "" if pd.isna(cpf) else f"{int(cpf)}")
+    for col in ['NOME', 'CIDADE']:
+        mailing[col] = mailing[col].map(lambda x: limpa_nome(logger, x))
+    return mailing
+
+
+def divide_planilhas(logger, mailing, central_path, prefixo, arquivos_por_planilha=None):
+    """
+    Divide o mailing em várias planilhas com base na coluna 'Planilha'.
+    Cada planilha será limitada a um arquivo de 100 partes, sendo subdividido se necessário.
+    Args:
+        logger: Instância do logger para registrar logs.
+        mailing (pd.DataFrame): DataFrame do mailing.
+        central_path: Caminho de salvamento das planilhas.
+        prefixo: Prefixo para o nome dos arquivos gerados.
+        arquivos_por_planilha (int, opcional): Arquivos gerados por planilha. Se None, pergunta ao usuário.
+    Returns:
+        list: Lista de DataFrames correspondentes às planilhas geradas.
+    """
+    logger.debug("Iniciando gravação das planilhas")
+    mailing = formata_mailing(logger, mailing)
+    salva_csv_por_planilha(logger, mailing, central_path, prefixo,
+                           arquivos_por_planilha=arquivos_por_planilha)
+
+
+def tamanho_partes(logger, planilha, total_linhas, max_linhas=100, arquivos_por_planilha=None):
+    """
+    Define em quantos arquivos a planilha é dividida (perguntando ao usuário, se não informado)
+    e quantas linhas vão em cada arquivo, respeitando o limite de `max_linhas` por arquivo.
+    Returns:
+        int: Quantidade máxima de linhas por arquivo.
+    """
+    # Pergunta ao usuário
+    qtd_arquivos = arquivos_por_planilha
+    while qtd_arquivos is None:
+        try:
+            qtd_arquivos = int(input(
+                f"Planilha '{planilha}' possui {total_linhas} linhas.\n"
+                f"Em quantos arquivos deseja dividir? "
+            ))
+            if qtd_arquivos <= 0:
+                raise ValueError
+        except ValueError:
+            qtd_arquivos = None
+            print("Digite um número inteiro válido maior que zero.")
+
+    # Calcula tamanho ideal
+    tamanho_chunk = math.ceil(total_linhas / qtd_arquivos)
+
+    # Aplica limite máximo
+    if tamanho_chunk > max_linhas:
+        logger.warning(
+            f"Tamanho calculado ({tamanho_chunk}) excede o limite de "
+            f"{max_linhas}. Ajustando automaticamente."
+        )
+        tamanho_chunk = max_linhas
+        qtd_arquivos = math.ceil(total_linhas / tamanho_chunk)
+
+    logger.info(
+        f"Gerando {qtd_arquivos} arquivos para '{planilha}' "
+        f"com até {tamanho_chunk} linhas cada."
+    )
+    return tamanho_chunk
+
+
+def salva_csv_por_planilha(
+    logger,
+    df,
+    out_path,
+    file_name,
+    max_linhas=100,
+    arquivos_por_planilha=None
+):
+    """
+    Divide os CSVs por Planilha (cidade/fonte) permitindo definir
+    quantos arquivos IGUAIS serão gerados por cidade,
+    respeitando o limite máximo de 100 linhas por arquivo.
+    Se `arquivos_por_planilha` for informado, a quantidade não é perguntada ao usuário.
+    """
+
+    logger.debug("Iniciando divisão customizada por cidade/planilha")
+
+    for planilha in sorted(df["Planilha"].unique()):
+        sub_df = df[df["Planilha"] == planilha].drop(columns=["Planilha"])
+        total_linhas = len(sub_df)
+
+        if total_linhas == 0:
+            continue
+
+        tamanho_chunk = tamanho_partes(
+            logger, planilha, total_linhas, max_linhas, arquivos_por_planilha)
+        partes = (sub_df.iloc[inicio:inicio + tamanho_chunk]
+                  for inicio in range(0, total_linhas, tamanho_chunk))
+        salva_partes(logger, partes, out_path, file_name, planilha)
+
+
+def salva_partes(logger, partes, out_path, file_name, planilha):
+    # Grava cada parte da planilha em um arquivo de importação numerado
+    for i, chunk in enumerate(partes):
+        file_path = (
+            f"{out_path}/"
+            f"{file_name}_{planilha}_parte_{i + 1}.csv"
+        )
+
+        logger.debug(f"Salvando arquivo: {file_path}")
+        chunk.to_csv(file_path, index=False, sep=";")
+
+
+class DivisaoPlanilhasEmBlocos:
+    """
+    Equivalente a `divide_planilhas` para o processamento em blocos: os leads recomendados de
+    cada bloco são formatados e acrescentados a um arquivo auxiliar por planilha (apenas as
+    colunas de importação) e, em `conclui`, cada planilha é dividida nos arquivos de importação
+    lendo o arquivo auxiliar em partes, sem carregar o mailing inteiro.
+    """
+
+    def __init__(self, logger, central_path, prefixo, arquivos_por_planilha=None, max_linhas=100):
+        self.logger = logger
+        self.central_path = central_path
+        self.prefixo = prefixo
+        self.arquivos_por_planilha = arquivos_por_planilha
+        self.max_linhas = max_linhas
+        self.pasta = tempfile.TemporaryDirectory(prefix="mailing_planilhas_")
+        self.arquivos = {}
+        self.linhas = {}
+
+    def acrescenta(self, mailing):
+        mailing = formata_mailing(self.logger, mailing)
+        for planilha, sub_df in mailing.groupby("Planilha", sort=False):
+            if planilha not in self.arquivos:
+                self.arquivos[planilha] = os.path.join(self.pasta.name, f"{len(self.arquivos)}.csv")
+                self.linhas[planilha] = 0
+            sub_df.drop(columns=["Planilha"]).to_csv(
+                self.arquivos[planilha], index=False, sep=";", mode="a",
+                header=self.linhas[planilha] == 0)
+            self.linhas[planilha] += len(sub_df)
+
+    def conclui(self):
+        try:
+            for planilha in sorted(self.arquivos):
+                tamanho_chunk = tamanho_partes(
+                    self.logger, planilha, self.linhas[planilha], self.max_linhas,
+                    self.arquivos_por_planilha)
+                with pd.read_csv(self.arquivos[planilha], sep=";", dtype=str, keep_default_na=False,
+                                 chunksize=tamanho_chunk) as partes:
+                    salva_partes(self.logger, partes, self.central_path, self.prefixo, planilha)
+        finally:
+            self.cancela()
+
+    def cancela(self):
+        self.pasta.cleanup()
+
+
+def confirma_salva_db():
+    resposta = input(
+        "Deseja salvar esta planilha no banco de dados? (s/n): ").strip().lower()
+    return resposta == 's'
+
+
+def salva_db(logger, df, prefixo, salvar=None):
+    # `salvar` informado dispensa a pergunta ao usuário (ex.: benchmark)
+    if confirma_salva_db() if salvar is None else salvar:
+        # Importado apenas aqui: o SQLAlchemy só é carregado quando os leads vão para o banco
+        from database import sincroniza_execucao
+
+        # Substitui a execução com o mesmo prefixo, se já tiver sido gravada
+        sincroniza_execucao(logger, df, prefixo)
+        logger.info("Dados inseridos no banco com sucesso!")
+    else:
+        logger.info("Salvamento no banco cancelado.")
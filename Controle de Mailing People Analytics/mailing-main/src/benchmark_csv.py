@@ -0,0 +1,121 @@
+import argparse
+import importlib.util
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from config import config
+from arquivos import le_csv_posicional
+
+
+def gera_csv_indeed(caminho, linhas, seed=0):
+    """
+    Gera uma exportação sintética do Indeed (CSV com cabeçalho descartado e colunas posicionais).
+    Args:
+        caminho (str): Caminho do arquivo a ser gerado.
+        linhas (int): Quantidade de candidatos.
+        seed (int): Semente do gerador aleatório.
+    """
+    rng = np.random.default_rng(seed)
+    cidades = np.array(["Uberlândia - MG", "Jundiaí - SP", "Barueri - SP",
+                        "Aracaju - SE", "Hortolândia - SP"])
+    escolaridades = np.array(["Ensino Médio", "Ensino Superior", "Técnico"])
+    ids = np.arange(linhas).astype(str)
+    df = pd.DataFrame({
+        "nome": np.char.add("Candidato ", ids),
+        "email": np.char.add(np.char.add("candidato", ids), "@email.com"),
+        "telefone": np.char.add("+55 34 9", rng.integers(10000000, 99999999, linhas).astype(str)),
+        "status": "Novo",
+        "localizacao": cidades[rng.integers(0, len(cidades), linhas)],
+        "experiencia": "Atendente de telemarketing - 1 ano",
+        "escolaridade": escolaridades[rng.integers(0, len(escolaridades), linhas)],
+        "cargo": "Atendente de Telemarketing",
+        "vaga": cidades[rng.integers(0, len(cidades), linhas)],
+        "data": "2025-01-15",
+        "fonte": "Indeed",
+        "perguntas": "Sim; Não; Sim",
+        "observacoes": "",
+        "curriculo": "https://indeed.com/r/abcdef",
+    })
+    df.to_csv(caminho, index=False)
+
+
+def leitura_atual(caminho, colunas):
+    # Caminho anterior: todas as colunas, tipos inferidos e cabeçalho removido depois
+    df = pd.read_csv(caminho, encoding="utf-8", header=None, sep=",")
+    return df.iloc[1:][colunas]
+
+
+def _executa(nome, caminho, colunas, fila):
+    # Executado em um processo separado, para que o pico de memória seja só desta leitura
+    logger = logging.getLogger("benchmark")
+    leituras = {
+        "atual": lambda: leitura_atual(caminho, colunas),
+        "projetada (c)": lambda: le_csv_posicional(logger, caminho, colunas, ",", "c"),
+        "projetada (pyarrow)": lambda: le_csv_posicional(logger, caminho, colunas, ",", "pyarrow"),
+    }
+    if resource is None:
+        tracemalloc.start()
+    else:
+        base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    df = leituras[nome]()
+    tempo = time.perf_counter() - inicio
+    if resource is None:
+        # Sem o módulo resource (Windows): alocações do Python/NumPy + pool do Arrow
+        pico = tracemalloc.get_traced_memory()[1]
+        try:
+            import pyarrow
+            pico += pyarrow.default_memory_pool().max_memory()
+        except ImportError:
+            pass
+    else:
+        # ru_maxrss é em KiB no Linux
+        pico = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) * 1024
+    fila.put((tempo, pico, df.shape[0]))
+
+
+def mede(nome, caminho, colunas):
+    fila = multiprocessing.Queue()
+    processo = multiprocessing.Process(
+        target=_executa, args=(nome, caminho, colunas, fila))
+    processo.start()
+    resultado = fila.get()
+    processo.join()
+    tempo, pico, linhas = resultado
+    print(f"{nome:<22} {tempo:>8.2f}s {pico / 2**20:>10.1f} MiB {linhas:>10} linhas")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara a leitura atual dos CSVs do Indeed com a leitura projetada e tipada")
+    parser.add_argument("--linhas", type=int, default=500_000)
+    args = parser.parse_args()
+
+    colunas = list(config["layouts"]["indeed"].values())
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "CONFIDENCIAL_benchmark_candidatos.csv")
+        gera_csv_indeed(caminho, args.linhas)
+        print(f"Arquivo sintético: {args.linhas} linhas, {os.path.getsize(caminho) / 2**20:.1f} MiB")
+        print(f"{'leitura':<22} {'tempo':>9} {'pico':>14}")
+        mede("atual", caminho, colunas)
+        mede("projetada (c)", caminho, colunas)
+        if importlib.util.find_spec("pyarrow") is not None:
+            mede("projetada (pyarrow)", caminho, colunas)
+        else:
+            print("pyarrow não instalado - leitura com pyarrow não medida.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import importlib.util
+import logging
+import os
+import tempfile
+import time
+
+from datetime import datetime, timedelta
+from openpyxl import Workbook
+
+from planilhas import itera_linhas, le_excel
+
+
+def gera_planilha(caminho, linhas, aba="Mailing"):
+    """
+    Gera uma planilha sintética de leads com tipos variados (texto, número e data).
+    Args:
+        caminho (str): Caminho do arquivo .xlsx a ser gerado.
+        linhas (int): Quantidade de linhas de dados.
+        aba (str): Nome da aba.
+    """
+    workbook = Workbook(write_only=True)
+    planilha = workbook.create_sheet(aba)
+    planilha.append(["DATA", "NOME", "CPF", "TELEFONE",
+                    "TELEFONE 2", "FONTE", "REGIÃO"])
+    inicio = datetime(2025, 1, 1)
+    for i in range(linhas):
+        planilha.append([
+            inicio + timedelta(minutes=i), f"Candidato {i}", f"{i:011d}",
+            34990000000 + i, None, "Facebook MD", "Uberlândia",
+        ])
+    workbook.save(caminho)
+
+
+def mede(funcao):
+    inicio = time.perf_counter()
+    quantidade = funcao()
+    return time.perf_counter() - inicio, quantidade
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara as engines de leitura de Excel em planilhas de tamanho crescente")
+    parser.add_argument("--linhas", type=int, nargs="+",
+                        default=[10_000, 50_000, 200_000])
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("python_calamine") is None:
+        # Sem o calamine, le_excel recorreria ao openpyxl e a comparação não faria sentido
+        print("python-calamine não instalado - instale para comparar as engines.")
+        return
+    logger = logging.getLogger("benchmark")
+    engines = ["openpyxl", "calamine"]
+    print(f"{'linhas':>8} {'leitura':<14} " +
+          " ".join(f"{e:>10}" for e in engines) + f" {'ganho':>8}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for linhas in args.linhas:
+            caminho = os.path.join(pasta, f"mailing_{linhas}.xlsx")
+            gera_planilha(caminho, linhas)
+            leituras = {
+                "read_excel": lambda engine: len(
+                    le_excel(logger, caminho, engine=engine, sheet_name="Mailing")),
+                "linha a linha": lambda engine: sum(
+                    1 for _ in itera_linhas(logger, caminho, "Mailing", 2, engine=engine)),
+            }
+            for nome, leitura in leituras.items():
+                tempos = []
+                for engine in engines:
+                    tempo, quantidade = mede(lambda: leitura(engine))
+                    assert quantidade == linhas
+                    tempos.append(tempo)
+                print(f"{linhas:>8} {nome:<14} " +
+                      " ".join(f"{t:>9.2f}s" for t in tempos) +
+                      f" {tempos[0] / tempos[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import subprocess
+import sys
+
+from config import config
+
+
+# Bibliotecas pesadas que só devem ser importadas quando usadas (relatórios, banco e geocodificação)
+PESADAS = ["matplotlib", "sqlalchemy", "requests", "tabulate"]
+
+# Módulos medidos: o script principal e os módulos de limpeza usados isoladamente
+MODULOS = ["clean", "limpeza", "descartes", "arquivos", "utils"]
+
+
+def mede_importacao(modulo):
+    """
+    Importa o módulo em um interpretador novo com `-X importtime` e lê o tempo acumulado
+    de cada módulo carregado.
+    Args:
+        modulo (str): Módulo importado (a partir da pasta src).
+    Returns:
+        dict[str, int]: Tempo acumulado (em microssegundos) de cada módulo importado.
+    """
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=pasta, capture_output=True, text=True, check=True)
+    tempos = {}
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        tempos[nome.strip()] = int(acumulado)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo de importação dos módulos do pipeline")
+    parser.add_argument("modulos", nargs="*", default=MODULOS)
+    parser.add_argument("--top", type=int, default=5,
+                        help="Quantidade de módulos mais lentos exibidos por importação")
+    parser.add_argument("--verifica", action="store_true",
+                        help="Falha (código 1) se algum módulo medido carregar uma biblioteca pesada "
+                             "ou passar do orçamento de tempo de importação")
+    parser.add_argument("--orcamento-ms", type=float, default=config.get("orcamento_importacao_ms", 800),
+                        help="Tempo máximo de importação de cada módulo, em ms (padrão: config)")
+    args = parser.parse_args()
+
+    falhas = []
+    for modulo in args.modulos:
+        tempos = mede_importacao(modulo)
+        pesadas = [p for p in PESADAS if p in tempos]
+        print(f"{modulo:<12} {tempos.get(modulo, 0) / 1000:>8.1f} ms  "
+              f"({len(tempos)} módulos, pesadas: {', '.join(pesadas) or 'nenhuma'})")
+        topo = sorted(((t, n) for n, t in tempos.items() if n != modulo and "." not in n),
+                      reverse=True)[:args.top]
+        for tempo, nome in topo:
+            print(f"    {nome:<24} {tempo / 1000:>8.1f} ms")
+        if pesadas:
+            falhas.append(f"{modulo} (importa {', '.join(pesadas)})")
+        if tempos.get(modulo, 0) / 1000 > args.orcamento_ms:
+            falhas.append(f"{modulo} (acima de {args.orcamento_ms:.0f} ms)")
+    if args.verifica and falhas:
+        print(f"Inicialização fora do esperado: {', '.join(falhas)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
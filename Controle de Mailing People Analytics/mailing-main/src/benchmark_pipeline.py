@@ -0,0 +1,164 @@
+import argparse
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import tempfile
+import time
+
+from datetime import datetime
+
+import pandas as pd
+
+from config import config
+from metricas import Etapas
+from sinteticos import gera_entradas
+
+
+def configura_pastas(pasta):
+    # Saídas, caches e banco em uma pasta temporária: o benchmark não altera os arquivos reais
+    for chave in ["output_path", "central_path", "report_path"]:
+        config[chave] = os.path.join(pasta, chave)
+        os.makedirs(config[chave], exist_ok=True)
+    config["snapshot_path"] = os.path.join(pasta, "cache", "snapshots")
+    config["indice_historico_path"] = os.path.join(pasta, "cache", "historico.sqlite")
+    config["vistos"]["path"] = os.path.join(pasta, "cache", "vistos.sqlite")
+    config["relatorios"]["cache_path"] = os.path.join(pasta, "cache", "relatorios.json")
+    config["dataset"]["path"] = os.path.join(pasta, "Dataset")
+    config["banco"]["url"] = "sqlite:///" + os.path.join(pasta, "banco.sqlite")
+    config["metricas_path"] = os.path.join(pasta, "metricas.jsonl")
+
+
+def executa_pipeline(logger, etapas, sheets, execucao, referencia, modo="completo", tamanho_bloco=None):
+    """
+    Executa as etapas de clean.main (pipeline.executa_completo ou pipeline.executa_em_blocos)
+    sem interação com o usuário: o banco é um SQLite temporário e cada planilha da Central gera
+    um arquivo. As medições ficam em `etapas` (metricas.Etapas).
+    """
+    from pipeline import executa_completo, executa_em_blocos
+
+    prefixo = f"/{referencia:%Y_%m_%d}_{execucao}_"
+    salvar_db = importlib.util.find_spec("sqlalchemy") is not None
+    if not salvar_db:
+        logger.warning("SQLAlchemy não instalado - etapa salva_db não medida.")
+    parametros = dict(usar_cache=False, sheets=sheets, referencia=referencia,
+                      salvar_db=salvar_db, arquivos_por_planilha=1)
+    if modo == "blocos":
+        executa_em_blocos(logger, etapas, execucao, prefixo, prefixo.strip("/_"), tamanho_bloco, **parametros)
+    else:
+        executa_completo(logger, etapas, execucao, prefixo, prefixo.strip("/_"), **parametros)
+
+
+def _executa(linhas, seed, pasta, fila, modo, tamanho_bloco):
+    # Executado em um processo separado, para que memória e caches não passem de um tamanho para outro
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger = logging.getLogger("benchmark")
+    referencia = datetime.now().replace(microsecond=0)
+    configura_pastas(pasta)
+    config["input_path"] = os.path.join(pasta, "Input")
+    inicio = time.perf_counter()
+    sheets = gera_entradas(logger, config["input_path"], linhas, seed, referencia)
+    geracao = time.perf_counter() - inicio
+    etapas = Etapas(logger, linhas=linhas, modo=modo)
+    executa_pipeline(logger, etapas, sheets, "benchmark", referencia, modo, tamanho_bloco)
+    from limpeza import estatisticas_limpeza
+    fila.put({"linhas": linhas, "modo": modo, "tamanho_bloco": tamanho_bloco,
+              "geracao_segundos": round(geracao, 2), "etapas": etapas.etapas,
+              "limpeza": estatisticas_limpeza()})
+
+
+def mede(linhas, seed, pasta=None, modo="completo", tamanho_bloco=None):
+    with tempfile.TemporaryDirectory() as temporaria:
+        fila = multiprocessing.Queue()
+        processo = multiprocessing.Process(
+            target=_executa, args=(linhas, seed, pasta or temporaria, fila, modo, tamanho_bloco))
+        processo.start()
+        resultado = fila.get()
+        processo.join()
+    return resultado
+
+
+def imprime(resultado, anterior=None):
+    """
+    Imprime a tabela de etapas de um tamanho e, se houver, a razão em relação ao resultado anterior.
+    """
+    tempos_anteriores = {e["etapa"]: e["segundos"] for e in (anterior or {}).get("etapas", [])}
+    modo = resultado.get("modo", "completo")
+    print(f"\n{resultado['linhas']} leads, modo {modo} (geração das entradas: {resultado['geracao_segundos']:.1f}s)")
+    print(f"{'etapa':<28} {'tempo':>9} {'CPU':>9} {'pico RSS':>12} {'delta':>11} {'entrada':>9} {'saída':>9}"
+          + (f" {'anterior':>9} {'razão':>7}" if anterior else ""))
+    for etapa in resultado["etapas"] + [{
+            "etapa": "total", "segundos": sum(e["segundos"] for e in resultado["etapas"]),
+            "cpu_segundos": sum(e.get("cpu_segundos", 0) for e in resultado["etapas"]),
+            "pico_rss_mib": max((e["pico_rss_mib"] for e in resultado["etapas"]
+                                 if e.get("pico_rss_mib") is not None), default=None)}]:
+        pico = etapa.get("pico_rss_mib")
+        delta = etapa.get("delta_rss_mib")
+        cpu = etapa.get("cpu_segundos")
+        nome = etapa["etapa"] + (f" (x{etapa['chamadas']})" if etapa.get("chamadas", 1) > 1 else "")
+        linha = (f"{nome:<28} {etapa['segundos']:>8.2f}s "
+                 f"{'-' if cpu is None else f'{cpu:.2f}s':>9} "
+                 f"{'-' if pico is None else f'{pico:.0f} MiB':>12} "
+                 f"{'-' if delta is None else f'{delta:+.0f} MiB':>11} "
+                 f"{etapa.get('linhas_entrada') or '':>9} {etapa.get('linhas_saida') or '':>9}")
+        if anterior:
+            tempo = tempos_anteriores.get(etapa["etapa"])
+            if etapa["etapa"] == "total":
+                tempo = sum(tempos_anteriores.values())
+            if tempo:
+                linha += f" {tempo:>8.2f}s {etapa['segundos'] / tempo:>6.2f}x"
+        print(linha)
+    if resultado.get("limpeza"):
+        from limpeza import formata_estatisticas_limpeza
+        print("\n" + formata_estatisticas_limpeza(resultado["limpeza"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo e o pico de memória de cada etapa da limpeza com entradas sintéticas")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--saida", default=None,
+                        help="Arquivo JSON dos resultados (padrão: logs/benchmark_pipeline_<data>.json)")
+    parser.add_argument("--compara", default=None,
+                        help="Arquivo JSON de uma execução anterior, para comparar os tempos")
+    parser.add_argument("--pasta", default=None,
+                        help="Mantém entradas e saídas nesta pasta em vez de uma pasta temporária")
+    parser.add_argument("--modos", nargs="+", choices=["completo", "blocos"], default=["completo", "blocos"],
+                        help="Modos medidos: em memória (completo) e --em-blocos (blocos)")
+    parser.add_argument("--tamanho-bloco", type=int, default=None,
+                        help="Leads por bloco no modo blocos (padrão: config ou memória disponível)")
+    args = parser.parse_args()
+
+    anteriores = {}
+    if args.compara:
+        with open(args.compara, encoding="utf-8") as arquivo:
+            anteriores = {(r["linhas"], r.get("modo", "completo")): r
+                          for r in json.load(arquivo)["resultados"]}
+    resultados = []
+    for linhas in args.linhas:
+        for modo in args.modos:
+            pasta = os.path.join(args.pasta, f"{linhas}_{modo}") if args.pasta else None
+            resultados.append(mede(linhas, args.seed, pasta, modo, args.tamanho_bloco))
+            imprime(resultados[-1], anteriores.get((linhas, modo)))
+
+    saida = args.saida or os.path.join(
+        "logs", f"benchmark_pipeline_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    if os.path.dirname(saida):
+        os.makedirs(os.path.dirname(saida), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump({
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "resultados": resultados,
+        }, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em '{saida}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import glob
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from config import config
+from arquivos import decide_planilha, le_entrada
+from descartes import calcula_criterios_descarte, get_history_blocks, get_seen_blocks
+from limpeza import ajusta_data_sem_horario, avisa_fontes_nao_mapeadas, calcula_colunas_extras, processar_leads
+
+
+def memoria_disponivel():
+    """
+    Retorna a memória física disponível em bytes (ou None se não for possível obter).
+    Usa o psutil quando instalado e, em seguida, os contadores do sistema (Linux).
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def tamanho_bloco_automatico(logger, bytes_por_lead=8192, fracao=0.25,
+                             minimo=10_000, maximo=1_000_000):
+    """
+    Calcula a quantidade de leads por bloco a partir da memória disponível.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        bytes_por_lead (int): Memória estimada de um lead durante a limpeza (todas as colunas e cópias).
+        fracao (float): Fração da memória disponível usada por um bloco.
+        minimo (int): Menor tamanho de bloco.
+        maximo (int): Maior tamanho de bloco.
+    Returns:
+        int: Quantidade de leads por bloco.
+    """
+    disponivel = memoria_disponivel()
+    if disponivel is None:
+        logger.debug(
+            "Memória disponível desconhecida. Usando o tamanho mínimo de bloco.")
+        return minimo
+    tamanho = int(disponivel * fracao // bytes_por_lead)
+    return max(minimo, min(maximo, tamanho))
+
+
+def le_entrada_em_blocos(logger, folder, sheet_name, sheet_info, layouts, tamanho_bloco,
+                         usar_cache=True):
+    """
+    Lê um arquivo de entrada em blocos de até `tamanho_bloco` linhas, já renomeados pelo layout.
+    CSVs com cabeçalho (ex.: MAILING.csv) são lidos em blocos diretamente do disco; os demais
+    arquivos são lidos inteiros por `le_entrada` e divididos em blocos.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        folder (str): Pasta dos arquivos de entrada.
+        sheet_name (str): Nome da entrada na configuração.
+        sheet_info (dict): Informações do arquivo (path, sheet, layout, sep, fonte_padrao).
+        layouts (dict): Mapeamento de layouts para renomear colunas.
+        tamanho_bloco (int): Quantidade máxima de linhas por bloco.
+        usar_cache (bool): Se True, usa o cache de leitura nos arquivos lidos inteiros.
+    Returns:
+        Iterator[pd.DataFrame]: Blocos do arquivo.
+    """
+    path = folder + '/' + sheet_info.get("path", "")
+    layout = layouts.get(sheet_info.get("layout"))
+    if layout and path.endswith(".csv") and 'CONFIDENCIAL' not in path:
+        fonte_padrao = sheet_info.get("fonte_padrao")
+        try:
+            leitor = pd.read_csv(path, encoding="utf-8", sep=sheet_info.get('sep'),
+                                 chunksize=tamanho_bloco)
+            linhas = 0
+            with leitor:
+                for bloco in leitor:
+                    bloco = bloco[layout.values()].rename(
+                        columns={v: k for k, v in layout.items()})
+                    if fonte_padrao:
+                        bloco["Fonte"] = fonte_padrao
+                    linhas += len(bloco)
+                    yield bloco
+            logger.info(
+                f"LEITURA REALIZADA - '{sheet_name}': {linhas} LEADS (em blocos)")
+        except FileNotFoundError:
+            logger.debug(
+                f"LEITURA NÃO REALIZADA: Arquivo '{sheet_name}' em  '{path}' não encontrado")
+        except KeyError as e:
+            logger.error(f"Erro ao processar colunas do arquivo {path}: {e}")
+        return
+    df = le_entrada(logger, folder, sheet_name,
+                    sheet_info, layouts, usar_cache)
+    if df is None:
+        return
+    for inicio in range(0, len(df), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco]
+
+
+def processa_em_blocos(logger, grupo, folder, sheets, layouts, execucao, tamanho_bloco=None,
+                       usar_cache=True, referencia=None):
+    """
+    Executa a limpeza e os critérios de descarte em blocos de tamanho fixo, para entradas
+    que não cabem inteiras na memória. Equivale a processar_leads, data_source_sort,
+    calcula_colunas_extras, calcula_criterios_descarte, get_history_blocks, get_seen_blocks e
+    decide_planilha, produzindo os blocos processados um a um para que sejam gravados (Excel,
+    dataset, banco, planilhas da central e tabela de descartes) sem reunir todos os leads:
+    1. Os blocos lidos são gravados em disco e, em seguida, limpos um a um; apenas a coluna
+       'Data Form' fica em memória.
+    2. A ordem global por data é calculada sobre essa coluna (mesma ordenação do modo em memória).
+    3. Os blocos limpos são redistribuídos em disco de acordo com a ordem global.
+    4. Os blocos ordenados são processados em sequência, levando de um bloco para o seguinte
+       as contagens de CPF e telefone, de modo que 'Contagem CPF' e 'Contagem Telefone'
+       (e os descartes derivados) são idênticos aos do modo em memória.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        grupo (str): Turno da execução.
+        folder (str): Pasta dos arquivos de entrada.
+        sheets (dict): Informações sobre as planilhas e abas a serem lidas.
+        layouts (dict): Mapeamento de layouts para renomear colunas.
+        execucao (str): Identificador da execução (data e turno) na base de chaves vistas.
+        tamanho_bloco (int, opcional): Leads por bloco. Padrão é config["tamanho_bloco"] ou,
+            se não configurado, calculado a partir da memória disponível.
+        usar_cache (bool): Se True, usa o cache de leitura nos arquivos lidos inteiros.
+        referencia (datetime, opcional): Data de referência dos bloqueios. Padrão é agora.
+    Returns:
+        Iterator[pd.DataFrame]: Blocos de leads processados; concatenados, na mesma ordem do
+            modo em memória.
+    """
+    tamanho_bloco = (tamanho_bloco or config.get("tamanho_bloco")
+                     or tamanho_bloco_automatico(logger))
+    logger.info(f"Processamento em blocos de até {tamanho_bloco} leads.")
+    with tempfile.TemporaryDirectory(prefix="mailing_blocos_") as pasta:
+        # Etapa 1: leitura em blocos, guardando as colunas na ordem em que aparecem
+        # (as mesmas colunas da concatenação do modo em memória)
+        colunas = {}
+        total = 0
+        for sheet_name, sheet_info in sheets.items():
+            for bloco in le_entrada_em_blocos(logger, folder, sheet_name, sheet_info, layouts,
+                                              tamanho_bloco, usar_cache):
+                if len(bloco) == 0:
+                    continue
+                colunas.update(dict.fromkeys(bloco.columns))
+                bloco.set_axis(pd.RangeIndex(total, total + len(bloco))).to_pickle(
+                    os.path.join(pasta, f"bruto_{total:012d}.pkl"))
+                total += len(bloco)
+        if total == 0:
+            return
+
+        # Etapa 2: limpeza de cada bloco; apenas a coluna 'Data Form' fica em memória
+        datas = []
+        for arquivo in sorted(glob.glob(os.path.join(pasta, "bruto_*.pkl"))):
+            bloco = pd.read_pickle(arquivo).reindex(columns=list(colunas))
+            os.remove(arquivo)
+            bloco = processar_leads(logger, bloco)
+            bloco['Data Form'] = ajusta_data_sem_horario(bloco['Data Form'])
+            datas.append(bloco['Data Form'])
+            bloco.to_pickle(arquivo.replace("bruto_", "limpo_"))
+            logger.debug(f"Bloco {len(datas)} limpo.")
+
+        # Etapa 3: posição de cada lead na ordenação global por data
+        ordem = pd.concat(datas).sort_values().index.to_numpy()
+        del datas
+        posicao = np.empty(total, dtype=np.int64)
+        posicao[ordem] = np.arange(total)
+        del ordem
+
+        # Etapa 4: redistribui os leads limpos nos blocos ordenados
+        for arquivo in sorted(glob.glob(os.path.join(pasta, "limpo_*.pkl"))):
+            bloco = pd.read_pickle(arquivo)
+            destinos = posicao[bloco.index.to_numpy()] // tamanho_bloco
+            sufixo = os.path.basename(arquivo)[len("limpo_"):]
+            for destino, parte in bloco.groupby(destinos, sort=False):
+                parte.to_pickle(os.path.join(
+                    pasta, f"ordenado_{destino:06d}_{sufixo}"))
+            os.remove(arquivo)
+
+        # Etapa 5: descartes nos blocos ordenados, com as contagens acumuladas
+        contagens = {"CPF Limpo": {}, "Telefone Limpo": {}, "Fontes não mapeadas": {}}
+        referencia = pd.Timestamp.today() if referencia is None else pd.Timestamp(referencia)
+        inicio = 0
+        for destino in range((total - 1) // tamanho_bloco + 1):
+            partes = sorted(glob.glob(os.path.join(
+                pasta, f"ordenado_{destino:06d}_*.pkl")))
+            bloco = pd.concat([pd.read_pickle(p) for p in partes])
+            bloco = bloco.iloc[np.argsort(posicao[bloco.index.to_numpy()])]
+            for parte in partes:
+                os.remove(parte)
+            bloco = calcula_colunas_extras(
+                logger, bloco, grupo, config['fontes'], contagens)
+            bloco = calcula_criterios_descarte(
+                logger, bloco, config['cidades'])
+            # O índice de histórico é atualizado uma única vez, no primeiro bloco
+            bloco = get_history_blocks(
+                logger, bloco, folder, referencia, atualiza=destino == 0)
+            bloco = get_seen_blocks(logger, bloco, execucao, referencia)
+            bloco = decide_planilha(logger, bloco, config['quebra_fonte'])
+            bloco.index = pd.RangeIndex(inicio, inicio + len(bloco))
+            inicio += len(bloco)
+            logger.debug(f"Bloco ordenado {destino + 1} processado.")
+            yield bloco
+        # Um único aviso para as fontes não mapeadas de todos os blocos
+        avisa_fontes_nao_mapeadas(logger, contagens["Fontes não mapeadas"])
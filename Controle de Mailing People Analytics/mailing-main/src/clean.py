@@ -1,6 +1,13 @@
+import argparse
+import contextlib
 import warnings
 
-from utils import *
+from utils import config_logger, get_grupo_prefixo, get_run_params
+from limpeza import estatisticas_limpeza, formata_estatisticas_limpeza
+from normalizacao import estatisticas_cache
+from snapshot import limpa_snapshots
+from pipeline import executa_completo, executa_em_blocos
+from metricas import Etapas, Perfil
 from config import config
 
 
@@ -8,60 +15,52 @@ from config import config
 warnings.simplefilter("ignore")
 
 
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Limpeza do mailing de People Analytics")
+    parser.add_argument("--limpar-cache", action="store_true",
+                        help="Remove o cache de leitura dos arquivos de entrada antes de executar")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Lê todos os arquivos de entrada novamente, sem usar nem atualizar o cache")
+    parser.add_argument("--em-blocos", action="store_true",
+                        help="Processa a limpeza e os descartes em blocos, para entradas muito grandes")
+    parser.add_argument("--tamanho-bloco", type=int, default=None,
+                        help="Leads por bloco no modo --em-blocos (padrão: config ou memória disponível)")
+    parser.add_argument("--perfil", "--profile", action="store_true",
+                        help="Grava um perfil do cProfile da execução (.prof e pilhas colapsadas) em config['perfil_path']")
+    return parser.parse_args()
+
+
+def main(args):
 
     # Define parâmetros e logger
     verbose = get_run_params()
     logger = config_logger(verbose)
 
+    if args.limpar_cache:
+        limpa_snapshots(logger)
+
     # Define grupo e prefixo automaticamente
     grupo, prefixo = get_grupo_prefixo(logger, config['output_path'])
+    execucao = prefixo.strip("/_")
 
-    # Ler entradas
-    leads = get_all_sheets(
-        logger, config['input_path'], config['sheets'], config['layouts'])
-    if leads is None or len(leads) == 0:
-        logger.error("Nenhum lead encontrado no arquivo de entrada.")
-        return
-
-    # Compilar leads com mapping de funções
-    leads = processar_leads(logger, leads)
-
-    # Ordenar por data despriorizando indeed (sem horario)
-    leads = data_source_sort(logger, leads)
-
-    # Calcular colunas extras para os leads
-    leads = calcula_colunas_extras(logger, leads, grupo, config['fontes'])
-
-    # Calcula as colunas de critérios de descarte
-    leads = calcula_criterios_descarte(logger, leads, config['cidades'])
-
-    # Incluir bloqueio de ultimos dias com base em tabulação do R&S
-    leads = get_history_blocks(logger, leads, config['input_path'])
-
-    # Calcular planilhas para divisão dos arquivos
-    leads = decide_planilha(logger, leads, config['quebra_fonte'])
-
-    # Salvar leads em Excel
-    overwrite_excel(
-        logger, leads, config['output_path'] + prefixo+"Mailing.xlsx")
-
-    salva_db(logger, leads)
-
-    # print_logo()
-
-    # Limpar Leads não recomendados
-    mailing = exclui_nao_recomendados(logger, leads)
-
-    # Dividindo mailing em planilhas
-    logger.debug("Dividindo mailing em planilhas")
-    divide_planilhas(logger, mailing, config['central_path'], prefixo)
+    # Mede cada etapa (resumo no log e registro em config["metricas_path"] ao final)
+    perfil = Perfil(logger, execucao) if args.perfil else contextlib.nullcontext()
+    with perfil, Etapas(logger, coletores={"limpeza": estatisticas_limpeza}, execucao=execucao,
+                        grupo=grupo, modo="blocos" if args.em_blocos else "completo") as etapas:
+        if args.em_blocos:
+            concluido = executa_em_blocos(
+                logger, etapas, grupo, prefixo, execucao, args.tamanho_bloco, usar_cache=not args.sem_cache)
+        else:
+            concluido = executa_completo(
+                logger, etapas, grupo, prefixo, execucao, usar_cache=not args.sem_cache)
+        if not concluido:
+            return
 
-    # Informando sobre o resultado dos descartes
-    print_descarte(logger, leads, prefixo)
+        logger.debug(f"Cache de normalização de textos: {estatisticas_cache()}")
+        logger.debug("Funções de limpeza:\n" + formata_estatisticas_limpeza(estatisticas_limpeza()))
 
-    logger.info("Processo de limpeza concluído com sucesso")
+        logger.info("Processo de limpeza concluído com sucesso")
 
 
 if __name__ == "__main__":
-    main()
+    main(parse_args())
@@ -1,8 +1,14 @@
 import os
+import logging
 import pandas as pd
 from tqdm import tqdm
 import csv
 
+from planilhas import le_excel
+
+
+logger = logging.getLogger(__name__)
+
 
 def compila_excel(path):
     compiled_file_name = 'arquivo_compilado.csv'
@@ -20,7 +26,7 @@ def compila_excel(path):
         file_path = os.path.join(path, file)
         try:
             if file.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file_path)
+                df = le_excel(logger, file_path)
             elif file.endswith('.csv'):
                 # lê tentando detectar automaticamente
                 df = pd.read_csv(
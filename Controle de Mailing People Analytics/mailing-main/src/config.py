@@ -7,6 +7,92 @@ config = {
     "central_path": "./Central",
     # Caminho da pasta onde as imagens dos reports serão salvas (com relatorio de descartes de leads):
     "report_path": "./Report",
+    # Quantidade de arquivos de entrada lidos simultaneamente:
+    "workers_leitura": 4,
+    # Leads por bloco no processamento em blocos (--em-blocos). None calcula a partir da memória disponível:
+    "tamanho_bloco": None,
+    # Engine de leitura dos arquivos Excel ("calamine", "openpyxl" ou "xlrd" - se falhar, usa openpyxl/xlrd):
+    "engine_excel": "calamine",
+    # Engine de escrita do Mailing.xlsx ("xlsxwriter" em memória constante ou "openpyxl" em modo write_only):
+    "engine_escrita_excel": "xlsxwriter",
+    # Engine de leitura dos CSVs posicionais do Indeed ("c" ou "pyarrow" - se o pyarrow falhar, usa "c"):
+    "engine_csv": "c",
+    # Caminho da pasta dos snapshots binários dos arquivos de entrada (relidos apenas quando o arquivo muda):
+    "snapshot_path": "./cache/snapshots",
+    # Caminho do índice local com a última tratativa do R&S por telefone (atualizado incrementalmente):
+    "indice_historico_path": "./cache/historico.sqlite",
+    # Dias relidos antes da última data já indexada (tratativas lançadas com atraso no relatório):
+    "margem_historico_dias": 3,
+    # Dias entre reconstruções completas do índice de histórico (capta tratativas antigas finalizadas depois da margem):
+    "reconstrucao_historico_dias": 7,
+    # Arquivo de métricas das execuções (um registro JSON por linha com tempo, CPU, memória e linhas de cada etapa):
+    "metricas_path": "./logs/metricas.jsonl",
+    # Pasta dos perfis gravados com a opção --perfil (arquivos .prof e pilhas colapsadas .folded):
+    "perfil_path": "./logs/perfis",
+    # Tempo máximo de importação de cada módulo do pipeline, em ms (verificado por benchmark_importacao.py --verifica):
+    "orcamento_importacao_ms": 800,
+    # Quantidade máxima de textos distintos guardados no cache de normalização (normalize_text / clean_text):
+    "cache_normalizacao": 65536,
+    # Geocodificação da coluna "Endereco" (cache local com validade, consultas paralelas com limite por segundo):
+    "geocodificacao": {
+        "url": "https://nominatim.openstreetmap.org/search",
+        "cache_path": "./cache/geocodificacao.sqlite",
+        "ttl_dias": 90,
+        "workers": 2,
+        "requisicoes_por_segundo": 1,
+        "timeout": 10,
+    },
+    # Base local de CPFs e telefones já vistos em execuções anteriores ("Descarte Visto Recentemente"):
+    # `dias`: janela em dias para considerar o lead repetido (0 desliga o descarte, mas mantém o registro)
+    # `filtro_bloom`: mantém um filtro de Bloom em disco para evitar consultas de chaves nunca vistas
+    "vistos": {
+        "path": "./cache/vistos.sqlite",
+        "dias": 30,
+        "filtro_bloom": True,
+        "bits_bloom": 2 ** 26,
+        "hashes_bloom": 7,
+    },
+    # Relatórios de descarte por cidade (gerados em paralelo; tabelas inalteradas no mesmo prefixo não são refeitas):
+    # `formato`: "png" (imagem), "svg" (vetorial, sem rasterização) ou "html" (tabela autocontida, mais rápido)
+    # `workers`: processos simultâneos na geração / `cache_path`: hash da última tabela gerada por arquivo
+    # `formato_cubo`: formato da tabela agregada de descartes da execução ("parquet" ou "csv"), salva junto aos relatórios
+    "relatorios": {
+        "formato": "png",
+        "workers": 4,
+        "cache_path": "./cache/relatorios.json",
+        "formato_cubo": "parquet",
+    },
+    # Dataset Parquet dos leads compilados (fonte do Power BI), particionado por "Data Captacao" e "Turno" (formato Hive):
+    # `linhas_por_grupo` / `compressao`: row groups e compressão das partições gravadas a cada execução
+    # `compactacao`: partições com mais de `dias` dias regravadas por `python dataset.py compactar`
+    "dataset": {
+        "path": "./Dataset",
+        "linhas_por_grupo": 50_000,
+        "compressao": "snappy",
+        "compactacao": {
+            "dias": 30,
+            "linhas_por_grupo": 1_000_000,
+            "compressao": "zstd",
+        },
+    },
+    # Banco de dados de destino do salva_db (MAILING_DB_URL ou MAILING_DB_HOST/PORT/NAME/USER/PASSWORD têm prioridade):
+    # `url`: URL completa do SQLAlchemy (ex.: "sqlite:///./cache/teste.sqlite"); se None, monta a partir dos campos abaixo
+    # `host` / `database` / `user` / `password`: sem valor padrão (não versionar credenciais); preferir as variáveis de ambiente
+    # `pool_size` / `max_overflow`: conexões mantidas no pool e conexões extras permitidas
+    # `linhas_por_lote`: linhas enviadas por COPY (PostgreSQL) ou executemany (demais bancos)
+    "banco": {
+        "url": None,
+        "driver": "postgresql+psycopg2",
+        "host": None,
+        "port": 5432,
+        "database": None,
+        "user": None,
+        "password": None,
+        "tabela": "leads_temp",
+        "pool_size": 5,
+        "max_overflow": 5,
+        "linhas_por_lote": 50_000,
+    },
     # Cidades de atuação (para critérios de descarte - cidades não listadas são removidas):
     "cidades": ["uberlandia", "jundiai", "barueri", "aracaju", "hortolandia"],
     # Mapping de fontes (nomes padronizados e palavras chave para identificação):
@@ -1,8 +1,14 @@
 import os
+import logging
 import pandas as pd
 import csv
 from tqdm import tqdm
 
+from planilhas import le_excel
+
+
+logger = logging.getLogger(__name__)
+
 
 PASTA_ORIGEM = r"C:\Users\51316_italo\Documents\CB\mailing-main\Bases Para Limpar"
 PASTA_DESTINO = r"C:\Users\51316_italo\Documents\CB\mailing-main\Bases Limpas"
@@ -29,7 +35,7 @@ def limpa_para_csv():
 
         try:
             if arquivo.lower().endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(caminho_origem, dtype=str)
+                df = le_excel(logger, caminho_origem, dtype=str)
             else:
                 df = pd.read_csv(
                     caminho_origem,
@@ -1,24 +1,340 @@
-from sqlalchemy import create_engine
+import csv
+import io
+import os
+import time
+import uuid
+
 import pandas as pd
 
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Date, DateTime, Index, MetaData, Table, Text, and_,
+    create_engine, delete, exists, inspect, select,
+)
+from sqlalchemy.engine import URL
+from config import config
+from esquema import TIPOS_COLUNAS, prepara_tipos
+
+
+# Tipos do SQLAlchemy para cada tipo de schema.md (esquema.TIPOS_COLUNAS)
+TIPOS_SQL = {
+    "Texto": Text,
+    "Número": BigInteger,
+    "Data": Date,
+    "Data/Hora": DateTime,
+    "Booleano": Boolean,
+}
+
+# Colunas que identificam uma execução no banco (substituída por inteiro ao ser regravada)
+CHAVE_EXECUCAO = ["Datetime de Execução", "Prefixo"]
+
+# Índices da tabela de leads (buscas do Power BI e do histórico por CPF, telefone e execução)
+INDICES = {
+    "cpf_limpo": ["CPF Limpo"],
+    "telefone_limpo": ["Telefone Limpo"],
+    "execucao": CHAVE_EXECUCAO,
+}
+
+# Engines já criadas, por URL (o pool de conexões é reaproveitado entre chamadas)
+_ENGINES = {}
+
+
+# Variáveis de ambiente de cada parâmetro de conexão (prioridade sobre config["banco"])
+VARIAVEIS_BANCO = {
+    "host": "MAILING_DB_HOST",
+    "port": "MAILING_DB_PORT",
+    "database": "MAILING_DB_NAME",
+    "user": "MAILING_DB_USER",
+    "password": "MAILING_DB_PASSWORD",
+}
+
+
+def url_banco(parametros=None):
+    """
+    Monta a URL de conexão a partir de config["banco"]. As variáveis de ambiente
+    MAILING_DB_URL (URL completa) e MAILING_DB_HOST, MAILING_DB_PORT, MAILING_DB_NAME,
+    MAILING_DB_USER e MAILING_DB_PASSWORD têm prioridade sobre a configuração. Não há valores
+    padrão para servidor, banco e usuário: sem eles, a conexão não é montada.
+    Args:
+        parametros (dict, opcional): Parâmetros do banco. Padrão é config["banco"].
+    Returns:
+        Union[str, URL]: URL de conexão do SQLAlchemy.
+    Raises:
+        ValueError: Se servidor, banco ou usuário não estiverem definidos.
+    """
+    parametros = parametros or config["banco"]
+    url = os.environ.get("MAILING_DB_URL") or parametros.get("url")
+    if url:
+        return url
+    valores = {chave: os.environ.get(variavel) or parametros.get(chave)
+               for chave, variavel in VARIAVEIS_BANCO.items()}
+    faltantes = [VARIAVEIS_BANCO[c] for c in ("host", "database", "user") if not valores[c]]
+    if faltantes:
+        raise ValueError(
+            "Conexão com o banco não configurada: defina MAILING_DB_URL ou "
+            f"{', '.join(faltantes)} (ou os campos correspondentes de config['banco']).")
+    return URL.create(
+        parametros.get("driver", "postgresql"),
+        username=valores["user"],
+        password=valores["password"],
+        host=valores["host"],
+        port=int(valores["port"]) if valores["port"] else None,
+        database=valores["database"],
+    )
 
-def cria_conexao(logger, host="10.33.3.201", port="5432",
-                 database="db_peopleanalitycs", user="postgres",
-                 password="nova_senha"):
+
+def obtem_engine(logger, parametros=None):
+    """
+    Retorna a engine do banco configurado, criando-a (com pool de conexões) na primeira chamada.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        parametros (dict, opcional): Parâmetros do banco. Padrão é config["banco"].
+    Returns:
+        sqlalchemy.engine.Engine: Engine reaproveitada entre chamadas.
+    """
+    parametros = parametros or config["banco"]
+    url = url_banco(parametros)
+    chave = str(url)
+    if chave not in _ENGINES:
+        opcoes = {"pool_pre_ping": True}
+        if not chave.startswith("sqlite"):
+            opcoes.update(pool_size=parametros.get("pool_size", 5),
+                          max_overflow=parametros.get("max_overflow", 5))
+        _ENGINES[chave] = create_engine(url, **opcoes)
+        logger.debug(f"Engine criada para {_ENGINES[chave].url.render_as_string()}")
+    return _ENGINES[chave]
+
+
+def cria_conexao(logger, host=None, port=None, database=None, user=None, password=None):
+    """
+    Retorna a engine do banco com os parâmetros informados no lugar dos de config["banco"]
+    (as variáveis MAILING_DB_* continuam com prioridade, ver url_banco).
+    Returns:
+        sqlalchemy.engine.Engine: Engine do banco, ou None se a conexão não puder ser criada.
+    """
+    informados = dict(host=host, port=port, database=database, user=user, password=password)
     try:
         # Criar a string de conexão
-        engine = create_engine(
-            f'postgresql://{user}:{password}@{host}:{port}/{database}')
+        engine = obtem_engine(logger, dict(
+            config["banco"], url=None, **{k: v for k, v in informados.items() if v is not None}))
         logger.info(
-            f"Conexão com o banco de dados {database} estabelecida com sucesso.")
+            f"Conexão com o banco de dados {engine.url.database} estabelecida com sucesso.")
         return engine
     except Exception as e:
         logger.error(f"Erro ao conectar ao banco de dados: {e}")
         return None
 
 
+def _copy_postgres(conexao, tabela, df):
+    # COPY a partir de um CSV em memória (psycopg2)
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep="\\N",
+              quoting=csv.QUOTE_MINIMAL, date_format="%Y-%m-%d %H:%M:%S")
+    buffer.seek(0)
+    preparer = conexao.dialect.identifier_preparer
+    colunas = ", ".join(preparer.quote(c) for c in df.columns)
+    with conexao.connection.dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {preparer.format_table(tabela)} ({colunas}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+
+
+def _insere_executemany(conexao, tabela, df):
+    # INSERT com executemany (demais dialetos, ex.: SQLite). Os valores são convertidos
+    # coluna a coluna pelos tipos da tabela e enviados direto ao driver, sem montar um
+    # dicionário por linha
+    dialeto = conexao.dialect
+    colunas = []
+    for nome, serie in df.items():
+        valores = serie.to_numpy(dtype=object, copy=True)
+        valores[pd.isna(valores)] = None
+        converte = tabela.c[nome].type.dialect_impl(dialeto).bind_processor(dialeto)
+        colunas.append([converte(v) for v in valores] if converte else valores)
+    linhas = list(zip(*colunas))
+    marcador = {"qmark": "?", "format": "%s", "pyformat": "%s"}.get(dialeto.paramstyle)
+    if marcador is None:
+        conexao.execute(tabela.insert(), [dict(zip(df.columns, linha)) for linha in linhas])
+        return
+    preparer = dialeto.identifier_preparer
+    nomes = ", ".join(preparer.quote(c) for c in df.columns)
+    conexao.exec_driver_sql(
+        f"INSERT INTO {preparer.format_table(tabela)} ({nomes}) "
+        f"VALUES ({', '.join([marcador] * len(df.columns))})", linhas)
+
+
+def _grava_lotes(conexao, tabela, df, linhas_por_lote):
+    # COPY apenas com o psycopg2; demais drivers e dialetos usam executemany
+    postgres = conexao.dialect.name == "postgresql" and conexao.dialect.driver == "psycopg2"
+    for lote in range(0, len(df), linhas_por_lote):
+        bloco = df.iloc[lote:lote + linhas_por_lote]
+        if postgres:
+            _copy_postgres(conexao, tabela, bloco)
+        else:
+            _insere_executemany(conexao, tabela, bloco)
+
+
+def _garante_tabela(conexao, df, tabela):
+    # Cria a tabela com os tipos de schema.md ou inclui as colunas que ainda não existem
+    # (ex.: novos descartes); devolve a tabela refletida do banco
+    tipos = {c: TIPOS_SQL[TIPOS_COLUNAS[c]]() for c in df.columns if c in TIPOS_COLUNAS}
+    if not inspect(conexao).has_table(tabela):
+        df.head(0).to_sql(tabela, conexao, index=False, dtype=tipos)
+    destino = Table(tabela, MetaData(), autoload_with=conexao)
+    faltantes = [c for c in df.columns if c not in destino.c]
+    if faltantes:
+        preparer = conexao.dialect.identifier_preparer
+        for coluna in faltantes:
+            tipo = tipos.get(coluna, Text()).compile(dialect=conexao.dialect)
+            conexao.exec_driver_sql(
+                f"ALTER TABLE {preparer.format_table(destino)} "
+                f"ADD COLUMN {preparer.quote(coluna)} {tipo}")
+        destino = Table(tabela, MetaData(), autoload_with=conexao)
+    return destino
+
+
+def carrega_tabela(logger, df, tabela, engine=None, linhas_por_lote=None):
+    """
+    Grava o DataFrame em uma tabela em lotes: com COPY no PostgreSQL e com INSERT em
+    executemany nos demais bancos. A tabela é criada com os tipos de schema.md se não existir.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): Leads a serem gravados.
+        tabela (str): Nome da tabela de destino.
+        engine (sqlalchemy.engine.Engine, opcional): Engine do banco. Padrão é `obtem_engine`.
+        linhas_por_lote (int, opcional): Linhas por lote. Padrão é config["banco"]["linhas_por_lote"].
+    Returns:
+        float: Linhas gravadas por segundo.
+    """
+    engine = engine or obtem_engine(logger)
+    linhas_por_lote = linhas_por_lote or config["banco"].get("linhas_por_lote", 50_000)
+    inicio = time.perf_counter()
+    df = prepara_tipos(df)
+    with engine.begin() as conexao:
+        destino = _garante_tabela(conexao, df, tabela)
+        _grava_lotes(conexao, destino, df, linhas_por_lote)
+    duracao = time.perf_counter() - inicio
+    taxa = len(df) / duracao if duracao > 0 else float("inf")
+    logger.info(
+        f"{len(df)} linhas gravadas em '{tabela}' em {duracao:.2f}s ({taxa:,.0f} linhas/s)")
+    return taxa
+
+
+class SincronizacaoExecucao:
+    """
+    Grava a execução identificada por ("Datetime de Execução", "Prefixo") substituindo, em uma
+    única transação, as linhas já gravadas dessa execução: os leads recebidos em um ou mais
+    blocos (`acrescenta`) são carregados em uma tabela temporária e, ao sair do bloco `with`
+    sem erros, a partição da execução é apagada e reinserida a partir dela. Em caso de erro,
+    a transação é desfeita. Uso:
+
+        with SincronizacaoExecucao(logger, prefixo) as sincronizacao:
+            sincronizacao.acrescenta(df)
+
+    Fora de um bloco `with`, `conclui` e `cancela` encerram a transação aberta por `__enter__`.
+    """
+
+    def __init__(self, logger, prefixo, tabela=None, engine=None, linhas_por_lote=None):
+        self.logger = logger
+        self.prefixo = prefixo
+        self.engine = engine or obtem_engine(logger)
+        self.tabela = tabela or config["banco"]["tabela"]
+        self.linhas_por_lote = linhas_por_lote or config["banco"].get("linhas_por_lote", 50_000)
+        self.destino = None
+        self.temporaria = None
+        self.linhas = 0
+        self.taxa = None
+        self.transacao = None
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        self.transacao = self.engine.begin()
+        self.conexao = self.transacao.__enter__()
+        return self
+
+    def _prepara(self, df):
+        # Na primeira chamada: tabela de destino, índices e tabela temporária com as mesmas colunas
+        self.destino = _garante_tabela(self.conexao, df, self.tabela)
+        for nome, colunas in INDICES.items():
+            Index(f"ix_{self.tabela}_{nome}", *(self.destino.c[c] for c in colunas)).create(
+                self.conexao, checkfirst=True)
+        self.temporaria = Table(
+            f"tmp_{self.tabela}_{uuid.uuid4().hex[:8]}", MetaData(),
+            *(Column(c.name, c.type) for c in self.destino.c if c.name in df.columns),
+            prefixes=["TEMPORARY"])
+        self.temporaria.create(self.conexao)
+
+    def acrescenta(self, df):
+        df = prepara_tipos(df.assign(Prefixo=self.prefixo))
+        if self.destino is None:
+            self._prepara(df)
+        _grava_lotes(self.conexao, self.temporaria, df, self.linhas_por_lote)
+        self.linhas += len(df)
+
+    def _substitui(self):
+        chave = and_(*(self.destino.c[c] == self.temporaria.c[c] for c in CHAVE_EXECUCAO))
+        removidas = self.conexao.execute(
+            delete(self.destino).where(exists().where(chave))).rowcount
+        colunas = [c.name for c in self.temporaria.c]
+        self.conexao.execute(self.destino.insert().from_select(
+            colunas, select(*(self.temporaria.c[c] for c in colunas))))
+        self.temporaria.drop(self.conexao)
+        return removidas
+
+    def conclui(self):
+        """
+        Substitui a partição da execução pelos leads recebidos e confirma a transação.
+        Returns:
+            float: Linhas gravadas por segundo.
+        """
+        try:
+            removidas = self._substitui() if self.destino is not None else 0
+        except BaseException:
+            self.cancela()
+            raise
+        self.transacao.__exit__(None, None, None)
+        self.transacao = None
+        duracao = time.perf_counter() - self.inicio
+        self.taxa = self.linhas / duracao if duracao > 0 else float("inf")
+        self.logger.info(
+            f"Execução '{self.prefixo}' sincronizada em '{self.tabela}': {self.linhas} linhas "
+            f"gravadas, {removidas} substituídas, em {duracao:.2f}s ({self.taxa:,.0f} linhas/s)")
+        return self.taxa
+
+    def cancela(self):
+        # Desfaz a transação (nada é gravado)
+        if self.transacao is not None:
+            self.transacao.__exit__(RuntimeError, RuntimeError("cancelada"), None)
+            self.transacao = None
+
+    def __exit__(self, tipo, erro, rastreamento):
+        if erro is None:
+            self.conclui()
+        else:
+            self.cancela()
+        return False
+
+
+def sincroniza_execucao(logger, df, prefixo, tabela=None, engine=None, linhas_por_lote=None):
+    """
+    Grava a execução identificada por ("Datetime de Execução", "Prefixo") substituindo, em uma
+    única transação, as linhas já gravadas dessa execução (ver SincronizacaoExecucao).
+    Reexecutar o mesmo prefixo não duplica os leads no banco.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): Leads da execução.
+        prefixo (str): Prefixo da execução (ex.: "2025_01_31_manha").
+        tabela (str, opcional): Tabela de destino. Padrão é config["banco"]["tabela"].
+        engine (sqlalchemy.engine.Engine, opcional): Engine do banco. Padrão é `obtem_engine`.
+        linhas_por_lote (int, opcional): Linhas por lote. Padrão é config["banco"]["linhas_por_lote"].
+    Returns:
+        float: Linhas gravadas por segundo.
+    """
+    with SincronizacaoExecucao(logger, prefixo, tabela, engine, linhas_por_lote) as sincronizacao:
+        sincronizacao.acrescenta(df)
+    return sincronizacao.taxa
+
+
 # Ler uma tabela para um DataFrame
 # df = pd.read_sql_table('nome_da_tabela', engine)
 #
 # Inserir um DataFrame de volta no banco
-# df.to_sql('tb_teste', engine, if_exists='append', index=False)
+# carrega_tabela(logger, df, 'tb_teste', engine)
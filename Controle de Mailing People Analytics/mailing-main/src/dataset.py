@@ -0,0 +1,310 @@
+import argparse
+import glob
+import importlib.util
+import logging
+import os
+import tempfile
+import time
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from config import config
+from esquema import FORMATOS_DATA, TIPOS_COLUNAS, prepara_tipos
+
+
+# Colunas de partição do dataset (pastas no formato Hive: "Data Captacao=2025-01-31/Turno=MANHA")
+PARTICOES = ["Data Captacao", "Turno"]
+
+# Valor da partição dos leads sem "Data Captacao" válida ou sem "Turno" (lido como nulo pelo
+# particionamento Hive do pyarrow)
+PARTICAO_PADRAO = "__HIVE_DEFAULT_PARTITION__"
+
+# Arquivo de dados de cada partição (substituído por inteiro ao regravar a execução)
+ARQUIVO_PARTICAO = "part-0.parquet"
+
+
+def _tipo_arrow(tipo):
+    import pyarrow as pa
+
+    return {
+        "Data/Hora": pa.timestamp("us"),
+        "Data": pa.date32(),
+        "Número": pa.int64(),
+        "Booleano": pa.bool_(),
+    }.get(tipo, pa.string())
+
+
+def schema_dataset(colunas):
+    """
+    Monta o schema Arrow das colunas do dataset a partir dos tipos de schema.md
+    (esquema.TIPOS_COLUNAS); colunas fora do schema são gravadas como texto.
+    Args:
+        colunas (list[str]): Colunas gravadas (sem as colunas de partição).
+    Returns:
+        pyarrow.Schema: Schema do arquivo Parquet.
+    """
+    import pyarrow as pa
+
+    return pa.schema([(c, _tipo_arrow(TIPOS_COLUNAS.get(c))) for c in colunas])
+
+
+def _tabela_arrow(df, schema):
+    # Converte um bloco de leads para os tipos do schema
+    import pyarrow as pa
+
+    df = prepara_tipos(df)
+    for campo in schema:
+        if pa.types.is_string(campo.type):
+            df[campo.name] = df[campo.name].astype("string")
+        elif pa.types.is_date32(campo.type):
+            df[campo.name] = pd.to_datetime(df[campo.name]).astype("datetime64[ms]")
+    return pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+
+def caminho_particao(pasta, data, turno):
+    return os.path.join(pasta, f"Data Captacao={data}", f"Turno={turno}")
+
+
+class GravacaoParticao:
+    """
+    Grava os leads de uma partição em um arquivo temporário na própria pasta (um row group por
+    vez) e, em `conclui`, o move de forma atômica para o arquivo da partição, substituindo a
+    versão anterior. Pode receber vários blocos de leads antes de concluir.
+    """
+
+    def __init__(self, destino, colunas, linhas_por_grupo, compressao, metadados=None):
+        import pyarrow.parquet as pq
+
+        os.makedirs(destino, exist_ok=True)
+        self.destino = destino
+        self.schema = schema_dataset(list(colunas))
+        if metadados:
+            self.schema = self.schema.with_metadata(
+                {k.encode(): str(v).encode() for k, v in metadados.items()})
+        self.linhas_por_grupo = linhas_por_grupo
+        self.linhas = 0
+        descritor, self.temporario = tempfile.mkstemp(
+            prefix="~gravando_", suffix=".parquet.tmp", dir=destino)
+        os.close(descritor)
+        self.writer = pq.ParquetWriter(self.temporario, self.schema, compression=compressao)
+
+    def acrescenta(self, df):
+        for inicio in range(0, len(df), self.linhas_por_grupo):
+            bloco = df.iloc[inicio:inicio + self.linhas_por_grupo]
+            self.writer.write_table(_tabela_arrow(bloco, self.schema),
+                                    row_group_size=self.linhas_por_grupo)
+        self.linhas += len(df)
+
+    def conclui(self):
+        try:
+            if self.linhas == 0:
+                # Partição vazia: um row group vazio, como na gravação de um DataFrame sem linhas
+                self.writer.write_table(self.schema.empty_table())
+            self.writer.close()
+            # O mkstemp cria o arquivo legível apenas pelo dono
+            os.chmod(self.temporario, 0o644)
+            arquivo = os.path.join(self.destino, ARQUIVO_PARTICAO)
+            os.replace(self.temporario, arquivo)
+        finally:
+            self.cancela()
+        return arquivo
+
+    def cancela(self):
+        if self.writer.is_open:
+            self.writer.close()
+        if os.path.exists(self.temporario):
+            os.remove(self.temporario)
+
+
+def grava_particao(logger, df, destino, linhas_por_grupo, compressao, metadados=None):
+    """
+    Grava os leads de uma partição em um arquivo temporário na própria pasta e o move
+    (de forma atômica) para o arquivo da partição, substituindo a versão anterior.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): Leads da partição (sem as colunas de partição).
+        destino (str): Pasta da partição.
+        linhas_por_grupo (int): Linhas por row group (convertidas por vez).
+        compressao (str): Compressão do Parquet ("snappy", "zstd", ...).
+        metadados (dict, opcional): Metadados adicionais gravados no arquivo.
+    Returns:
+        str: Caminho do arquivo da partição.
+    """
+    gravacao = GravacaoParticao(destino, df.columns, linhas_por_grupo, compressao, metadados)
+    try:
+        gravacao.acrescenta(df)
+    except BaseException:
+        gravacao.cancela()
+        raise
+    arquivo = gravacao.conclui()
+    logger.debug(f"{len(df)} linhas gravadas em '{arquivo}'")
+    return arquivo
+
+
+class GravacaoDataset:
+    """
+    Grava os leads compilados da execução no dataset Parquet particionado por "Data Captacao"
+    e "Turno" (formato Hive), com os tipos de schema.md. Recebe os leads em um ou mais blocos
+    (`acrescenta`) e, em `conclui`, substitui por inteiro cada partição recebida, mantendo um
+    único arquivo por partição. Leads sem "Data Captacao" válida ou sem "Turno" vão para a
+    partição PARTICAO_PADRAO, com um aviso ao concluir. Uso:
+
+        with GravacaoDataset(logger) as gravacao:
+            gravacao.acrescenta(df)
+        gravacao.arquivos
+    """
+
+    def __init__(self, logger, pasta=None):
+        parametros = config.get("dataset", {})
+        self.logger = logger
+        self.pasta = pasta or parametros.get("path", "./Dataset")
+        self.linhas_por_grupo = parametros.get("linhas_por_grupo", 50_000)
+        self.compressao = parametros.get("compressao", "snappy")
+        self.particoes = {}
+        self.arquivos = []
+        self.linhas = 0
+        self.sem_particao = 0
+        self.inicio = time.perf_counter()
+
+    def acrescenta(self, df):
+        datas = pd.to_datetime(df["Data Captacao"], format=FORMATOS_DATA["Data Captacao"], errors="coerce")
+        turnos = df["Turno"]
+        turnos = turnos.where(turnos.notna() & turnos.astype(str).str.strip().ne(""), PARTICAO_PADRAO)
+        chaves = pd.DataFrame({"data": datas.dt.strftime("%Y-%m-%d").fillna(PARTICAO_PADRAO),
+                               "turno": turnos})
+        self.sem_particao += int((chaves == PARTICAO_PADRAO).any(axis=1).sum())
+        for (data, turno), indices in chaves.groupby(["data", "turno"]).groups.items():
+            parte = df.loc[indices].drop(columns=PARTICOES)
+            if (data, turno) not in self.particoes:
+                self.particoes[(data, turno)] = GravacaoParticao(
+                    caminho_particao(self.pasta, data, turno), parte.columns,
+                    self.linhas_por_grupo, self.compressao)
+            self.particoes[(data, turno)].acrescenta(parte)
+        self.linhas += len(df)
+
+    def conclui(self):
+        if self.sem_particao:
+            self.logger.warning(
+                f"{self.sem_particao} lead(s) sem 'Data Captacao' válida ou sem 'Turno' gravado(s) "
+                f"na partição {PARTICAO_PADRAO}")
+        for gravacao in self.particoes.values():
+            self.arquivos.append(gravacao.conclui())
+            self.logger.debug(f"{gravacao.linhas} linhas gravadas em '{self.arquivos[-1]}'")
+        self.logger.info(
+            f"Dataset atualizado: {self.linhas} leads em {len(self.arquivos)} partição(ões) de "
+            f"'{self.pasta}' em {time.perf_counter() - self.inicio:.2f}s")
+        return self.arquivos
+
+    def cancela(self):
+        for gravacao in self.particoes.values():
+            gravacao.cancela()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, erro, rastreamento):
+        if erro is None:
+            self.conclui()
+        else:
+            self.cancela()
+        return False
+
+
+def dataset_disponivel(logger):
+    """
+    Verifica se o pyarrow está instalado, avisando que o dataset não será atualizado caso não esteja.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+    Returns:
+        bool: True se o dataset Parquet pode ser gravado.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        logger.warning("pyarrow não instalado. Dataset Parquet não atualizado.")
+        return False
+    return True
+
+
+def grava_dataset(logger, df, pasta=None):
+    """
+    Grava os leads compilados da execução no dataset Parquet particionado por "Data Captacao"
+    e "Turno" (formato Hive), com os tipos de schema.md. Cada partição fica em um único arquivo,
+    substituído por inteiro ao reexecutar o mesmo dia e turno.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): Leads compilados da execução.
+        pasta (str, opcional): Pasta do dataset. Padrão é config["dataset"]["path"].
+    Returns:
+        list[str]: Arquivos das partições gravadas.
+    """
+    if not dataset_disponivel(logger):
+        return []
+    with GravacaoDataset(logger, pasta) as gravacao:
+        gravacao.acrescenta(df)
+    return gravacao.arquivos
+
+
+def compacta_dataset(logger, pasta=None, dias=None):
+    """
+    Regrava as partições com "Data Captacao" anterior a `dias` dias em row groups grandes e com
+    compressão mais forte (configuração em config["dataset"]["compactacao"]), mantendo um único
+    arquivo por partição. Também remove arquivos temporários deixados por gravações interrompidas.
+    Partições já compactadas não são regravadas.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        pasta (str, opcional): Pasta do dataset. Padrão é config["dataset"]["path"].
+        dias (int, opcional): Idade mínima das partições compactadas. Padrão é config.
+    Returns:
+        int: Quantidade de partições compactadas.
+    """
+    import pyarrow.parquet as pq
+
+    parametros = config.get("dataset", {})
+    pasta = pasta or parametros.get("path", "./Dataset")
+    compactacao = parametros.get("compactacao", {})
+    dias = compactacao.get("dias", 30) if dias is None else dias
+    limite = (datetime.now() - timedelta(days=dias)).strftime("%Y-%m-%d")
+    for temporario in glob.glob(os.path.join(pasta, "*", "*", "~gravando_*.tmp")):
+        os.remove(temporario)
+        logger.debug(f"Arquivo temporário removido: '{temporario}'")
+    compactadas = 0
+    for destino in sorted(glob.glob(os.path.join(pasta, "Data Captacao=*", "Turno=*"))):
+        data = os.path.basename(os.path.dirname(destino)).split("=", 1)[1]
+        if data == PARTICAO_PADRAO or data >= limite:
+            continue
+        arquivos = sorted(glob.glob(os.path.join(destino, "*.parquet")))
+        if not arquivos:
+            continue
+        if len(arquivos) == 1:
+            metadados = pq.read_schema(arquivos[0]).metadata or {}
+            if metadados.get(b"compactado") == b"1":
+                continue
+        df = pd.concat([pq.read_table(a).to_pandas() for a in arquivos], ignore_index=True)
+        grava_particao(logger, df, destino,
+                       compactacao.get("linhas_por_grupo", 1_000_000),
+                       compactacao.get("compressao", "zstd"), {"compactado": 1})
+        for arquivo in arquivos:
+            if os.path.basename(arquivo) != ARQUIVO_PARTICAO:
+                os.remove(arquivo)
+        compactadas += 1
+        logger.info(f"Partição compactada: '{destino}' ({len(df)} leads)")
+    return compactadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção do dataset Parquet de leads")
+    parser.add_argument("comando", choices=["compactar"])
+    parser.add_argument("--dias", type=int, default=None,
+                        help="Compacta partições com Data Captacao anterior a N dias (padrão: config)")
+    parser.add_argument("--pasta", default=None, help="Pasta do dataset (padrão: config)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger = logging.getLogger("dataset")
+    compactadas = compacta_dataset(logger, args.pasta, args.dias)
+    logger.info(f"{compactadas} partição(ões) compactada(s)")
+
+
+if __name__ == "__main__":
+    main()
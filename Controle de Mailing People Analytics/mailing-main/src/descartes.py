@@ -0,0 +1,280 @@
+import pandas as pd
+import numpy as np
+
+from config import config
+from normalizacao import normalize_text, clean_text
+from limpeza import limpa_telefone_lote
+from historico import abre_indice, atualiza_indice, consulta_indice
+from vistos import abre_vistos, carrega_filtro, consulta_vistos, registra_vistos, versao_vistos
+
+
+def filtra_idade(logger, idade):
+    """
+    Marca no DataFrame qualquer pessoa cuja idade seja menor que 18 anos.
+    Args:
+        logger: Instância do logger para registrar logs.
+        idade (Union[str, int]): A idade da pessoa.
+    Returns:
+        bool: True se a pessoa deve ser descartada, caso contrário False.
+    """
+    if isinstance(idade, (int, float, np.number)):  # Valor numérico (float/int64 quando a coluna não tem textos)
+        return bool(idade < 18)
+    elif isinstance(idade, str):  # Valor de texto
+        if idade == '+18':
+            return False
+        elif idade == '<18':
+            return True
+    else:
+        return False
+
+
+def filtra_escolaridade(logger, valor):
+    """
+    Verifica se a escolaridade é válida (Ensino Médio Completo ou superior).
+    Retorna True se a escolaridade passar, False caso contrário.
+    Args:
+        valor (str): Valor da escolaridade a ser avaliado.
+        logger (logging.Logger, optional): Logger para registrar informações. Default é None.
+    Returns:
+        bool: False se a escolaridade passar, True caso contrário.
+    """
+    if not isinstance(valor, str) or pd.isnull(valor) or valor.strip() == "":
+        return False
+    valor = normalize_text(valor).lower()
+    if "fundamental" in valor:
+        return True
+    return False
+
+
+def calcula_criterios_descarte(logger, df, cidades):
+    """
+    Calcula os critérios de descarte para os registros no DataFrame.
+    Adiciona colunas indicando os registros que devem ser descartados com base em critérios específicos.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): DataFrame contendo os dados a serem processados.
+    Returns:
+        pd.DataFrame: DataFrame atualizado com as colunas de critérios de descarte.
+    """
+    logger.debug("Calculando 'Descarte Telefone Invalido'.")
+    df['Descarte Cidade'] = df['Cidade'].apply(
+        lambda x: not any([c in clean_text(x).lower() if x else True for c in cidades]))
+    df['Descarte Telefone Invalido'] = df['Telefone Limpo'].isin(["", None,])
+    logger.debug("Calculando 'Descarte Contagem CPF'.")
+    df['Descarte Contagem CPF'] = df['Contagem CPF'].apply(lambda x: x != 1)
+    logger.debug("Calculando 'Descarte Contagem Telefone'.")
+    df['Descarte Contagem Telefone'] = df['Contagem Telefone'].apply(
+        lambda x: x != 1)
+    logger.debug("Calculando 'Descarte Idade'.")
+    df["Descarte Idade"] = df["Idade Limpo"].map(
+        lambda x: filtra_idade(logger, x) if "Idade Limpo" in df.columns else None)
+    logger.debug("Calculando 'Descarte Escolaridade'.")
+    df["Descarte Escolaridade"] = df["Escolaridade Limpo"].map(
+        lambda x: filtra_escolaridade(logger, x) if "Escolaridade Limpo" in df.columns else None)
+    return df
+
+
+def exclui_nao_recomendados(logger, df):
+    cols = ["Descarte Cidade", "Descarte Telefone Invalido", "Descarte Contagem CPF",
+            "Descarte Contagem Telefone", "Descarte Idade", "Descarte Escolaridade",
+            "Descarte Atendimento Ativo", "Descarte Sucesso 30 Dias", "Descarte 7 Dias",
+            "Descarte Visto Recentemente"]
+
+    inf = "Descarte de Leads:\n"
+
+    # usa só colunas que existem
+    cols_validas = [c for c in cols if c in df.columns]
+
+    for col in cols_validas:
+        df[col] = df[col].fillna(False).astype(bool)
+        inf += f"{col.upper():<30}{int(df[col].sum()):>10}\n"
+
+    # remove leads que tenham QUALQUER descarte = True
+    if cols_validas:
+        df = df[~df[cols_validas].any(axis=1)]
+
+    logger.debug(inf)
+    return df
+
+
+def bloqueio_historico(relatorio, referencia):
+    """
+    Calcula o status de bloqueio de cada tratativa em relação à data de referência.
+    Args:
+        relatorio (pd.DataFrame): Tratativas com as colunas 'MOTIVO ', 'DATA TRATATIVA' e 'FLAG FINALIZADO '.
+        referencia (pd.Timestamp): Data de referência da execução.
+    Returns:
+        np.ndarray: Status ('Em Atendimento', 'Agendado 30 Dias', '7 Dias' ou 'Liberado').
+    """
+    data = relatorio["DATA TRATATIVA"]
+    limite_30_dias = referencia - pd.Timedelta(days=30)
+    limite_7_dias = referencia - pd.Timedelta(days=7)
+    return np.select(
+        [
+            (relatorio['FLAG FINALIZADO '] != 1).to_numpy(dtype=bool),
+            ((relatorio['MOTIVO '] == 'Contato COM Sucesso') &
+             (data >= limite_30_dias)).to_numpy(dtype=bool),
+            (data >= limite_7_dias).to_numpy(dtype=bool),
+        ],
+        ['Em Atendimento', 'Agendado 30 Dias', '7 Dias'],
+        default='Liberado'
+    )
+
+
+def get_history_blocks(logger, leads, input_path, referencia=None, atualiza=True):
+    """
+    Inclui nos leads os bloqueios de histórico com base nas tratativas do R&S.
+    O relatório alimenta incrementalmente um índice local com a última tratativa por telefone,
+    e apenas os telefones do lote atual são consultados. O status é calculado na consulta em
+    relação à data de referência da execução.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        leads (pd.DataFrame): DataFrame com a coluna 'Telefone Limpo'.
+        input_path (str): Pasta onde está o relatório do R&S.
+        referencia (datetime, opcional): Data de referência para as janelas de 7 e 30 dias. Padrão é agora.
+        atualiza (bool): Se False, apenas consulta o índice, sem verificar o relatório (ex.: a partir
+            do segundo bloco no processamento em blocos).
+    Returns:
+        pd.DataFrame: Leads com as colunas de descarte de histórico.
+    """
+    referencia = pd.Timestamp.today() if referencia is None else pd.Timestamp(referencia)
+    caminho_relatorio = input_path + "/Recursos Humanos - Analitico Casos.xlsx"
+    conexao = abre_indice(config["indice_historico_path"])
+    try:
+        if atualiza:
+            logger.info(
+                "Atualizando o histórico do R&S (isso pode levar um tempo)."
+            )
+            atualiza_indice(logger, conexao, caminho_relatorio, limpa_telefone_lote,
+                            config["margem_historico_dias"],
+                            config.get("reconstrucao_historico_dias", 7), referencia.to_pydatetime())
+            logger.info("Processando o histórico do R&S.")
+        relatorio = consulta_indice(
+            conexao, leads['Telefone Limpo'].dropna().unique())
+    finally:
+        conexao.close()
+
+    # O índice já possui uma única tratativa (a mais recente) por telefone
+    status = bloqueio_historico(relatorio, referencia)
+    relatorio['Descarte Atendimento Ativo'] = status == 'Em Atendimento'
+    relatorio['Descarte Sucesso 30 Dias'] = status == 'Agendado 30 Dias'
+    relatorio['Descarte 7 Dias'] = status == '7 Dias'
+
+    relatorio = relatorio[
+        [
+            'Telefone Limpo',
+            'Descarte Atendimento Ativo',
+            'Descarte Sucesso 30 Dias',
+            'Descarte 7 Dias'
+        ]
+    ]
+
+    logger.debug("Mesclando com o DataFrame de leads.")
+
+    leads = pd.merge(leads, relatorio, on='Telefone Limpo', how='left')
+
+    for col in [
+        'Descarte Atendimento Ativo',
+        'Descarte Sucesso 30 Dias',
+        'Descarte 7 Dias'
+    ]:
+        leads[col] = leads[col].fillna(False)
+
+    return leads
+
+
+def get_seen_blocks(logger, leads, execucao, referencia=None, parametros=None):
+    """
+    Marca os leads cujo CPF ou telefone já foi visto em outra execução nos últimos
+    config["vistos"]["dias"] dias e registra as chaves do lote atual na base de chaves vistas.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        leads (pd.DataFrame): DataFrame com as colunas 'CPF Limpo', 'Telefone Limpo' e 'Fonte Limpa'.
+        execucao (str): Identificador da execução (data e turno). Reexecuções com o mesmo
+            identificador não marcam os leads registrados por elas mesmas.
+        referencia (datetime, opcional): Data de referência da execução. Padrão é agora.
+        parametros (dict, opcional): Parâmetros da base. Padrão é config["vistos"].
+    Returns:
+        pd.DataFrame: Leads com a coluna 'Descarte Visto Recentemente'.
+    """
+    parametros = parametros or config["vistos"]
+    referencia = pd.Timestamp.today() if referencia is None else pd.Timestamp(referencia)
+    data = referencia.strftime("%Y-%m-%d")
+    limite = (referencia - pd.Timedelta(days=parametros["dias"])).strftime("%Y-%m-%d")
+    caminho_filtro = parametros["path"] + ".bloom.npz"
+    leads['Descarte Visto Recentemente'] = False
+    conexao = abre_vistos(parametros["path"])
+    try:
+        filtro = None
+        if parametros["filtro_bloom"]:
+            filtro = carrega_filtro(logger, conexao, caminho_filtro,
+                                    parametros["bits_bloom"], parametros["hashes_bloom"])
+        for tipo, col in (("cpf", "CPF Limpo"), ("telefone", "Telefone Limpo")):
+            # Primeira ocorrência de cada chave no lote (leads já ordenados por data)
+            primeiras = leads.loc[leads[col].notna() & (leads[col] != ""), [col, 'Fonte Limpa']]
+            primeiras = primeiras.drop_duplicates(col)
+            if parametros["dias"] > 0:
+                vistos = consulta_vistos(conexao, tipo, primeiras[col], execucao, limite, filtro)
+                leads['Descarte Visto Recentemente'] |= leads[col].isin(vistos)
+                logger.debug(f"Chaves de {tipo} vistas recentemente: {len(vistos)}")
+            registra_vistos(conexao, tipo, primeiras[col], primeiras['Fonte Limpa'],
+                            data, execucao, filtro)
+        conexao.commit()
+        if filtro is not None:
+            filtro.salva(caminho_filtro, versao_vistos(conexao))
+    finally:
+        conexao.close()
+    logger.info(
+        f"Leads vistos nos últimos {parametros['dias']} dias: {int(leads['Descarte Visto Recentemente'].sum())}")
+    return leads
+
+
+def fmt_descarte(descarte):
+    return descarte.replace("Descarte ", "").replace("Contagem", "Ctg").replace("Telefone", "Tel.").replace("Atendimento", "Ctt").replace("Recentemente", "Rec.")
+
+
+def cubo_descartes(logger, df, colunas_descartes):
+    """
+    Agrega os leads por cidade, fonte e primeiro critério de descarte em uma única passada:
+    o primeiro critério de cada lead é a primeira coluna verdadeira da matriz de descartes (argmax).
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): Leads com as colunas 'Cidade', 'Fonte Limpa' e de descarte.
+        colunas_descartes (list[str]): Colunas de descarte, na ordem de prioridade.
+    Returns:
+        pd.DataFrame: Colunas 'Cidade', 'Fonte Limpa', 'Ordem Descarte' (posição do critério,
+            vazia para leads limpos), 'Descarte' (nome do critério, vazio para leads limpos) e 'Leads'.
+    """
+    colunas = [c for c in colunas_descartes if c in df.columns]
+    matriz = df[colunas].eq(True).to_numpy()
+    ordem = np.full(len(df), np.nan)
+    if colunas:
+        descartado = matriz.any(axis=1)
+        ordem[descartado] = matriz[descartado].argmax(axis=1) + 1
+    cubo = pd.DataFrame({
+        'Cidade': df['Cidade'].to_numpy(),
+        'Fonte Limpa': df['Fonte Limpa'].to_numpy(),
+        'Ordem Descarte': ordem,
+    }).groupby(['Cidade', 'Fonte Limpa', 'Ordem Descarte'], dropna=False).size().reset_index(name='Leads')
+    nomes = {i: fmt_descarte(c) for i, c in enumerate(colunas, start=1)}
+    cubo.insert(3, 'Descarte', cubo['Ordem Descarte'].map(nomes))
+    cubo['Ordem Descarte'] = cubo['Ordem Descarte'].astype("Int64")
+    logger.debug(f"Tabela de descartes com {len(cubo)} linhas para {len(df)} leads")
+    return cubo
+
+
+def soma_cubos(logger, cubos):
+    """
+    Combina as tabelas agregadas de descartes de vários blocos de leads (ver cubo_descartes),
+    somando os leads de cada combinação de cidade, fonte e critério de descarte.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        cubos (list[pd.DataFrame]): Tabelas agregadas de cada bloco.
+    Returns:
+        pd.DataFrame: Tabela agregada do conjunto dos blocos, nas mesmas colunas.
+    """
+    chaves = ['Cidade', 'Fonte Limpa', 'Ordem Descarte', 'Descarte']
+    cubo = pd.concat(cubos, ignore_index=True).groupby(
+        chaves, dropna=False)['Leads'].sum().reset_index()
+    logger.debug(f"Tabela de descartes com {len(cubo)} linhas a partir de {len(cubos)} blocos")
+    return cubo
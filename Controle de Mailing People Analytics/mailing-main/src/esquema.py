@@ -0,0 +1,110 @@
+import pandas as pd
+
+
+# Tipos das colunas da base final, conforme schema.md (Texto, Número, Data, Data/Hora, Booleano).
+# Exceções: 'Data Form' guarda também o horário, 'Idade' e 'Flag Cvortex' são gravadas como
+# texto porque chegam em formato livre ('25 anos') e como 's'/'n', respectivamente, e 'Idade Limpo'
+# é gravada como texto porque valida_idade devolve '+18'/'<18' quando o layout só pergunta a maioridade
+TIPOS_COLUNAS = {
+    # Identificação e dados pessoais
+    "Data Form": "Data/Hora",
+    "Nome": "Texto",
+    "Nome Limpo": "Texto",
+    "CPF": "Texto",
+    "CPF Limpo": "Texto",
+    "Idade": "Texto",
+    "Idade Limpo": "Texto",
+    "Escolaridade": "Texto",
+    "Escolaridade Limpo": "Texto",
+    # Contato
+    "Telefone": "Texto",
+    "Telefone 2": "Texto",
+    "Telefone Limpo": "Texto",
+    "Telefone 2 Limpo": "Texto",
+    "Email": "Texto",
+    "Email Limpo": "Texto",
+    # Localização
+    "Endereco": "Texto",
+    "Endereco Limpo": "Texto",
+    "Cidade de Origem": "Texto",
+    "Cidade de Origem Limpo": "Texto",
+    "Cidade da Vaga": "Texto",
+    "Cidade da Vaga Limpo": "Texto",
+    "Cidade": "Texto",
+    # Informações de negócio / recrutamento
+    "Cargo": "Texto",
+    "Experiência Relevante": "Texto",
+    "Modalidade da Entrevista": "Texto",
+    "Turno": "Texto",
+    "Fonte": "Texto",
+    "Fonte Limpa": "Texto",
+    "Codigo Fonte": "Texto",
+    "Flag Cvortex": "Texto",
+    # Indicação
+    "Matricula Indicador": "Texto",
+    "Matricula Indicador Limpo": "Texto",
+    "Nome Indicador": "Texto",
+    "Nome Indicador Limpo": "Texto",
+    # Datas e metadados de execução
+    "Data Captacao": "Data",
+    "Datetime de Execução": "Data/Hora",
+    "Data do Exame": "Data",
+    "Planilha": "Texto",
+    "Prefixo": "Texto",
+    # Controles e contagens
+    "Contagem CPF": "Número",
+    "Contagem Telefone": "Número",
+    # Flags de descarte
+    "Descarte Cidade": "Booleano",
+    "Descarte Telefone Invalido": "Booleano",
+    "Descarte Contagem CPF": "Booleano",
+    "Descarte Contagem Telefone": "Booleano",
+    "Descarte Idade": "Booleano",
+    "Descarte Escolaridade": "Booleano",
+    "Descarte Atendimento Ativo": "Booleano",
+    "Descarte Sucesso 30 Dias": "Booleano",
+    "Descarte 7 Dias": "Booleano",
+    "Descarte Visto Recentemente": "Booleano",
+}
+
+# Formatos das colunas de data gravadas como texto pelo pipeline
+FORMATOS_DATA = {
+    "Data Captacao": "%d/%m/%Y",
+    "Datetime de Execução": "%Y-%m-%d",
+}
+
+
+def _como_texto(valor):
+    # Números inteiros (inclusive float64 de colunas numéricas com nulos) sem o ".0"
+    if valor is None or isinstance(valor, str) or pd.isna(valor):
+        return valor
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def prepara_tipos(df):
+    """
+    Converte as colunas do DataFrame para os tipos de TIPOS_COLUNAS (datas gravadas como
+    texto, inteiros com valores nulos, flags booleanas e textos com valores numéricos, como
+    as idades de 'Idade Limpo' junto de '+18'/'<18').
+    Args:
+        df (pd.DataFrame): Leads a serem gravados.
+    Returns:
+        pd.DataFrame: Cópia rasa do DataFrame com as colunas convertidas.
+    """
+    df = df.copy(deep=False)
+    for coluna, tipo in TIPOS_COLUNAS.items():
+        if coluna not in df.columns:
+            continue
+        if tipo in ("Data", "Data/Hora"):
+            valores = pd.to_datetime(df[coluna], format=FORMATOS_DATA.get(coluna),
+                                     errors="coerce")
+            df[coluna] = valores.dt.date if tipo == "Data" else valores
+        elif tipo == "Número":
+            df[coluna] = pd.to_numeric(df[coluna], errors="coerce").round().astype("Int64")
+        elif tipo == "Booleano":
+            df[coluna] = df[coluna].astype("boolean")
+        elif pd.api.types.infer_dtype(df[coluna], skipna=True) not in ("string", "empty"):
+            df[coluna] = df[coluna].map(_como_texto).astype(object)
+    return df
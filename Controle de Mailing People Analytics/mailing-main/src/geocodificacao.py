@@ -0,0 +1,192 @@
+import sqlite3
+import threading
+import time
+import os
+
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from config import config
+from normalizacao import normalize_text
+
+
+class BackendNominatim:
+    """
+    Backend de geocodificação que consulta a API Nominatim do OpenStreetMap.
+    A URL é configurável para permitir apontar para um servidor local de testes.
+    Retorna None quando o endereço não é encontrado e lança exceção em falhas de rede,
+    para que falhas não sejam gravadas no cache.
+    """
+
+    def __init__(self, url="https://nominatim.openstreetmap.org/search", timeout=10):
+        self.url = url
+        self.timeout = timeout
+        # Importado aqui: o requests só é necessário quando a API é consultada
+        import requests
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "Mozilla/5.0 (compatible; MyApp/1.0)"
+
+    def __call__(self, endereco: str) -> Optional[str]:
+        params = {
+            "q": endereco,
+            "format": "json",
+            "addressdetails": 1,
+            "limit": 1
+        }
+        response = self.session.get(
+            self.url, params=params, timeout=self.timeout, verify=False)
+        response.raise_for_status()
+        result = response.json()
+        return result[0].get("display_name", None) if result else None
+
+
+class BackendOffline:
+    """
+    Backend de geocodificação sem rede, baseado em um dicionário de endereço
+    normalizado para display_name (ex.: fixture de testes).
+    """
+
+    def __init__(self, enderecos: Dict[str, Optional[str]]):
+        self.enderecos = {normaliza_endereco(k): v for k, v in enderecos.items()}
+
+    def __call__(self, endereco: str) -> Optional[str]:
+        return self.enderecos.get(normaliza_endereco(endereco))
+
+
+class LimiteRequisicoes:
+    """
+    Limita a quantidade de requisições por segundo compartilhada entre as threads.
+    """
+
+    def __init__(self, requisicoes_por_segundo):
+        self.intervalo = 1 / requisicoes_por_segundo if requisicoes_por_segundo else 0
+        self.proxima = 0.0
+        self.lock = threading.Lock()
+
+    def aguarda(self):
+        with self.lock:
+            agora = time.monotonic()
+            espera = self.proxima - agora
+            self.proxima = max(agora, self.proxima) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+def normaliza_endereco(endereco: str) -> str:
+    """
+    Normaliza um endereço para uso como chave de cache e deduplicação.
+    Args:
+        endereco (str): Endereço informado.
+    Returns:
+        str: Endereço sem acentuação, pontuação e espaços repetidos, em minúsculas.
+    """
+    return normalize_text(str(endereco)).lower()
+
+
+def abre_cache(caminho):
+    """
+    Abre (criando se necessário) o cache SQLite de geocodificação.
+    Args:
+        caminho (str): Caminho do arquivo SQLite.
+    Returns:
+        sqlite3.Connection: Conexão com o cache.
+    """
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS geocodificacao ("
+        "endereco TEXT PRIMARY KEY, display_name TEXT, atualizado_em REAL NOT NULL)")
+    return conexao
+
+
+def consulta_cache(conexao, chaves, ttl_dias):
+    """
+    Busca no cache os endereços ainda dentro do prazo de validade.
+    Args:
+        conexao (sqlite3.Connection): Conexão com o cache.
+        chaves (list): Endereços normalizados.
+        ttl_dias (float): Validade dos registros em dias.
+    Returns:
+        dict: Mapeamento de endereço normalizado para display_name (ou None).
+    """
+    limite = time.time() - ttl_dias * 86400
+    encontrados = {}
+    for inicio in range(0, len(chaves), 500):
+        lote = chaves[inicio:inicio + 500]
+        marcadores = ",".join("?" * len(lote))
+        for endereco, display_name in conexao.execute(
+                f"SELECT endereco, display_name FROM geocodificacao "
+                f"WHERE atualizado_em >= ? AND endereco IN ({marcadores})",
+                [limite, *lote]):
+            encontrados[endereco] = display_name
+    return encontrados
+
+
+def padroniza_enderecos_lote(logger, enderecos: pd.Series,
+                             backend: Optional[Callable[[str], Optional[str]]] = None,
+                             parametros: Optional[dict] = None) -> pd.Series:
+    """
+    Padroniza uma coluna de endereços de uma vez, consultando cada endereço distinto
+    no máximo uma vez. Resultados são guardados em um cache SQLite com validade (TTL)
+    e as consultas pendentes são feitas em um pool de threads com limite de requisições.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        enderecos (pd.Series): Série com os endereços originais.
+        backend (Callable, opcional): Função que recebe o endereço e retorna o display_name.
+            Padrão é o BackendNominatim configurado.
+        parametros (dict, opcional): Parâmetros de geocodificação. Padrão é config["geocodificacao"].
+    Returns:
+        pd.Series: Série com o endereço padronizado ou None, com o mesmo índice da entrada.
+    """
+    parametros = parametros or config["geocodificacao"]
+    # Comparação feita na série preenchida: `enderecos != ""` falha em células pd.NA
+    preenchidos = enderecos.notna() & enderecos.fillna("").ne("").astype(bool)
+    chaves = enderecos[preenchidos].map(normaliza_endereco)
+    # Um endereço original representativo por chave normalizada
+    originais = enderecos[preenchidos].groupby(chaves.to_numpy()).first()
+    logger.debug(
+        f"Geocodificação: {len(originais)} endereços distintos em {preenchidos.sum()} linhas")
+    if len(originais) == 0:
+        return pd.Series(None, index=enderecos.index, dtype=object)
+    conexao = abre_cache(parametros["cache_path"])
+    try:
+        resultados = consulta_cache(
+            conexao, list(originais.index), parametros["ttl_dias"])
+        pendentes = [k for k in originais.index if k not in resultados]
+        logger.debug(
+            f"Geocodificação: {len(resultados)} endereços no cache, {len(pendentes)} a consultar")
+        if pendentes:
+            if backend is None:
+                backend = BackendNominatim(
+                    parametros["url"], parametros["timeout"])
+            limite = LimiteRequisicoes(parametros["requisicoes_por_segundo"])
+
+            def consulta(chave):
+                limite.aguarda()
+                try:
+                    return chave, backend(originais[chave]), True
+                except Exception as e:
+                    logger.debug(f"Erro na solicitação: {e}")
+                    return chave, None, False
+
+            with ThreadPoolExecutor(max_workers=parametros["workers"]) as executor:
+                consultados = list(executor.map(consulta, pendentes))
+            agora = time.time()
+            conexao.executemany(
+                "INSERT OR REPLACE INTO geocodificacao VALUES (?, ?, ?)",
+                [(chave, display_name, agora)
+                 for chave, display_name, sucesso in consultados if sucesso])
+            conexao.commit()
+            resultados.update(
+                {chave: display_name for chave, display_name, _ in consultados})
+    finally:
+        conexao.close()
+    padronizados = np.full(len(enderecos), None, dtype=object)
+    padronizados[preenchidos.to_numpy(dtype=bool)] = [
+        resultados.get(chave) for chave in chaves]
+    return pd.Series(padronizados, index=enderecos.index, dtype=object)
@@ -0,0 +1,252 @@
+import sqlite3
+import os
+
+import pandas as pd
+
+from datetime import datetime, timedelta
+from planilhas import itera_linhas
+from snapshot import hash_arquivo
+
+
+# Colunas do relatório de tratativas do R&S utilizadas nos bloqueios de histórico
+COLUNAS_HISTORICO = [
+    'TELEFONE CONTATO',
+    'DATA TRATATIVA',
+    'MOTIVO ',
+    'FLAG FINALIZADO ',
+    'FLAG ULTIMA TRATATIVA',
+    'FILA',
+]
+
+
+def _como_data(valor):
+    """
+    Converte o valor da célula de data para datetime (ou None se não for possível).
+    """
+    if isinstance(valor, datetime) or valor is None:
+        return valor
+    data = pd.to_datetime(valor, errors="coerce")
+    return None if pd.isna(data) else data.to_pydatetime()
+
+
+def le_tratativas(logger, caminho, aba="Tratativas", linha_cabecalho=7, a_partir_de=None):
+    """
+    Lê o relatório de tratativas do R&S linha a linha (engine de config["engine_excel"]), mantendo apenas
+    as colunas necessárias e as linhas com 'FLAG ULTIMA TRATATIVA' igual a 1 e 'FILA' diferente
+    de "Receptivo". A redução para a tratativa mais recente por telefone é feita durante a
+    leitura, de forma que a memória ocupada depende da quantidade de telefones distintos e
+    não do tamanho da planilha.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        caminho (str): Caminho do arquivo Excel do relatório.
+        aba (str): Nome da aba das tratativas.
+        linha_cabecalho (int): Linha (1-indexada) do cabeçalho da tabela.
+        a_partir_de (datetime, opcional): Se informado, ignora tratativas com data anterior.
+    Returns:
+        pd.DataFrame: Última tratativa por telefone, com as colunas 'TELEFONE CONTATO' (bruto),
+            'ORDEM', 'DATA TRATATIVA', 'MOTIVO ', 'FLAG FINALIZADO ' e 'FILA'.
+    """
+    linhas = itera_linhas(logger, caminho, aba, linha_cabecalho)
+    try:
+        cabecalho = next(linhas, ())
+        posicoes = {}
+        for i, nome in enumerate(cabecalho):
+            if nome in COLUNAS_HISTORICO and nome not in posicoes:
+                posicoes[nome] = i
+        faltantes = [c for c in COLUNAS_HISTORICO if c not in posicoes]
+        if faltantes:
+            raise KeyError(f"Colunas não encontradas no relatório: {faltantes}")
+        i_tel, i_data, i_motivo, i_finalizado, i_ultima, i_fila = (
+            posicoes[c] for c in COLUNAS_HISTORICO)
+        ultimas = {}
+        total = 0
+        for linha in linhas:
+            total += 1
+            if len(linha) <= max(posicoes.values()):
+                continue
+            if linha[i_ultima] != 1 or linha[i_fila] == "Receptivo":
+                continue
+            telefone = linha[i_tel]
+            if telefone is None or telefone == "":
+                continue
+            data = _como_data(linha[i_data])
+            if a_partir_de is not None and (data is None or data < a_partir_de):
+                continue
+            atual = ultimas.get(telefone)
+            # Em caso de empate, mantém a primeira ocorrência (mesmo critério do idxmax)
+            if atual is None or (data is not None and (atual[1] is None or data > atual[1])):
+                ultimas[telefone] = (
+                    total, data, linha[i_motivo], linha[i_finalizado], linha[i_fila])
+    finally:
+        linhas.close()
+    logger.info(
+        f"Arquivo lido com {total} linhas ({len(ultimas)} telefones distintos).")
+    relatorio = pd.DataFrame(
+        [(telefone, *valores) for telefone, valores in ultimas.items()],
+        columns=['TELEFONE CONTATO', 'ORDEM', 'DATA TRATATIVA',
+                 'MOTIVO ', 'FLAG FINALIZADO ', 'FILA'])
+    relatorio['DATA TRATATIVA'] = pd.to_datetime(relatorio['DATA TRATATIVA'])
+    return relatorio
+
+
+def ultima_tratativa_por_telefone(relatorio):
+    """
+    Mantém apenas a tratativa mais recente de cada telefone já padronizado. Em caso de
+    empate na data, mantém a que aparece primeiro no relatório.
+    Args:
+        relatorio (pd.DataFrame): Tratativas com as colunas 'Telefone Limpo', 'DATA TRATATIVA' e 'ORDEM'.
+    Returns:
+        pd.DataFrame: Uma linha por telefone.
+    """
+    return relatorio.sort_values(
+        ['DATA TRATATIVA', 'ORDEM'], ascending=[False, True], na_position='last'
+    ).drop_duplicates('Telefone Limpo')
+
+
+# Versão do conteúdo do índice: índices gravados por outra versão são reconstruídos por inteiro
+VERSAO_INDICE = "2"
+
+
+def abre_indice(caminho):
+    """
+    Abre (criando se necessário) o índice local de histórico de contatos, que guarda a
+    última tratativa de cada telefone padronizado.
+    Args:
+        caminho (str): Caminho do arquivo SQLite.
+    Returns:
+        sqlite3.Connection: Conexão com o índice.
+    """
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    # Motivo e flag sem tipo declarado para preservar o tipo original do Excel
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS tratativas ("
+        "telefone TEXT PRIMARY KEY, data_tratativa TEXT, motivo, finalizado, fila)")
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS controle (chave TEXT PRIMARY KEY, valor TEXT)")
+    return conexao
+
+
+def _le_controle(conexao):
+    return dict(conexao.execute("SELECT chave, valor FROM controle"))
+
+
+def _valores_nativos(serie):
+    # sqlite3 não aceita tipos NumPy nem NaN
+    return [None if pd.isna(v) else v for v in serie.tolist()]
+
+
+def atualiza_indice(logger, conexao, caminho, normaliza_telefones, margem_dias=3,
+                    reconstrucao_dias=7, agora=None):
+    """
+    Atualiza o índice de histórico com as tratativas do relatório do R&S (as mesmas da leitura
+    completa: 'FLAG ULTIMA TRATATIVA' igual a 1 e fila diferente de "Receptivo"). O relatório só
+    é lido quando mudou desde a última atualização (tamanho, data de modificação e hash), e
+    apenas as tratativas com 'DATA TRATATIVA' a partir da marca d'água gravada são aplicadas.
+
+    Alterações em tratativas antigas sem nova 'DATA TRATATIVA' (ex.: 'FLAG FINALIZADO ' marcada
+    depois de `margem_dias`) e tratativas removidas do relatório não são vistas pela leitura
+    incremental. Por isso o índice é reconstruído com a leitura completa do relatório quando a
+    última reconstrução tem mais de `reconstrucao_dias` dias (e quando foi gravado por outra
+    versão do índice).
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        conexao (sqlite3.Connection): Conexão com o índice.
+        caminho (str): Caminho do arquivo Excel do relatório.
+        normaliza_telefones (Callable): Função vetorizada de padronização de telefones (logger, serie).
+        margem_dias (int): Dias relidos antes da marca d'água, para tratativas lançadas com atraso.
+        reconstrucao_dias (float): Idade máxima, em dias, da última reconstrução completa.
+        agora (datetime, opcional): Data atual, para comparar com a última reconstrução.
+    """
+    agora = agora or datetime.now()
+    controle = _le_controle(conexao)
+    if controle and controle.get("versao") != VERSAO_INDICE:
+        logger.info("Índice de histórico gravado por outra versão. Reconstruindo.")
+        conexao.execute("DELETE FROM tratativas")
+        conexao.execute("DELETE FROM controle")
+        conexao.commit()
+        controle = {}
+    if not os.path.exists(caminho):
+        logger.warning(
+            f"Relatório de histórico '{caminho}' não encontrado. Usando o índice existente.")
+        return
+    stat = os.stat(caminho)
+    conteudo = None
+    if controle.get("tamanho") == str(stat.st_size):
+        if controle.get("mtime_ns") == str(stat.st_mtime_ns):
+            logger.info("Relatório de histórico sem alterações desde a última leitura.")
+            return
+        conteudo = hash_arquivo(caminho)
+        if controle.get("hash") == conteudo:
+            conexao.execute(
+                "INSERT OR REPLACE INTO controle VALUES ('mtime_ns', ?)", (str(stat.st_mtime_ns),))
+            conexao.commit()
+            logger.info("Relatório de histórico sem alterações desde a última leitura.")
+            return
+    marca = controle.get("marca_dagua")
+    reconstrucao = controle.get("reconstrucao")
+    completa = (marca is None or reconstrucao is None or
+                agora - datetime.fromisoformat(reconstrucao) > timedelta(days=reconstrucao_dias))
+    if completa:
+        marca, a_partir_de, reconstrucao = None, None, agora.isoformat(sep=' ')
+        logger.info("Reconstruindo o índice de histórico com todas as tratativas do relatório.")
+    else:
+        a_partir_de = datetime.fromisoformat(marca) - timedelta(days=margem_dias)
+        logger.info(
+            f"Atualizando o índice de histórico com tratativas a partir de {a_partir_de}.")
+    relatorio = le_tratativas(logger, caminho, a_partir_de=a_partir_de)
+    relatorio['Telefone Limpo'] = normaliza_telefones(
+        logger, relatorio['TELEFONE CONTATO'])
+    relatorio = relatorio.dropna(subset=['Telefone Limpo'])
+    relatorio = ultima_tratativa_por_telefone(relatorio)
+    datas = relatorio['DATA TRATATIVA'].map(
+        lambda x: None if pd.isna(x) else x.isoformat(sep=' '))
+    if completa:
+        # Substituição na mesma transação das inserções abaixo
+        conexao.execute("DELETE FROM tratativas")
+    # Em caso de mesma data, a tratativa relida substitui a anterior (atualiza flags)
+    conexao.executemany(
+        "INSERT INTO tratativas VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(telefone) DO UPDATE SET data_tratativa = excluded.data_tratativa, "
+        "motivo = excluded.motivo, finalizado = excluded.finalizado, fila = excluded.fila "
+        "WHERE excluded.data_tratativa IS NOT NULL AND (tratativas.data_tratativa IS NULL "
+        "OR excluded.data_tratativa >= tratativas.data_tratativa)",
+        zip(relatorio['Telefone Limpo'], datas,
+            _valores_nativos(relatorio['MOTIVO ']),
+            _valores_nativos(relatorio['FLAG FINALIZADO ']),
+            _valores_nativos(relatorio['FILA'])))
+    nova_marca = relatorio['DATA TRATATIVA'].max()
+    if pd.notna(nova_marca) and (marca is None or nova_marca > datetime.fromisoformat(marca)):
+        marca = nova_marca.isoformat(sep=' ')
+    conexao.executemany(
+        "INSERT OR REPLACE INTO controle VALUES (?, ?)",
+        [("tamanho", str(stat.st_size)), ("mtime_ns", str(stat.st_mtime_ns)),
+         ("hash", conteudo or hash_arquivo(caminho)), ("marca_dagua", marca),
+         ("reconstrucao", reconstrucao), ("versao", VERSAO_INDICE)])
+    conexao.commit()
+    logger.info(f"Índice de histórico atualizado com {len(relatorio)} telefones.")
+
+
+def consulta_indice(conexao, telefones):
+    """
+    Busca no índice a última tratativa de cada telefone informado (tratativas do Receptivo
+    não são indexadas).
+    Args:
+        conexao (sqlite3.Connection): Conexão com o índice.
+        telefones (Iterable[str]): Telefones padronizados do lote atual.
+    Returns:
+        pd.DataFrame: Colunas 'Telefone Limpo', 'DATA TRATATIVA', 'MOTIVO ' e 'FLAG FINALIZADO '.
+    """
+    conexao.execute("CREATE TEMP TABLE IF NOT EXISTS lote (telefone TEXT PRIMARY KEY)")
+    conexao.execute("DELETE FROM lote")
+    conexao.executemany(
+        "INSERT OR IGNORE INTO lote VALUES (?)", ((t,) for t in telefones))
+    linhas = conexao.execute(
+        "SELECT t.telefone, t.data_tratativa, t.motivo, t.finalizado "
+        "FROM tratativas t JOIN lote l ON l.telefone = t.telefone").fetchall()
+    relatorio = pd.DataFrame(
+        linhas, columns=['Telefone Limpo', 'DATA TRATATIVA', 'MOTIVO ', 'FLAG FINALIZADO '])
+    relatorio['DATA TRATATIVA'] = pd.to_datetime(relatorio['DATA TRATATIVA'])
+    return relatorio
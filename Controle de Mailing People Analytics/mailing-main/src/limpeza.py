@@ -0,0 +1,840 @@
+import pandas as pd
+import numpy as np
+import re
+import time
+
+from datetime import datetime
+from typing import Dict, Optional, Union
+from config import config
+from normalizacao import normalize_text, clean_text
+from geocodificacao import padroniza_enderecos_lote
+
+
+def filter_numbers(text: Optional[str]) -> str:
+    """
+    Remove caracteres não numéricos de um texto.
+    Args:
+        text (str): O texto a ser processado.
+    Returns:
+        str: O texto contendo apenas números.
+    """
+    if pd.isna(text):
+        return ""
+    return re.sub(r"\D", "", str(text))
+
+
+def calculate_cpf_digit(cpf: str, weight: int) -> int:
+    """
+    Calcula um dígito verificador de CPF.
+    Args:
+        cpf (str): O CPF em formato de string.
+        weight (int): O peso inicial para o cálculo.
+    Returns:
+        int: O dígito verificador calculado.
+    """
+    total = sum(int(cpf[i]) * (weight - i) for i in range(len(cpf)))
+    return (total * 10 % 11) % 10
+
+
+def valida_cpf(logger, cpf: str) -> Optional[str]:
+    """
+    Valida um número de CPF.
+    Args:
+        cpf (str): O CPF em formato de string.
+    Returns:
+        Optional[str]: O CPF válido ou None se for inválido.
+    """
+    cpf = format_cpf(cpf)
+    if pd.isna(cpf):
+        return None
+    if len(cpf) != 11 or cpf in ["00000000000", "99999999999"]:
+        return None
+    digit1 = calculate_cpf_digit(cpf[:9], 10)
+    digit2 = calculate_cpf_digit(cpf[:10], 11)
+    return cpf if cpf[-2:] == f"{digit1}{digit2}" else None
+
+
+def format_cpf(cpf):
+    """
+    Formata um CPF para o formato padrão com 11 dígitos.
+    Args:
+        cpf (str ou float): O CPF a ser formatado.
+    Returns:
+        str: O CPF formatado.
+    """
+    if pd.isna(cpf) or cpf == "":
+        return None
+    elif isinstance(cpf, str):
+        if filter_numbers(cpf) not in (None, ""):
+            return f"{int(filter_numbers(cpf)):011d}"
+        else:
+            return None
+    else:
+        return f"{int(cpf):011d}"
+
+
+def valida_cpf_lote(logger, cpfs: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de `valida_cpf`, que valida toda a coluna de CPFs de uma vez.
+    Os dígitos verificadores são calculados sobre uma matriz NumPy de dígitos,
+    mantendo as mesmas regras da versão escalar (preenchimento com zeros até 11
+    dígitos e rejeição de "00000000000" e "99999999999").
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        cpfs (pd.Series): Série com os CPFs originais.
+    Returns:
+        pd.Series: Série com o CPF válido ou None, com o mesmo índice da entrada.
+    """
+    valores = cpfs.to_numpy(dtype=object)
+    resultado = np.full(len(valores), None, dtype=object)
+    digitos = np.full(len(valores), "", dtype=object)
+    # Comparação feita pela Series: `valores == ""` falha em células pd.NA
+    preenchidos = ~(pd.isna(valores) | pd.Series(valores, dtype=object).eq("").to_numpy(dtype=bool))
+    for i in np.flatnonzero(preenchidos):
+        cpf = valores[i]
+        if isinstance(cpf, str):
+            digitos[i] = cpf
+        else:
+            digitos[i] = str(int(cpf))
+    digitos = pd.Series(digitos, dtype=object).str.replace(
+        r"\D", "", regex=True)
+    # Dígitos não ASCII (ex.: unicode) seguem pela versão escalar
+    nao_ascii = ~digitos.map(str.isascii).to_numpy(dtype=bool)
+    for i in np.flatnonzero(nao_ascii):
+        resultado[i] = valida_cpf(logger, valores[i])
+    # Equivale a f"{int(cpf):011d}" de format_cpf
+    formatados = digitos.str.lstrip("0").str.zfill(11)
+    candidatos = np.flatnonzero(
+        (digitos != "").to_numpy(dtype=bool) & ~nao_ascii &
+        (formatados.str.len() == 11).to_numpy(dtype=bool) &
+        ~formatados.isin(["00000000000", "99999999999"]).to_numpy(dtype=bool))
+    if len(candidatos) > 0:
+        cpf_formatado = formatados.to_numpy(dtype=object)[candidatos]
+        matriz = np.frombuffer(
+            "".join(cpf_formatado).encode("ascii"), dtype=np.uint8
+        ).reshape(-1, 11).astype(np.int64) - ord("0")
+        digit1 = (matriz[:, :9] @ np.arange(10, 1, -1)) * 10 % 11 % 10
+        digit2 = (matriz[:, :10] @ np.arange(11, 1, -1)) * 10 % 11 % 10
+        confere = (matriz[:, 9] == digit1) & (matriz[:, 10] == digit2)
+        resultado[candidatos[confere]] = cpf_formatado[confere]
+    return pd.Series(resultado, index=cpfs.index, dtype=object)
+
+
+def camel_case(text: str) -> str:
+    """
+    Converte um texto para o formato Camel Case.
+    Args:
+        text (str): O texto a ser convertido.
+    Returns:
+        str: O texto em formato Camel Case.
+    """
+    return " ".join([w.capitalize() for w in text.split(" ")])
+
+
+def limpa_nome(logger, nome: Optional[str]) -> Optional[str]:
+    """
+    Limpa e formata um nome, removendo caracteres especiais e acentuação.
+    Args:
+        nome (str): O nome a ser limpo.
+    Returns:
+        Optional[str]: O nome limpo ou None se o nome estiver vazio.
+    """
+    if pd.isna(nome) or nome == "" or not isinstance(nome, str):
+        return None
+    clean_name = camel_case(normalize_text(nome))
+    return None if clean_name == "" else clean_name
+
+
+def valida_email(logger, email: Optional[str]) -> Optional[str]:
+    """
+    Valida se a string fornecida é um Endereco de e-mail válido.
+    Args:
+        email (Optional[str]): A string a ser validada como e-mail ou None.
+    Returns:
+        Optional[str]: O e-mail se for válido, caso contrário, None.
+    """
+    if pd.isna(email) or email == "":
+        return None
+    # Expressão regular para validar um e-mail
+    email = email.replace(' ', '')
+    regex_email = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    if re.match(regex_email, email):
+        return email.replace(' ', '')
+    else:
+        return None
+
+
+def valida_idade(logger, idade: Union[str, int, datetime, None]) -> Optional[int]:
+    """
+    Valida e converte diferentes formatos de entrada para a coluna idade em anos.
+    Args:
+        idade (Union[str, int, datetime, None]): O elemento da coluna idade.
+    Returns:
+        Optional[int]: A idade em anos ou None se não for possível determinar a idade.
+    """
+    if pd.isna(idade) or idade == "":
+        return None
+    if isinstance(idade, int):
+        return idade if idade <= 120 else None
+    if isinstance(idade, datetime):
+        return datetime.now().year - idade.year
+    if isinstance(idade, str):
+        idade = normalize_text(idade).lower()
+        if idade == "sim":
+            return "+18"
+        if idade == "nao":
+            return "<18"
+        idade = filter_numbers(idade)
+        # Verifica se a string tem até 3 dígitos
+        if idade.isdigit() and len(idade) <= 3:
+            return int(idade) if int(idade) <= 120 else None
+        if idade.isdigit() and len(idade) == 4:
+            return datetime.now().year - int(idade)
+        # Tenta converter para data de nascimento no formato DDMMYYYY ou DDMMYY
+        try:
+            if len(idade) == 8:
+                data_nascimento = datetime.strptime(idade, "%d%m%Y")
+            elif len(idade) == 6:
+                data_nascimento = datetime.strptime(idade, "%d%m%y")
+            else:
+                logger.debug(f"Falha ao converter idade: {idade}")
+                return None
+            return datetime.now().year - data_nascimento.year
+        except ValueError:
+            logger.debug(f"Falha ao converter idade: {idade}")
+            return None
+    return None
+
+
+def limpa_escolaridade(logger, escolaridade: Optional[str]) -> Optional[str]:
+    """
+    Limpa e padroniza a escolaridade.
+    Args:
+        escolaridade (Optional[str]): A escolaridade a ser padronizada.
+    Returns:
+        Optional[str]: A escolaridade padronizada ou None se não for possível determinar a escolaridade.
+    """
+    if pd.isna(escolaridade) or escolaridade == "":
+        return None
+    escolaridade = clean_text(escolaridade)
+    if 'posgraduacao' in escolaridade:
+        return "Pos-Graduação"
+    elif 'mestrado' in escolaridade:
+        return "Mestrado"
+    elif 'doutorado' in escolaridade:
+        return "Doutorado"
+    elif "superior" in escolaridade or "tecnico" in escolaridade or 'graduacao' in escolaridade:
+        if "incompleto" in escolaridade:
+            return "Superior Incompleto"
+        else:
+            return "Superior Completo"
+    elif "medio" in escolaridade:
+        if "incompleto" in escolaridade:
+            return "Ensino Médio Incompleto"
+        else:
+            return "Ensino Médio Completo"
+    elif "fundamental" in escolaridade:
+        if "incompleto" in escolaridade:
+            return "Fundamental Incompleto"
+        else:
+            return "Fundamental Completo"
+    else:
+        return None
+
+
+def compila_fontes(fontes):
+    """
+    Compila o mapping de fontes em uma única expressão regular. Cada fonte vira um ramo
+    de alternância com lookahead, testados na ordem do dicionário, mantendo a prioridade
+    de "primeira fonte que casar vence".
+    Args:
+        fontes (dict): Dicionário onde as chaves são os valores mapeados e os valores são listas de substrings.
+    Returns:
+        Callable[[str], str]: Função que recebe o texto limpo e retorna a fonte mapeada ou "".
+    """
+    chaves = list(fontes.keys())
+    ramos = [
+        f"(?=.*?(?:{'|'.join(re.escape(sub) for sub in substrings)}))(?P<f{i}>)"
+        for i, substrings in enumerate(fontes.values()) if substrings
+    ]
+    if not ramos:
+        return lambda valor_limpo: ""
+    padrao = re.compile(f"^(?:{'|'.join(ramos)})", re.DOTALL)
+
+    def classificar(valor_limpo):
+        resultado = padrao.match(valor_limpo)
+        return chaves[int(resultado.lastgroup[1:])] if resultado else ""
+    return classificar
+
+
+def avisa_fontes_nao_mapeadas(logger, nao_mapeadas):
+    """
+    Informa, em um único aviso, as fontes não mapeadas e a quantidade de leads de cada uma.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        nao_mapeadas (dict): Fonte não mapeada -> quantidade de leads.
+    """
+    if nao_mapeadas:
+        ordenadas = sorted(nao_mapeadas.items(), key=lambda x: x[1], reverse=True)
+        logger.warning(
+            f"Fontes não mapeadas ({len(ordenadas)}): "
+            + ", ".join(f"'{valor}' ({qtd})" for valor, qtd in ordenadas))
+
+
+def map_fonte(logger, df, fonte_col, fontes, nao_mapeadas=None):
+    """
+    Mapeia os valores de uma coluna do DataFrame com base em um dicionário de fontes.
+    A classificação é feita uma única vez por valor distinto da coluna, e as fontes não
+    mapeadas são informadas em um único aviso com a quantidade de leads de cada uma.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): DataFrame contendo os dados.
+        fonte_col (str): Nome da coluna do DataFrame que será mapeada.
+        fontes (dict): Dicionário onde as chaves são os valores mapeados e os valores são listas de substrings.
+        nao_mapeadas (dict, opcional): Acumulador das fontes não mapeadas (fonte -> leads) dos
+            blocos anteriores, no processamento em blocos. Quando informado, as fontes não
+            mapeadas são somadas a ele em vez de avisadas (ver avisa_fontes_nao_mapeadas).
+    Returns:
+        pd.DataFrame: DataFrame atualizado com uma nova coluna 'Fonte Limpa' contendo os valores mapeados.
+    """
+    classificar = compila_fontes(fontes)
+    logger.debug(f"Aplicando o mapeamento à coluna '{fonte_col}'.")
+    codigos, valores = pd.factorize(df[fonte_col])
+    quantidades = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+    resultados = np.full(len(valores) + 1, "", dtype=object)
+    avisar = nao_mapeadas is None
+    nao_mapeadas = {} if avisar else nao_mapeadas
+    for i, valor in enumerate(valores):
+        if valor.strip() == "":
+            continue
+        resultados[i] = classificar(clean_text(valor))
+        if resultados[i] == "":
+            nao_mapeadas[valor] = nao_mapeadas.get(valor, 0) + int(quantidades[i])
+    if avisar:
+        avisa_fontes_nao_mapeadas(logger, nao_mapeadas)
+    # O código -1 (valores nulos) aponta para a última posição, que fica vazia
+    df["Fonte Limpa"] = pd.Series(
+        resultados[codigos].tolist(), index=df.index)
+    logger.debug("Mapeamento concluído com sucesso.")
+    return df
+
+
+def padronizar_endereco(logger, endereco: Optional[str]) -> Optional[str]:
+    """
+    Padroniza um Endereco usando a API Nominatim do OpenStreetMap.
+    Args:
+        endereco (Optional[str]): A string do Endereco a ser padronizado.
+    Returns:
+        Optional[dict]: Um dicionário com o Endereco padronizado ou None se a entrada for None ou inválida.
+    """
+    if pd.isna(endereco) or endereco == "":
+        return None
+    url = "https://nominatim.openstreetmap.org/search"
+    params = {
+        "q": endereco,
+        "format": "json",
+        "addressdetails": 1,
+        "limit": 1
+    }
+    headers = {
+        "User-Agent": "Mozilla/5.0 (compatible; MyApp/1.0)"
+    }
+    # Importado apenas aqui: o requests só é carregado quando um endereço é consultado
+    import requests
+
+    try:
+        response = requests.get(
+            url, params=params, headers=headers, verify=False)
+        if response.status_code == 200:
+            result = response.json()
+            if result:
+                return result[0].get("display_name", None)
+            else:
+                return None
+        else:
+            logger.debug(f"Erro na solicitação: {response.status_code}")
+            return None
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"Erro na solicitação: {e}")
+        return None
+
+
+def limpar_telefone(logger, telefone: Optional[str]) -> Optional[str]:
+    """
+    Limpa e padroniza um número de telefone.
+    Args:
+        telefone (Optional[str]): O número de telefone a ser padronizado.
+    Returns:
+        Optional[str]: O número de telefone padronizado ou None se não for possível determinar o telefone.
+    """
+    if pd.isna(telefone) or telefone == "":
+        return None
+    elif isinstance(telefone, float):
+        telefone = str(int(telefone))
+    else:
+        telefone = filter_numbers(telefone).lstrip('0')
+    if len(telefone) < 8 or len(telefone) > 13:
+        return None
+    if len(telefone) == 8:
+        if int(telefone[0]) < 6:
+            return "34" + telefone
+        return "349" + telefone
+    if len(telefone) == 9:
+        return "34" + telefone
+    if len(telefone) == 10:
+        if telefone.startswith("55"):
+            if int(telefone[2]) < 6:
+                return "34" + telefone[2:]
+            return "349" + telefone[2:]
+        if int(telefone[2]) < 6:
+            return telefone
+        return telefone[:2] + "9" + telefone[2:]
+    if len(telefone) == 11:
+        if telefone.startswith("55"):
+            return "34" + telefone[2:]
+        return telefone
+    if len(telefone) == 12 and telefone.startswith("55"):
+        if int(telefone[4]) < 6:
+            return telefone[2:]
+        return telefone[2:4] + "9" + telefone[4:]
+    if len(telefone) == 13 and telefone.startswith("55"):
+        return telefone[2:]
+    return None
+
+
+def limpa_telefone_lote(logger, telefones: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de `limpar_telefone`, que padroniza toda a coluna de telefones de uma vez.
+    As regras por quantidade de dígitos (8 a 13), prefixo "55", DDD padrão "34" e
+    inclusão do "9" de celular são aplicadas com máscaras sobre a coluna inteira.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        telefones (pd.Series): Série com os telefones originais (texto ou float do Excel).
+    Returns:
+        pd.Series: Série com o telefone padronizado ou None, com o mesmo índice da entrada.
+    """
+    valores = telefones.to_numpy(dtype=object)
+    resultado = np.full(len(valores), None, dtype=object)
+    numeros = np.full(len(valores), "", dtype=object)
+    eh_float = np.zeros(len(valores), dtype=bool)
+    # Comparação feita pela Series: `valores == ""` falha em células pd.NA
+    preenchidos = ~(pd.isna(valores) | pd.Series(valores, dtype=object).eq("").to_numpy(dtype=bool))
+    for i in np.flatnonzero(preenchidos):
+        telefone = valores[i]
+        if isinstance(telefone, float):
+            numeros[i] = str(int(telefone))
+            eh_float[i] = True
+        else:
+            numeros[i] = str(telefone)
+    numeros = pd.Series(numeros, dtype=object)
+    # Floats do Excel não passam por filter_numbers nem pela remoção de zeros à esquerda
+    numeros = numeros.where(
+        eh_float, numeros.str.replace(r"\D", "", regex=True).str.lstrip("0"))
+    # Valores fora do padrão ASCII (ex.: float negativo, dígitos unicode) seguem pela versão escalar
+    irregulares = preenchidos & ~numeros.str.fullmatch(
+        r"[0-9]*").to_numpy(dtype=bool)
+    for i in np.flatnonzero(irregulares):
+        resultado[i] = limpar_telefone(logger, valores[i])
+    tamanho = numeros.str.len().to_numpy()
+    com_55 = numeros.str.startswith("55").to_numpy(dtype=bool)
+    fixo_0 = numeros.str[0].isin(list("012345")).to_numpy(dtype=bool)
+    fixo_2 = numeros.str[2].isin(list("012345")).to_numpy(dtype=bool)
+    fixo_4 = numeros.str[4].isin(list("012345")).to_numpy(dtype=bool)
+    # Regras na mesma ordem de prioridade de limpar_telefone
+    regras = [
+        (tamanho == 8, fixo_0, lambda t: "34" + t),
+        (tamanho == 8, ~fixo_0, lambda t: "349" + t),
+        (tamanho == 9, True, lambda t: "34" + t),
+        (tamanho == 10, com_55 & fixo_2, lambda t: "34" + t.str[2:]),
+        (tamanho == 10, com_55 & ~fixo_2, lambda t: "349" + t.str[2:]),
+        (tamanho == 10, ~com_55 & fixo_2, lambda t: t),
+        (tamanho == 10, ~com_55 & ~fixo_2,
+         lambda t: t.str[:2] + "9" + t.str[2:]),
+        (tamanho == 11, com_55, lambda t: "34" + t.str[2:]),
+        (tamanho == 11, ~com_55, lambda t: t),
+        (tamanho == 12, com_55 & fixo_4, lambda t: t.str[2:]),
+        (tamanho == 12, com_55 & ~fixo_4,
+         lambda t: t.str[2:4] + "9" + t.str[4:]),
+        (tamanho == 13, com_55, lambda t: t.str[2:]),
+    ]
+    for mascara_tamanho, mascara_regra, regra in regras:
+        linhas = np.flatnonzero(
+            preenchidos & ~irregulares & mascara_tamanho & mascara_regra)
+        if len(linhas) > 0:
+            resultado[linhas] = regra(numeros.iloc[linhas]).to_numpy(
+                dtype=object)
+    return pd.Series(resultado, index=telefones.index, dtype=object)
+
+
+def limpa_matricula(logger, matricula: Optional[str]) -> Optional[str]:
+    """
+    Limpa e padroniza um número de matrícula.
+    Args:
+        matricula (Optional[str]): O número de matrícula a ser padronizado.
+    Returns:
+        Optional[str]: O número de matrícula padronizado ou None se não for possível determinar a matrícula.
+    """
+    if pd.isna(matricula):
+        return None
+    matricula = filter_numbers(matricula)
+    if matricula == "":
+        return None
+    matricula = int(matricula)
+    return f"{matricula}" if matricula > 0 else None
+
+
+def add_date_column(logger, df, column_name="Data"):
+    """
+    Adiciona uma coluna com a data atual ao DataFrame fornecido.
+    Args:
+        df (pd.DataFrame): O DataFrame ao qual a coluna será adicionada.
+        column_name (str): O nome da coluna de data. Padrão é "Data".
+    Returns:
+        pd.DataFrame: O DataFrame atualizado com a nova coluna de data.
+    """
+    today_date = datetime.now().strftime("%d/%m/%Y")
+    # today_date = "04/05/2025"
+    logger.debug(
+        f"Adicionando coluna de data '{column_name}' com valor '{today_date}'")
+    df[column_name] = today_date
+    return df
+
+
+def add_runtime_column(logger, df, column_name="Datetime de Execução"):
+    """
+    Adiciona uma coluna com a data e hora de execução ao DataFrame fornecido.
+    Args:
+        df (pd.DataFrame): O DataFrame ao qual a coluna será adicionada.
+        column_name (str): O nome da coluna de data e hora. Padrão é "Datetime de Execução".
+    Returns:
+        pd.DataFrame: O DataFrame atualizado com a nova coluna de data e hora.
+    """
+    runtime = datetime.now().strftime("%Y-%m-%d")
+    logger.debug(
+        f"Adicionando coluna de data e hora '{column_name}' com valor '{runtime}'")
+    df[column_name] = runtime
+    return df
+
+
+def combina_cidade(logger, df, col_list):
+    """
+    Combina os valores de várias colunas em uma única coluna de cidade.
+    Args:
+        logger: Instância do logger para registrar logs.
+        df (pd.DataFrame): DataFrame contendo os dados.
+        col_list (list): Lista de colunas a serem combinadas.
+    Returns:
+        pd.DataFrame: DataFrame atualizado com a nova coluna de cidade.
+    """
+    logger.debug(f"Combinando colunas {col_list} em uma única coluna")
+    df["Cidade"] = df[col_list].apply(
+        lambda row: next((x for x in row if pd.notnull(x)), None), axis=1).fillna('Uberlandia')
+    return df
+
+
+# Funções de limpeza com versão vetorizada, aplicadas à coluna inteira em vez de linha a linha
+FUNCOES_EM_LOTE = {
+    valida_cpf: valida_cpf_lote,
+    limpar_telefone: limpa_telefone_lote,
+    padronizar_endereco: padroniza_enderecos_lote,
+}
+
+
+# Contadores acumulados de cada função de limpeza aplicada por map_functions_cols na execução
+# (somados entre os blocos no modo em blocos), no formato {nome da função: contadores}
+_ESTATISTICAS_LIMPEZA = {}
+
+
+def _estatistica_limpeza(func, coluna, modo):
+    estatistica = _ESTATISTICAS_LIMPEZA.setdefault(func.__name__, {
+        "colunas": [], "modo": modo, "chamadas": 0, "linhas": 0, "segundos": 0.0,
+        "nulos_entrada": 0, "nulos_saida": 0, "excecoes": 0})
+    if coluna not in estatistica["colunas"]:
+        estatistica["colunas"].append(coluna)
+    return estatistica
+
+
+def estatisticas_limpeza():
+    """
+    Retorna os contadores de cada função de limpeza aplicada por map_functions_cols desde o
+    início da execução (ou desde zera_estatisticas_limpeza), para identificar as mais custosas.
+    Returns:
+        dict: Contadores por função no formato {nome: {'colunas', 'modo', 'chamadas', 'linhas',
+            'segundos', 'nulos_entrada', 'nulos_saida', 'taxa_nulos', 'excecoes'}}. 'modo' indica
+            se a função foi aplicada em lote, por valor distinto ou linha a linha, e 'taxa_nulos'
+            é a fração de linhas com resultado vazio.
+    """
+    return {
+        nome: {**estatistica, "colunas": list(estatistica["colunas"]),
+               "segundos": round(estatistica["segundos"], 4),
+               "taxa_nulos": round(estatistica["nulos_saida"] / estatistica["linhas"], 4)
+               if estatistica["linhas"] else None}
+        for nome, estatistica in _ESTATISTICAS_LIMPEZA.items()
+    }
+
+
+def zera_estatisticas_limpeza():
+    _ESTATISTICAS_LIMPEZA.clear()
+
+
+def formata_estatisticas_limpeza(estatisticas):
+    """
+    Monta uma tabela com os contadores das funções de limpeza, da mais lenta para a mais rápida.
+    Args:
+        estatisticas (dict): Contadores retornados por estatisticas_limpeza.
+    Returns:
+        str: Uma linha por função de limpeza.
+    """
+    linhas = [f"{'função':<24} {'modo':<10} {'chamadas':>9} {'linhas':>9} {'tempo':>9} "
+              f"{'nulos':>7} {'exceções':>9}"]
+    for nome, e in sorted(estatisticas.items(), key=lambda item: -item[1]["segundos"]):
+        taxa = "-" if e["taxa_nulos"] is None else f"{e['taxa_nulos']:.1%}"
+        linhas.append(f"{nome:<24} {e['modo']:<10} {e['chamadas']:>9} {e['linhas']:>9} "
+                      f"{e['segundos']:>8.2f}s {taxa:>7} {e['excecoes']:>9}")
+    return "\n".join(linhas)
+
+
+def aplica_por_valor_distinto(logger, serie, func, estatistica=None):
+    """
+    Aplica uma função de limpeza uma única vez por valor distinto da coluna e
+    replica os resultados para todas as linhas através dos códigos da fatoração.
+    Valores iguais de tipos diferentes (ex.: 25 e 25.0) são tratados como distintos,
+    pois as funções de limpeza se comportam de forma diferente para cada tipo.
+    Args:
+        logger: Instância do logger para registrar logs.
+        serie (pd.Series): Coluna original.
+        func (Callable): Função de limpeza com assinatura func(logger, valor).
+        estatistica (dict, opcional): Contadores da função (ver estatisticas_limpeza). Se
+            informado, as chamadas da função são somadas em estatistica["chamadas"].
+    Returns:
+        pd.Series: Série com os valores limpos, com o mesmo índice da entrada.
+    """
+    codigos_valor, _ = pd.factorize(serie, use_na_sentinel=False)
+    codigos_tipo, tipos = pd.factorize(serie.map(type))
+    chave = codigos_valor.astype(np.int64) * len(tipos) + codigos_tipo
+    _, primeiros, inversos = np.unique(
+        chave, return_index=True, return_inverse=True)
+    valores = serie.to_numpy(dtype=object)
+    resultados = np.empty(len(primeiros), dtype=object)
+    if estatistica is not None:
+        estatistica["chamadas"] += len(primeiros)
+    for i, posicao in enumerate(primeiros):
+        resultados[i] = func(logger, valores[posicao])
+    logger.debug(
+        f"Coluna '{serie.name}': {len(primeiros)} valores distintos em {len(serie)} linhas "
+        f"({len(primeiros) / len(serie):.2%})")
+    return pd.Series(resultados[inversos.ravel()].tolist(), index=serie.index)
+
+
+def map_functions_cols(logger, df, column_functions):
+    """
+    Aplica funções específicas às colunas de um DataFrame com base em um mapeamento.
+    Se a coluna original não existir, cria a coluna original e a nova com valores em branco.
+    Funções com versão vetorizada em FUNCOES_EM_LOTE recebem a coluna inteira. As demais
+    são aplicadas uma vez por valor distinto, exceto quando o mapeamento tiver um terceiro
+    elemento igual a False (funções não puras, aplicadas linha a linha). O tempo, as chamadas,
+    os resultados vazios e as exceções de cada função são acumulados em estatisticas_limpeza().
+    Args:
+        logger: Instância do logger para registrar logs.
+        df (pd.DataFrame): DataFrame contendo os dados.
+        column_functions (dict): Dicionário de funções a serem aplicadas às colunas, no formato
+            {coluna_nova: (função, coluna_original[, fatorar])}.
+    Returns:
+        pd.DataFrame: DataFrame com as funções aplicadas
+    """
+    logger.debug("Aplicando funções às colunas do DataFrame")
+    for col, func in column_functions.items():
+        original_col = func[1]
+        fatorar = func[2] if len(func) > 2 else True
+        if original_col not in df.columns:
+            logger.debug(
+                f"Coluna '{original_col}' não encontrada. Criando coluna '{original_col}' e '{col}' com valores em branco.")
+            df[original_col] = None
+            df[col] = None
+            continue
+        if func[0] in FUNCOES_EM_LOTE:
+            modo = "lote"
+        elif fatorar and len(df) > 0:
+            modo = "distintos"
+        else:
+            modo = "linhas"
+        estatistica = _estatistica_limpeza(func[0], original_col, modo)
+        estatistica["linhas"] += len(df)
+        estatistica["nulos_entrada"] += int(df[original_col].isna().sum())
+        inicio = time.perf_counter()
+        try:
+            if modo == "lote":
+                func_lote = FUNCOES_EM_LOTE[func[0]]
+                logger.debug(
+                    f"Aplicando função '{func_lote.__name__}' à coluna '{original_col}'")
+                estatistica["chamadas"] += 1
+                df[col] = func_lote(logger, df[original_col])
+            elif modo == "distintos":
+                logger.debug(
+                    f"Aplicando função '{func[0].__name__}' aos valores distintos da coluna '{original_col}'")
+                df[col] = aplica_por_valor_distinto(
+                    logger, df[original_col], func[0], estatistica)
+            else:
+                logger.debug(
+                    f"Aplicando função '{func[0].__name__}' à coluna '{original_col}'")
+                estatistica["chamadas"] += len(df)
+                df[col] = df[original_col].apply(lambda x: func[0](logger, x))
+        except Exception:
+            # A exceção interrompe a limpeza, mas fica registrada nos contadores da função
+            estatistica["excecoes"] += 1
+            raise
+        finally:
+            estatistica["segundos"] += time.perf_counter() - inicio
+        estatistica["nulos_saida"] += int(df[col].isna().sum())
+    return df
+
+
+def conta_ocorrencia_incremental(logger, df, col, contagem=None):
+    """
+    Conta ocorrências de valores em uma coluna de forma incremental.
+    Args:
+        logger: Instância do logger para registrar logs.
+        df (pd.DataFrame): DataFrame contendo os dados.
+        col (str): Nome da coluna a ser contada.
+        contagem (dict, opcional): Ocorrências de cada valor em blocos anteriores. Se informado,
+            a contagem continua a partir dele e o dicionário é atualizado com o bloco atual.
+    Returns:
+        pd.Series: Série contendo a contagem incremental
+    """
+    logger.debug(f"Contando ocorrências de valores na coluna '{col}'")
+    ocorrencias = df.groupby(col).cumcount() + 1
+    if contagem is not None:
+        ocorrencias = ocorrencias + df[col].map(contagem).fillna(0)
+        for valor, quantidade in df[col].value_counts().items():
+            contagem[valor] = contagem.get(valor, 0) + quantidade
+    return ocorrencias.fillna(1).astype(int)
+
+
+def limpa_cidade(logger, cidade: Optional[str]) -> str:
+    """
+    Limpa e padroniza o nome da cidade.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        cidades_validas (list): Lista de cidades válidas para validação.
+        cidade (Optional[str]): O nome da cidade a ser limpo.
+    Returns:
+        str: O nome padronizado da cidade:
+             - "uberlandia" se a entrada for vazia ou None.
+             - O nome da cidade correspondente se estiver na lista de cidades válidas (case insensitive).
+             - "outra" caso contrário.
+    """
+    if not cidade or pd.isna(cidade):
+        return "uberlandia"
+    cidades_validas = config["cidades"]
+    cidade_limpa = clean_text(cidade).lower()
+    for cidade_valida in cidades_validas:
+        if cidade_valida.lower() in cidade_limpa:
+            return cidade_valida
+    return "outra"
+
+
+def processar_leads(logger, df):
+    """
+    Processa e limpa os dados de leads aplicando funções específicas para cada coluna.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): DataFrame contendo os dados dos leads.
+    Returns:
+        pd.DataFrame: DataFrame atualizado com as colunas processadas e limpas.
+    """
+    logger.debug("Iniciando o processamento e limpeza dos dados de leads.")
+    # Dicionário de funções específicas para colunas
+    # O terceiro elemento (opcional) desliga a aplicação por valor distinto para funções não puras
+    column_functions: Dict[str, tuple] = {
+        "Email Limpo": (valida_email, "Email"),
+        "Nome Limpo": (limpa_nome, "Nome"),
+        "CPF Limpo": (valida_cpf, "CPF"),
+        "Idade Limpo": (valida_idade, "Idade"),
+        "Escolaridade Limpo": (limpa_escolaridade, "Escolaridade"),
+        "Endereco Limpo": (padronizar_endereco, "Endereco", False),
+        "Cidade de Origem Limpo": (limpa_cidade, "Cidade de Origem"),
+        "Cidade da Vaga Limpo": (limpa_cidade, "Cidade da Vaga"),
+        "Telefone Limpo": (limpar_telefone, "Telefone"),
+        "Telefone 2 Limpo": (limpar_telefone, "Telefone 2"),
+        "Matricula Indicador Limpo": (limpa_matricula, "Matricula Indicador"),
+        "Nome Indicador Limpo": (limpa_nome, "Nome Indicador"),
+    }
+    logger.debug(
+        "Aplicando funções de limpeza e validação às colunas do DataFrame.")
+    df = map_functions_cols(logger, df, column_functions)
+    logger.debug(
+        "Processamento e limpeza dos dados de leads concluídos com sucesso.")
+    return df
+
+
+def data_source_sort(logger, df, date_col='Data Form'):
+    """
+    Ordena o DataFrame pela coluna de data, ajustando horários 00:00:00 para 23:59:59 do mesmo dia.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): DataFrame contendo os dados a serem ordenados.
+        date_col (str): Nome da coluna de data.
+    Returns:
+        pd.DataFrame: DataFrame ordenado pela coluna de data.
+    """
+    logger.debug(f"Ordenando o DataFrame pela coluna de data '{date_col}'")
+    df[date_col] = ajusta_data_sem_horario(df[date_col])
+    return df.sort_values(date_col)
+
+
+def ajusta_data_sem_horario(datas):
+    """
+    Converte a coluna para datetime, levando datas sem horário (00:00:00) para 23:59:59 do mesmo dia.
+    Args:
+        datas (pd.Series): Série com as datas originais.
+    Returns:
+        pd.Series: Série de datas ajustadas.
+    """
+    datas = pd.to_datetime(datas)
+    return datas.where(
+        datas.dt.time != pd.to_datetime('00:00:00').time(),
+        datas + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    )
+
+
+def calcula_colunas_extras(logger, df, turno, fontes, contagens=None):
+    """
+    Adiciona colunas complementares ao DataFrame fornecido.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): DataFrame contendo os dados a serem processados.
+        contagens (dict, opcional): Estado das contagens de "CPF Limpo" e "Telefone Limpo"
+            e das "Fontes não mapeadas" dos blocos anteriores, no processamento em blocos.
+    Returns:
+        pd.DataFrame: DataFrame atualizado com as colunas complementares adicionadas.
+    """
+    logger.debug(
+        "Adicionando a coluna 'Fonte Limpa' com o mapping da configuração")
+    contagens = {} if contagens is None else contagens
+    df = map_fonte(logger, df, "Fonte", fontes, contagens.get("Fontes não mapeadas"))
+    logger.debug("Adicionando a coluna 'Data Captacao' com a data atual.")
+    df = add_date_column(logger, df, "Data Captacao")
+    logger.debug(
+        "Adicionando a coluna 'Datetime de Execução' com a data e hora atuais.")
+    df = add_runtime_column(logger, df)
+    logger.debug(
+        "Combinando as colunas 'Cidade da Vaga Limpo' e 'Cidade de Origem Limpo' em uma única coluna 'Cidade'.")
+    df = combina_cidade(
+        logger, df, ["Cidade da Vaga Limpo", "Cidade de Origem Limpo"])
+    logger.debug("Adicionando a coluna 'Data do Exame' com valores nulos.")
+    df["Data do Exame"] = None
+    logger.debug("Adicionando a coluna 'Flag Cvortex' com o valor padrão 's'.")
+    df["Flag Cvortex"] = 's'
+    logger.debug("Adicionando a coluna 'Codigo Fonte' com o valor padrão '2'.")
+    df["Codigo Fonte"] = "2"
+    logger.debug(
+        "Adicionando a coluna 'Contagem CPF' com a contagem incremental de ocorrências de CPF.")
+    df['Contagem CPF'] = conta_ocorrencia_incremental(
+        logger, df, "CPF Limpo", contagens.get("CPF Limpo"))
+    logger.debug(
+        "Adicionando a coluna 'Contagem Telefone' com a contagem incremental de ocorrências de telefone.")
+    df['Contagem Telefone'] = conta_ocorrencia_incremental(
+        logger, df, "Telefone Limpo", contagens.get("Telefone Limpo"))
+    df['Modalidade da Entrevista'] = 'ONLINE'
+    df['Turno'] = turno.upper()
+    return df
@@ -0,0 +1,342 @@
+import json
+import os
+import threading
+import time
+
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+
+import pandas as pd
+
+from config import config
+
+
+@lru_cache(maxsize=None)
+def _processo_psutil(pid):
+    # Resolvido uma vez por processo (o pid separa os processos criados por fork): o
+    # MonitorMemoria chama rss_atual a cada 10 ms
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process()
+
+
+def rss_atual():
+    """
+    Retorna a memória residente (RSS) do processo atual em bytes (ou None se não for possível obter).
+    Usa o psutil quando instalado e, em seguida, os contadores do sistema (Linux).
+    """
+    processo = _processo_psutil(os.getpid())
+    if processo is not None:
+        return processo.memory_info().rss
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def tempo_cpu():
+    """
+    Retorna o tempo de CPU (usuário + sistema) do processo atual e dos processos filhos já
+    encerrados (ex.: o pool de geração dos relatórios), em segundos.
+    """
+    tempos = os.times()
+    return tempos.user + tempos.system + tempos.children_user + tempos.children_system
+
+
+class MonitorMemoria(threading.Thread):
+    """
+    Amostra a memória residente do processo em segundo plano enquanto um trecho é executado,
+    guardando o RSS no início e o maior valor observado (picos mais curtos que o intervalo
+    de amostragem podem não ser registrados). Uso:
+
+        with MonitorMemoria() as monitor:
+            ...
+        monitor.pico, monitor.inicio
+    """
+
+    def __init__(self, intervalo=0.01):
+        super().__init__(name="MonitorMemoria", daemon=True)
+        self.intervalo = intervalo
+        self.parar = threading.Event()
+        self.inicio = rss_atual()
+        self.pico = self.inicio
+
+    def run(self):
+        while not self.parar.wait(self.intervalo):
+            self._amostra()
+
+    def _amostra(self):
+        rss = rss_atual()
+        if rss is not None and (self.pico is None or rss > self.pico):
+            self.pico = rss
+
+    def __enter__(self):
+        if self.inicio is not None:
+            self.start()
+        return self
+
+    def __exit__(self, *excecao):
+        if self.is_alive():
+            self.parar.set()
+            self.join()
+        self._amostra()
+        return False
+
+
+def _mib(valor):
+    return None if valor is None else round(valor / 2**20, 1)
+
+
+class Etapas:
+    """
+    Executa e mede as etapas de uma execução: duração, tempo de CPU, pico de memória residente
+    (em relação ao início da etapa) e linhas na entrada (primeiro DataFrame dos argumentos) e
+    na saída (se a etapa retornar um DataFrame). Ao sair do bloco `with`, registra um resumo no
+    log e acrescenta um registro JSON da execução em config["metricas_path"]. Os `coletores`
+    (funções sem argumentos) são chamados ao montar o registro, mesmo se a execução falhar.
+    Chamadas repetidas de uma etapa (ex.: uma por bloco) são somadas em uma única medição, com
+    a quantidade de chamadas e o maior pico. Uso:
+
+        with Etapas(logger, modo="completo") as etapas:
+            leads = etapas(processar_leads, logger, leads)
+            for bloco in etapas.itera(blocos, "processa_em_blocos"):
+                ...
+    """
+
+    def __init__(self, logger, caminho=None, coletores=None, **metadados):
+        self.logger = logger
+        self.caminho = caminho or config.get("metricas_path", "./logs/metricas.jsonl")
+        self.coletores = coletores or {}
+        self.metadados = dict(metadados)
+        self.etapas = []
+        self.inicio = datetime.now()
+        self._relogio = time.perf_counter()
+        self._cpu = tempo_cpu()
+
+    def __call__(self, funcao, *args, nome=None, **kwargs):
+        entrada = next((len(a) for a in args if isinstance(a, pd.DataFrame)), None)
+        monitor = MonitorMemoria()
+        inicio, cpu = time.perf_counter(), tempo_cpu()
+        try:
+            with monitor:
+                resultado = funcao(*args, **kwargs)
+        except Exception as e:
+            self._registra(nome or funcao.__name__, inicio, cpu, monitor, entrada, None, e)
+            raise
+        self._registra(nome or funcao.__name__, inicio, cpu, monitor, entrada, resultado)
+        return resultado
+
+    def itera(self, iteravel, nome):
+        """
+        Percorre um iterável (ex.: gerador de blocos) medindo cada item produzido como uma
+        chamada da etapa `nome`; o tempo gasto pelo chamador entre os itens não é contado.
+        Args:
+            iteravel (Iterable): Iterável a percorrer.
+            nome (str): Nome da etapa.
+        Returns:
+            Iterator: Os itens do iterável.
+        """
+        iterador = iter(iteravel)
+        while True:
+            monitor = MonitorMemoria()
+            inicio, cpu = time.perf_counter(), tempo_cpu()
+            try:
+                with monitor:
+                    item = next(iterador)
+            except StopIteration:
+                self._registra(nome, inicio, cpu, monitor, None, None)
+                return
+            except Exception as e:
+                self._registra(nome, inicio, cpu, monitor, None, None, e)
+                raise
+            self._registra(nome, inicio, cpu, monitor, None, item)
+            yield item
+
+    def _registra(self, nome, inicio, cpu, monitor, entrada, resultado, erro=None):
+        medicao = {
+            "etapa": nome,
+            "segundos": round(time.perf_counter() - inicio, 3),
+            "cpu_segundos": round(tempo_cpu() - cpu, 3),
+            "delta_rss_mib": None if monitor.pico is None else _mib(monitor.pico - monitor.inicio),
+            "pico_rss_mib": _mib(monitor.pico),
+            "linhas_entrada": entrada,
+            "linhas_saida": len(resultado) if isinstance(resultado, pd.DataFrame) else None,
+            "chamadas": 1,
+        }
+        if erro is not None:
+            medicao["erro"] = f"{type(erro).__name__}: {erro}"
+        self.logger.debug(
+            f"Etapa '{nome}': {medicao['segundos']:.2f}s (CPU {medicao['cpu_segundos']:.2f}s)")
+        anterior = next((e for e in self.etapas if e["etapa"] == nome), None)
+        if anterior is None:
+            self.etapas.append(medicao)
+            return
+        # Etapa repetida: soma tempos, linhas e chamadas e mantém o maior pico
+        for chave in ("segundos", "cpu_segundos"):
+            anterior[chave] = round(anterior[chave] + medicao[chave], 3)
+        for chave in ("linhas_entrada", "linhas_saida"):
+            if medicao[chave] is not None:
+                anterior[chave] = (anterior[chave] or 0) + medicao[chave]
+        for chave in ("delta_rss_mib", "pico_rss_mib"):
+            if medicao[chave] is not None:
+                anterior[chave] = max(anterior[chave] if anterior[chave] is not None else medicao[chave],
+                                      medicao[chave])
+        anterior["chamadas"] += 1
+        if erro is not None:
+            anterior["erro"] = medicao["erro"]
+
+    def resumo(self):
+        """
+        Monta a tabela de resumo das etapas medidas.
+        Returns:
+            str: Uma linha por etapa e o total da execução.
+        """
+        def formata(valor, modelo):
+            return "-" if valor is None else modelo.format(valor)
+
+        linhas = [f"{'etapa':<28} {'tempo':>9} {'CPU':>9} {'delta RSS':>11} {'pico RSS':>10} "
+                  f"{'entrada':>9} {'saída':>9}"]
+        for etapa in self.etapas:
+            nome = etapa['etapa'] + (f" (x{etapa['chamadas']})" if etapa.get('chamadas', 1) > 1 else "")
+            linhas.append(
+                f"{nome:<28} {etapa['segundos']:>8.2f}s {etapa['cpu_segundos']:>8.2f}s "
+                f"{formata(etapa['delta_rss_mib'], '{:+.0f} MiB'):>11} "
+                f"{formata(etapa['pico_rss_mib'], '{:.0f} MiB'):>10} "
+                f"{formata(etapa['linhas_entrada'], '{}'):>9} {formata(etapa['linhas_saida'], '{}'):>9}")
+        linhas.append(f"{'total':<28} {time.perf_counter() - self._relogio:>8.2f}s "
+                      f"{tempo_cpu() - self._cpu:>8.2f}s")
+        return "\n".join(linhas)
+
+    def registro(self, erro=None):
+        """
+        Monta o registro da execução (metadados, totais e etapas).
+        """
+        picos = [e["pico_rss_mib"] for e in self.etapas if e["pico_rss_mib"] is not None]
+        registro = {
+            "inicio": self.inicio.isoformat(timespec="seconds"),
+            "fim": datetime.now().isoformat(timespec="seconds"),
+            **self.metadados,
+            "segundos": round(time.perf_counter() - self._relogio, 3),
+            "cpu_segundos": round(tempo_cpu() - self._cpu, 3),
+            "pico_rss_mib": max(picos) if picos else None,
+            "etapas": self.etapas,
+            **{nome: coleta() for nome, coleta in self.coletores.items()},
+        }
+        if erro is not None:
+            registro["erro"] = f"{type(erro).__name__}: {erro}"
+        return registro
+
+    def grava(self, erro=None):
+        """
+        Acrescenta o registro da execução (uma linha JSON) ao arquivo de métricas.
+        """
+        pasta = os.path.dirname(self.caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with open(self.caminho, "a", encoding="utf-8") as arquivo:
+            arquivo.write(json.dumps(self.registro(erro), ensure_ascii=False) + "\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, erro, rastreamento):
+        if self.etapas:
+            self.logger.info("Resumo das etapas:\n" + self.resumo())
+            try:
+                self.grava(erro)
+            except OSError as e:
+                self.logger.warning(f"Não foi possível gravar as métricas em '{self.caminho}': {e}")
+        return False
+
+
+def _nome_funcao(funcao):
+    arquivo, linha, nome = funcao
+    if arquivo == "~":
+        return nome
+    return f"{nome} ({os.path.basename(arquivo)}:{linha})".replace(";", ",")
+
+
+def pilhas_colapsadas(estatisticas, minimo=0.0005):
+    """
+    Converte as estatísticas do cProfile em pilhas colapsadas ("a;b;c microssegundos" por linha),
+    o formato lido por flamegraph.pl e speedscope. O cProfile guarda apenas os pares chamador ->
+    chamado, então o tempo de cada função é dividido entre as pilhas na proporção das chamadas
+    de cada chamador (aproximação). Chamadas recursivas são cortadas na primeira repetição.
+    Args:
+        estatisticas (pstats.Stats): Estatísticas do perfil.
+        minimo (float, opcional): Fração do tempo total abaixo da qual um ramo não é detalhado
+            (o tempo fica na função que o chamou).
+    Returns:
+        list[str]: Linhas no formato de pilhas colapsadas.
+    """
+    chamados = defaultdict(list)
+    for funcao, (_, _, _, _, chamadores) in estatisticas.stats.items():
+        for chamador, (_, _, proprio, acumulado) in chamadores.items():
+            chamados[chamador].append((funcao, proprio, acumulado))
+    raizes = [f for f, (_, _, _, _, chamadores) in estatisticas.stats.items() if not chamadores]
+    limite = minimo * sum(estatisticas.stats[f][3] for f in raizes)
+    tempos = defaultdict(float)
+
+    def expande(pilha, funcao, proprio, acumulado):
+        pilha = pilha + (funcao,)
+        total = estatisticas.stats[funcao][3]
+        fator = acumulado / total if total else 0
+        for chamado, proprio_chamado, acumulado_chamado in chamados[funcao]:
+            if chamado in pilha:
+                continue
+            if acumulado_chamado * fator < limite:
+                proprio += acumulado_chamado * fator
+            else:
+                expande(pilha, chamado, proprio_chamado * fator, acumulado_chamado * fator)
+        tempos[pilha] += proprio
+
+    for raiz in raizes:
+        _, _, proprio, acumulado, _ = estatisticas.stats[raiz]
+        expande((), raiz, proprio, acumulado)
+    return [f"{';'.join(_nome_funcao(f) for f in pilha)} {round(tempo * 1e6)}"
+            for pilha, tempo in sorted(tempos.items()) if round(tempo * 1e6) > 0]
+
+
+class Perfil:
+    """
+    Captura um perfil do cProfile do trecho executado no bloco `with` (apenas da thread atual)
+    e, ao sair, grava o arquivo .prof (pstats, snakeviz) e as pilhas colapsadas em .folded
+    (flamegraph.pl, speedscope) em config["perfil_path"]. O cProfile só é carregado aqui:
+    execuções sem perfil não têm custo adicional. Uso:
+
+        with Perfil(logger, "2025_01_31_manha"):
+            ...
+    """
+
+    def __init__(self, logger, nome, pasta=None):
+        self.logger = logger
+        pasta = pasta or config.get("perfil_path", "./logs/perfis")
+        base = os.path.join(pasta, f"{nome}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}")
+        self.caminho_prof = base + ".prof"
+        self.caminho_pilhas = base + ".folded"
+
+    def __enter__(self):
+        import cProfile
+
+        self.perfil = cProfile.Profile()
+        self.perfil.enable()
+        return self
+
+    def __exit__(self, *excecao):
+        import pstats
+
+        self.perfil.disable()
+        try:
+            os.makedirs(os.path.dirname(self.caminho_prof) or ".", exist_ok=True)
+            self.perfil.dump_stats(self.caminho_prof)
+            with open(self.caminho_pilhas, "w", encoding="utf-8") as arquivo:
+                arquivo.writelines(linha + "\n" for linha in pilhas_colapsadas(pstats.Stats(self.perfil)))
+        except OSError as e:
+            self.logger.warning(f"Não foi possível gravar o perfil em '{self.caminho_prof}': {e}")
+            return False
+        self.logger.info(f"Perfil salvo em '{self.caminho_prof}' e '{self.caminho_pilhas}'")
+        return False
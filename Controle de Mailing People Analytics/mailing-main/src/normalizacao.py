@@ -0,0 +1,78 @@
+import unicodedata
+
+from functools import lru_cache
+from config import config
+
+
+class _TabelaNormalizacao(dict):
+    """
+    Tabela de tradução para str.translate que mapeia cada caractere para sua forma
+    NFKD sem caracteres combinantes e sem caracteres não alfanuméricos (exceto espaço).
+    Caracteres fora da faixa pré-compilada são calculados e guardados sob demanda.
+    """
+
+    def __missing__(self, codigo):
+        decomposto = unicodedata.normalize('NFKD', chr(codigo))
+        traduzido = ''.join(
+            c for c in decomposto
+            if not unicodedata.combining(c) and (c.isalnum() or c == ' '))
+        self[codigo] = traduzido
+        return traduzido
+
+
+# Faixa Latin-1 pré-compilada (cobre os acentos do português)
+_TABELA = _TabelaNormalizacao()
+for _codigo in range(256):
+    _TABELA[_codigo]
+
+
+@lru_cache(maxsize=config.get("cache_normalizacao", 65536))
+def normalize_text(stylized_text):
+    """
+    Remove acentuação e caracteres não alfanuméricos de um texto em uma única passagem,
+    unificando espaços. Se todas as palavras tiverem no máximo um caractere, os espaços
+    são removidos.
+    Args:
+        stylized_text (str): O texto a ser normalizado.
+    Returns:
+        str: O texto normalizado.
+    """
+    palavras = stylized_text.translate(_TABELA).split()
+    if max([len(x) for x in palavras], default=0) <= 1:
+        return ''.join(palavras)
+    return ' '.join(palavras)
+
+
+@lru_cache(maxsize=config.get("cache_normalizacao", 65536))
+def _clean_text(text):
+    return normalize_text(''.join(text.lower().split()))
+
+
+def clean_text(text):
+    """
+    Remove espaços, pontuação e acentuação de um texto.
+    Args:
+        text (str): O texto a ser processado.
+    Returns:
+        str: O texto limpo.
+    """
+    return _clean_text(str(text))
+
+
+def estatisticas_cache():
+    """
+    Retorna os contadores de acerto e falha dos caches de normalização,
+    para ajuste do tamanho configurado em `cache_normalizacao`.
+    Returns:
+        dict: Contadores por função no formato {nome: {'hits', 'misses', 'tamanho', 'maximo'}}.
+    """
+    estatisticas = {}
+    for nome, func in (("normalize_text", normalize_text), ("clean_text", _clean_text)):
+        info = func.cache_info()
+        estatisticas[nome] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "tamanho": info.currsize,
+            "maximo": info.maxsize,
+        }
+    return estatisticas
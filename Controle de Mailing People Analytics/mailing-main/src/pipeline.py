@@ -0,0 +1,155 @@
+import itertools
+
+from config import config
+from arquivos import (DivisaoPlanilhasEmBlocos, GravacaoExcelEmBlocos, aguarda_gravacao, confirma_salva_db,
+                      decide_planilha, divide_planilhas, get_all_sheets, overwrite_excel, salva_db)
+from limpeza import calcula_colunas_extras, data_source_sort, processar_leads
+from descartes import (calcula_criterios_descarte, cubo_descartes, exclui_nao_recomendados, get_history_blocks,
+                       get_seen_blocks, soma_cubos)
+from relatorios import COLUNAS_DESCARTES, print_descarte, publica_descartes
+from blocos import processa_em_blocos
+from dataset import GravacaoDataset, dataset_disponivel, grava_dataset
+
+
+def executa_completo(logger, etapas, grupo, prefixo, execucao, usar_cache=True, sheets=None,
+                     referencia=None, salvar_db=None, arquivos_por_planilha=None):
+    """
+    Executa a limpeza com todos os leads em memória, medindo cada etapa.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        etapas (metricas.Etapas): Medição das etapas.
+        grupo (str): Turno da execução.
+        prefixo (str): Prefixo dos arquivos da execução (ex.: "/2025_01_31_manha_").
+        execucao (str): Identificador da execução (prefixo sem as barras).
+        usar_cache (bool): Se True, usa o cache de leitura dos arquivos de entrada.
+        sheets (dict, opcional): Entradas lidas. Padrão é config["sheets"].
+        referencia (datetime, opcional): Data de referência dos bloqueios. Padrão é agora.
+        salvar_db (bool, opcional): Se informado, não pergunta se os leads vão para o banco.
+        arquivos_por_planilha (int, opcional): Se informado, não pergunta a quantidade de arquivos.
+    Returns:
+        bool: False se nenhum lead foi encontrado.
+    """
+    # Ler entradas
+    leads = etapas(
+        get_all_sheets, logger, config['input_path'], sheets or config['sheets'], config['layouts'],
+        usar_cache=usar_cache)
+    if leads is None or len(leads) == 0:
+        logger.error("Nenhum lead encontrado no arquivo de entrada.")
+        return False
+
+    # Compilar leads com mapping de funções
+    leads = etapas(processar_leads, logger, leads)
+
+    # Ordenar por data despriorizando indeed (sem horario)
+    leads = etapas(data_source_sort, logger, leads)
+
+    # Calcular colunas extras para os leads
+    leads = etapas(calcula_colunas_extras, logger, leads, grupo, config['fontes'])
+
+    # Calcula as colunas de critérios de descarte
+    leads = etapas(calcula_criterios_descarte, logger, leads, config['cidades'])
+
+    # Incluir bloqueio de ultimos dias com base em tabulação do R&S
+    leads = etapas(get_history_blocks, logger, leads, config['input_path'], referencia)
+
+    # Incluir bloqueio de CPFs e telefones vistos em execuções anteriores
+    leads = etapas(get_seen_blocks, logger, leads, execucao, referencia)
+
+    # Calcular planilhas para divisão dos arquivos
+    leads = etapas(decide_planilha, logger, leads, config['quebra_fonte'])
+
+    # Salvar leads em Excel (em segundo plano, concluído ao final)
+    gravacao = etapas(
+        overwrite_excel, logger, leads, config['output_path'] + prefixo+"Mailing.xlsx", em_segundo_plano=True)
+
+    # Atualizar a partição da execução no dataset Parquet
+    etapas(grava_dataset, logger, leads)
+
+    etapas(salva_db, logger, leads, execucao, salvar_db)
+
+    # print_logo()
+
+    # Limpar Leads não recomendados
+    mailing = etapas(exclui_nao_recomendados, logger, leads)
+
+    # Dividindo mailing em planilhas
+    logger.debug("Dividindo mailing em planilhas")
+    etapas(divide_planilhas, logger, mailing, config['central_path'], prefixo, arquivos_por_planilha)
+
+    # Informando sobre o resultado dos descartes
+    etapas(print_descarte, logger, leads, prefixo)
+
+    duracao = etapas(aguarda_gravacao, logger, gravacao)
+    logger.info(f"Mailing.xlsx salvo em {duracao:.2f}s")
+    return True
+
+
+def executa_em_blocos(logger, etapas, grupo, prefixo, execucao, tamanho_bloco=None, usar_cache=True,
+                      sheets=None, referencia=None, salvar_db=None, arquivos_por_planilha=None):
+    """
+    Executa a limpeza em blocos: cada bloco processado é gravado no Mailing.xlsx, no dataset,
+    no banco e nos arquivos auxiliares das planilhas e agregado na tabela de descartes assim que
+    fica pronto, e então descartado. As gravações só substituem os arquivos e a execução no
+    banco ao final; em caso de erro, são desfeitas.
+    Args:
+        tamanho_bloco (int, opcional): Leads por bloco (ver blocos.processa_em_blocos).
+        Demais argumentos: ver executa_completo.
+    Returns:
+        bool: False se nenhum lead foi encontrado.
+    """
+    # A confirmação é pedida antes, pois os blocos vão para o banco à medida que são processados
+    salvar_db = confirma_salva_db() if salvar_db is None else salvar_db
+
+    # Leitura, limpeza e descartes em blocos de tamanho fixo
+    blocos = etapas.itera(processa_em_blocos(
+        logger, grupo, config['input_path'], sheets or config['sheets'], config['layouts'],
+        execucao, tamanho_bloco, usar_cache=usar_cache, referencia=referencia), "processa_em_blocos")
+    primeiro = next(blocos, None)
+    if primeiro is None:
+        logger.error("Nenhum lead encontrado no arquivo de entrada.")
+        return False
+
+    gravacoes = {
+        "overwrite_excel": GravacaoExcelEmBlocos(logger, config['output_path'] + prefixo+"Mailing.xlsx"),
+        "divide_planilhas": DivisaoPlanilhasEmBlocos(
+            logger, config['central_path'], prefixo, arquivos_por_planilha),
+    }
+    # Sem o pyarrow, o dataset não é gravado (como em grava_dataset no modo completo)
+    if dataset_disponivel(logger):
+        gravacoes["grava_dataset"] = GravacaoDataset(logger)
+    if salvar_db:
+        # Importado apenas aqui: o SQLAlchemy só é carregado quando os leads vão para o banco
+        from database import SincronizacaoExecucao
+        gravacoes["salva_db"] = SincronizacaoExecucao(logger, execucao).__enter__()
+    cubos = []
+    try:
+        for leads in itertools.chain([primeiro], blocos):
+            for nome in ("overwrite_excel", "grava_dataset", "salva_db"):
+                if nome in gravacoes:
+                    etapas(gravacoes[nome].acrescenta, leads, nome=nome)
+
+            # Leads recomendados do bloco, acrescentados às planilhas
+            mailing = etapas(exclui_nao_recomendados, logger, leads)
+            etapas(gravacoes["divide_planilhas"].acrescenta, mailing, nome="divide_planilhas")
+
+            # Tabela de descartes do bloco (os blocos são somados ao final)
+            cubos.append(etapas(cubo_descartes, logger, leads, COLUNAS_DESCARTES))
+            del leads, mailing
+
+        for nome, gravacao in gravacoes.items():
+            resultado = etapas(gravacao.conclui, nome=nome)
+            if nome == "overwrite_excel":
+                logger.info(f"Mailing.xlsx salvo em {resultado:.2f}s")
+            elif nome == "salva_db":
+                logger.info("Dados inseridos no banco com sucesso!")
+    except BaseException:
+        for gravacao in gravacoes.values():
+            gravacao.cancela()
+        raise
+    if not salvar_db:
+        logger.info("Salvamento no banco cancelado.")
+
+    # Informando sobre o resultado dos descartes
+    cubo = etapas(soma_cubos, logger, cubos)
+    etapas(publica_descartes, logger, cubo, prefixo, nome="print_descarte")
+    return True
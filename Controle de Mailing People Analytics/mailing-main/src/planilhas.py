@@ -0,0 +1,287 @@
+import os
+import tempfile
+import threading
+import time
+
+from datetime import date, datetime
+
+import pandas as pd
+
+from config import config
+
+
+def engines_excel(caminho, engine=None):
+    """
+    Define a ordem de engines tentadas para ler um arquivo Excel: a engine configurada
+    primeiro e, em seguida, a engine padrão do pandas para a extensão do arquivo.
+    Args:
+        caminho (str): Caminho do arquivo Excel.
+        engine (str, opcional): Engine preferida. Padrão é config["engine_excel"].
+    Returns:
+        list[str]: Engines na ordem de tentativa.
+    """
+    engine = engine or config.get("engine_excel", "calamine")
+    padrao = "xlrd" if caminho.lower().endswith(".xls") else "openpyxl"
+    return [engine] if engine == padrao else [engine, padrao]
+
+
+def le_excel(logger, caminho, engine=None, **kwargs):
+    """
+    Lê uma aba de um arquivo Excel com a engine configurada (calamine por padrão),
+    recorrendo ao openpyxl/xlrd se a engine não estiver instalada ou falhar.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        caminho (str): Caminho do arquivo Excel.
+        engine (str, opcional): Engine preferida. Padrão é config["engine_excel"].
+        **kwargs: Parâmetros repassados para pd.read_excel (sheet_name, dtype, ...).
+    Returns:
+        pd.DataFrame: Dados da aba lida.
+    """
+    erro = None
+    for tentativa in engines_excel(caminho, engine):
+        try:
+            return pd.read_excel(caminho, engine=tentativa, **kwargs)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            logger.debug(
+                f"Leitura de '{caminho}' com a engine '{tentativa}' falhou ({e}).")
+            erro = e
+    raise erro
+
+
+def _valor_calamine(valor):
+    # Mesmos tipos devolvidos pelo openpyxl: células vazias como None, inteiros como int
+    # e datas como datetime
+    if valor == "":
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    if isinstance(valor, date) and not isinstance(valor, datetime):
+        return datetime(valor.year, valor.month, valor.day)
+    return valor
+
+
+def _itera_calamine(caminho, aba, linha_inicial):
+    from python_calamine import CalamineWorkbook
+
+    workbook = CalamineWorkbook.from_path(caminho)
+    try:
+        planilha = workbook.get_sheet_by_name(aba)
+        # As linhas começam na primeira linha da planilha, mas as colunas começam
+        # na primeira coluna preenchida
+        vazias = (None,) * planilha.start[1]
+        for i, linha in enumerate(planilha.iter_rows(), start=1):
+            if i >= linha_inicial:
+                yield vazias + tuple(_valor_calamine(v) for v in linha)
+    finally:
+        workbook.close()
+
+
+def _itera_openpyxl(caminho, aba, linha_inicial):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        planilha = workbook[aba]
+        planilha.reset_dimensions()
+        yield from planilha.iter_rows(min_row=linha_inicial, values_only=True)
+    finally:
+        workbook.close()
+
+
+def itera_linhas(logger, caminho, aba, linha_inicial=1, engine=None):
+    """
+    Percorre as linhas de uma aba de um arquivo .xlsx como tuplas de valores (no formato
+    do openpyxl), com a engine configurada. Se a engine preferida não estiver instalada
+    ou não conseguir abrir o arquivo, usa o openpyxl em modo somente leitura.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        caminho (str): Caminho do arquivo Excel.
+        aba (str): Nome da aba.
+        linha_inicial (int): Primeira linha (1-indexada) retornada.
+        engine (str, opcional): Engine preferida. Padrão é config["engine_excel"].
+    Returns:
+        Iterator[tuple]: Valores de cada linha.
+    """
+    engine = engine or config.get("engine_excel", "calamine")
+    if engine == "calamine":
+        linhas = _itera_calamine(caminho, aba, linha_inicial)
+        try:
+            # Abre o arquivo já aqui, para recorrer ao openpyxl antes de qualquer linha lida
+            primeira = next(linhas, None)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            logger.debug(
+                f"Leitura de '{caminho}' com a engine 'calamine' falhou ({e}). Usando openpyxl.")
+        else:
+            if primeira is not None:
+                yield primeira
+                yield from linhas
+            return
+    yield from _itera_openpyxl(caminho, aba, linha_inicial)
+
+
+def _linhas_em_blocos(df, linhas_por_bloco):
+    # Converte um bloco de cada vez para tipos nativos (vazios como None), sem copiar o DataFrame
+    for inicio in range(0, len(df), linhas_por_bloco):
+        bloco = df.iloc[inicio:inicio + linhas_por_bloco]
+        colunas = []
+        for _, serie in bloco.items():
+            valores = serie.to_numpy(dtype=object, copy=True)
+            valores[pd.isna(valores)] = None
+            colunas.append(valores)
+        yield from zip(*colunas)
+
+
+class EscritorExcel:
+    """
+    Grava um arquivo .xlsx linha a linha, com memória constante: o xlsxwriter em modo
+    constant_memory (preferido) ou o openpyxl em modo write_only. O cabeçalho é gravado com as
+    colunas do primeiro DataFrame recebido, e os seguintes são acrescentados nessa ordem de
+    colunas. Uso:
+
+        with EscritorExcel(logger, caminho) as escritor:
+            for bloco in blocos:
+                escritor.acrescenta(bloco)
+    """
+
+    def __init__(self, logger, caminho, aba="Mailing", engine=None, linhas_por_bloco=10_000):
+        self.logger = logger
+        self.caminho = caminho
+        self.aba = aba
+        self.linhas_por_bloco = linhas_por_bloco
+        self.engine = engine or config.get("engine_escrita_excel", "xlsxwriter")
+        if self.engine == "xlsxwriter":
+            try:
+                import xlsxwriter
+            except ImportError:
+                logger.debug("xlsxwriter não instalado. Gravando com openpyxl.")
+                self.engine = "openpyxl"
+        if self.engine == "xlsxwriter":
+            self.workbook = xlsxwriter.Workbook(caminho, {
+                "constant_memory": True,
+                "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            })
+            self.planilha = self.workbook.add_worksheet(aba)
+        else:
+            from openpyxl import Workbook
+
+            self.workbook = Workbook(write_only=True)
+            self.planilha = self.workbook.create_sheet(aba)
+        self.colunas = None
+        self.linhas = 0
+
+    def _escreve_cabecalho(self, cabecalho):
+        if self.engine == "xlsxwriter":
+            negrito = self.workbook.add_format(
+                {"bold": True, "border": 1, "align": "center", "valign": "top"})
+            self.planilha.write_row(0, 0, cabecalho, negrito)
+        else:
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Font
+
+            titulos = []
+            for nome in cabecalho:
+                celula = WriteOnlyCell(self.planilha, value=nome)
+                celula.font = Font(bold=True)
+                titulos.append(celula)
+            self.planilha.append(titulos)
+
+    def acrescenta(self, df):
+        """
+        Acrescenta as linhas do DataFrame ao arquivo (cabeçalho com os nomes das colunas, sem índice).
+        Args:
+            df (pd.DataFrame): Linhas a serem gravadas.
+        """
+        if self.colunas is None:
+            self.colunas = list(df.columns)
+            self._escreve_cabecalho([str(c) for c in self.colunas])
+        else:
+            df = df.reindex(columns=self.colunas)
+        for linha in _linhas_em_blocos(df, self.linhas_por_bloco):
+            self.linhas += 1
+            if self.engine == "xlsxwriter":
+                self.planilha.write_row(self.linhas, 0, linha)
+            else:
+                self.planilha.append(linha)
+
+    def fecha(self):
+        if self.engine == "xlsxwriter":
+            self.workbook.close()
+        else:
+            self.workbook.save(self.caminho)
+        self.logger.debug(f"{self.linhas} linhas gravadas em '{self.caminho}' com {self.engine}.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, erro, rastreamento):
+        self.fecha()
+        return False
+
+
+def escreve_excel(logger, df, caminho, aba="Mailing", engine=None, linhas_por_bloco=10_000):
+    """
+    Grava o DataFrame em um arquivo .xlsx linha a linha, com memória constante (ver EscritorExcel).
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        df (pd.DataFrame): DataFrame a ser salvo (cabeçalho com os nomes das colunas, sem índice).
+        caminho (str): Caminho do arquivo de saída.
+        aba (str): Nome da aba.
+        engine (str, opcional): "xlsxwriter" ou "openpyxl". Padrão é config["engine_escrita_excel"].
+        linhas_por_bloco (int): Linhas convertidas por vez para tipos nativos.
+    """
+    with EscritorExcel(logger, caminho, aba, engine, linhas_por_bloco) as escritor:
+        escritor.acrescenta(df)
+
+
+class GravacaoExcel(threading.Thread):
+    """
+    Grava um DataFrame em Excel em segundo plano, em um arquivo temporário na mesma pasta
+    do destino. O arquivo final só é substituído (de forma atômica) por quem chamar
+    `aguarda`, para que a substituição e eventuais avisos ao usuário ocorram na thread principal.
+    """
+
+    def __init__(self, logger, df, caminho, aba="Mailing"):
+        super().__init__(name="GravacaoExcel", daemon=True)
+        self.logger = logger
+        # Cópia rasa: colunas incluídas ou substituídas depois no DataFrame original
+        # não afetam a gravação
+        self.df = df.copy(deep=False)
+        self.caminho = caminho
+        self.aba = aba
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        descritor, self.temporario = tempfile.mkstemp(
+            prefix="~gravando_", suffix=".xlsx", dir=pasta)
+        os.close(descritor)
+        self.erro = None
+        self.inicio = time.perf_counter()
+
+    def run(self):
+        try:
+            escreve_excel(self.logger, self.df, self.temporario, self.aba)
+        except BaseException as e:
+            self.erro = e
+        finally:
+            self.df = None
+
+    def aguarda(self, substitui):
+        """
+        Aguarda o fim da gravação e move o arquivo temporário para o destino.
+        Args:
+            substitui (Callable[[str, str], None]): Função que move o temporário para o destino
+                (ex.: tratando arquivos abertos no Excel).
+        Returns:
+            float: Duração total da gravação, em segundos.
+        """
+        self.join()
+        try:
+            if self.erro is not None:
+                raise self.erro
+            substitui(self.temporario, self.caminho)
+        finally:
+            if os.path.exists(self.temporario):
+                os.remove(self.temporario)
+        return time.perf_counter() - self.inicio
@@ -0,0 +1,411 @@
+import argparse
+import hashlib
+import html
+import json
+import logging
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+import pandas as pd
+
+from config import config
+from descartes import cubo_descartes
+
+
+# Extensão dos arquivos de cada formato de relatório (o PNG mantém o nome sem extensão)
+EXTENSOES = {"png": "", "svg": ".svg", "html": ".html"}
+
+
+@lru_cache(maxsize=None)
+def _pyplot():
+    # O matplotlib é carregado apenas ao desenhar o primeiro relatório, com o backend sem
+    # interface gráfica (Agg) definido uma única vez por processo
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _prepara_tabela(df):
+    # Incluir índice como coluna
+    return df.reset_index().rename(columns={'index': 'Fonte'})
+
+
+def desenha_tabela(df, legenda, caminho, formato="png"):
+    """
+    Salva um DataFrame como imagem (PNG ou SVG) com título e legenda, ajustando largura e altura automaticamente.
+    Args:
+        df (pd.DataFrame): Tabela do relatório (índice com as fontes e linha 'TOTAL' ao final).
+        legenda (str): Legenda abaixo da tabela.
+        caminho (str): Caminho do arquivo de saída.
+        formato (str): "png" ou "svg" (vetorial, sem rasterização).
+    """
+    plt = _pyplot()
+    df = _prepara_tabela(df)
+    # Estimar largura de cada coluna com base no texto mais longo
+    col_widths = [max(df[col].astype(str).map(len).max(),
+                      len(str(col))) * 0.13 for col in df.columns]
+    total_width = sum(col_widths)
+    fig_height = len(df) * 0.2 + 2  # altura proporcional ao número de linhas
+    # Criar figura
+    fig, ax = plt.subplots(figsize=(total_width, fig_height))
+    ax.axis('off')
+    # Título
+    plt.title("People Analytics", fontsize=24, fontweight='bold',
+              loc='center', pad=10, fontname='Impact', color='#2B436C')
+    # Tabela
+    tabela = ax.table(
+        cellText=df.values,
+        colLabels=df.columns,
+        loc='center',
+        cellLoc='center',
+        colLoc='center'
+    )
+    # Aplicar cores nas colunas
+    n_cols = len(df.columns)
+    for (row, col), cell in tabela.get_celld().items():
+        cell.set_edgecolor('#bababa')  # Linha Cinza
+        if row == len(df):
+            cell.set_facecolor('#6F6F6E')  # Cinza
+            cell.set_text_props(color='white', weight='bold')
+        elif row == 0:
+            # Cabeçalho: azul escuro com texto branco
+            cell.set_facecolor('#2B436C')  # Azul escuro
+            cell.set_text_props(color='white', weight='bold')
+        else:
+            if col == 0:
+                cell.set_facecolor('#2B436C')  # Azul escuro
+                cell.set_text_props(color='white')
+            elif col == 1:
+                cell.set_facecolor('#31ACE3')  # Azul
+            elif col == n_cols - 1:
+                cell.set_facecolor('#CBD742')  # Verde
+            else:
+                cell.set_facecolor('#ffffff')  # Branco
+    tabela.auto_set_font_size(False)
+    tabela.set_fontsize(12)
+    tabela.scale(1, 1.5)
+    # Ajustar largura das colunas
+    for i in range(len(df.columns)):
+        tabela.auto_set_column_width(i)
+    # Legenda
+    plt.figtext(0.5, 0.01, legenda, wrap=True,
+                horizontalalignment='center', fontsize=10, style='italic')
+    # Ajustar margens para remover espaços em branco
+    plt.subplots_adjust(top=0.88, bottom=0.08)
+    # Salvar imagem
+    plt.savefig(caminho, format=formato, bbox_inches='tight', dpi=300)
+    plt.close(fig)
+
+
+def escreve_html(df, legenda, caminho):
+    """
+    Salva um DataFrame como uma página HTML autocontida (estilos embutidos), com as mesmas
+    cores do relatório em imagem.
+    Args:
+        df (pd.DataFrame): Tabela do relatório (índice com as fontes e linha 'TOTAL' ao final).
+        legenda (str): Legenda abaixo da tabela.
+        caminho (str): Caminho do arquivo de saída.
+    """
+    df = _prepara_tabela(df)
+    cabecalho = "".join(f"<th>{html.escape(str(c))}</th>" for c in df.columns)
+    linhas = []
+    for i, valores in enumerate(df.itertuples(index=False), start=1):
+        classe = ' class="total"' if i == len(df) else ""
+        celulas = "".join(f"<td>{html.escape(str(v))}</td>" for v in valores)
+        linhas.append(f"<tr{classe}>{celulas}</tr>")
+    pagina = f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(legenda)}</title>
+<style>
+body {{ font-family: Arial, sans-serif; display: flex; flex-direction: column; align-items: center; }}
+h1 {{ font-family: Impact, sans-serif; color: #2B436C; font-size: 32px; margin-bottom: 12px; }}
+table {{ border-collapse: collapse; font-size: 14px; }}
+th, td {{ border: 1px solid #bababa; padding: 4px 10px; text-align: center; white-space: nowrap; }}
+th {{ background: #2B436C; color: white; }}
+td:first-child {{ background: #2B436C; color: white; }}
+td:nth-child(2) {{ background: #31ACE3; }}
+td:last-child {{ background: #CBD742; }}
+tr.total td {{ background: #6F6F6E; color: white; font-weight: bold; }}
+p {{ font-size: 12px; font-style: italic; }}
+</style>
+</head>
+<body>
+<h1>People Analytics</h1>
+<table>
+<thead><tr>{cabecalho}</tr></thead>
+<tbody>
+{chr(10).join(linhas)}
+</tbody>
+</table>
+<p>{html.escape(legenda)}</p>
+</body>
+</html>
+"""
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(pagina)
+
+
+def renderiza_relatorio(df, legenda, caminho, formato="png"):
+    """
+    Gera o arquivo de um relatório no formato pedido. Executada nos processos do pool.
+    Returns:
+        str: Caminho do arquivo gerado.
+    """
+    if formato == "html":
+        escreve_html(df, legenda, caminho)
+    else:
+        desenha_tabela(df, legenda, caminho, formato)
+    return caminho
+
+
+def df_to_png(logger, df, legenda, filename):
+    """
+    Salva um DataFrame como imagem PNG com título e legenda, ajustando largura e altura automaticamente.
+    Parâmetros:
+    - df: pandas.DataFrame
+    - legenda: str, legenda abaixo da tabela
+    - filename: str, nome do arquivo de saída (default: 'tabela.png')
+    """
+    renderiza_relatorio(df, legenda, config['report_path'] + filename)
+    logger.debug(f"Imagem salva como '{filename}'")
+
+
+def hash_relatorio(df, legenda, formato):
+    """
+    Calcula o hash do conteúdo de um relatório (tabela, legenda e formato).
+    """
+    conteudo = f"{formato}\n{legenda}\n{df.to_csv()}"
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def _carrega_estado(caminho):
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _salva_estado(caminho, estado):
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(estado, arquivo, ensure_ascii=False, indent=1)
+    os.replace(temporario, caminho)
+
+
+def gera_relatorios(logger, relatorios, formato=None, workers=None):
+    """
+    Gera os relatórios de descarte em paralelo (um processo por relatório, até `workers`).
+    Relatórios cuja tabela não mudou desde a última geração com o mesmo nome (mesmo prefixo)
+    e cujo arquivo ainda existe não são gerados novamente.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        relatorios (dict): Nome do arquivo (sem extensão) -> (tabela, legenda).
+        formato (str, opcional): "png", "svg" ou "html". Padrão é config["relatorios"]["formato"].
+        workers (int, opcional): Processos simultâneos. Padrão é config["relatorios"]["workers"].
+    Returns:
+        list[str]: Caminhos dos relatórios gerados nesta chamada.
+    """
+    parametros = config.get("relatorios", {})
+    formato = formato or parametros.get("formato", "png")
+    # Mais processos que núcleos só somaria o custo de iniciar cada processo
+    workers = min(workers or parametros.get("workers", 4), os.cpu_count() or 1)
+    if formato not in EXTENSOES:
+        raise ValueError(f"Formato de relatório '{formato}' inválido. Use {list(EXTENSOES)}.")
+    caminho_estado = parametros.get("cache_path", "./cache/relatorios.json")
+    estado = _carrega_estado(caminho_estado)
+
+    pendentes = {}
+    for filename, (df, legenda) in relatorios.items():
+        caminho = config['report_path'] + filename + EXTENSOES[formato]
+        assinatura = hash_relatorio(df, legenda, formato)
+        if estado.get(caminho) == assinatura and os.path.exists(caminho):
+            logger.debug(f"Relatório '{filename}' inalterado. Mantendo o arquivo existente.")
+            continue
+        pendentes[caminho] = (df, legenda, assinatura)
+
+    gerados = []
+    # O estado é gravado mesmo se algum relatório falhar: os já gerados não são refeitos depois
+    try:
+        if len(pendentes) > 1 and workers > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pendentes))) as executor:
+                futuros = {executor.submit(renderiza_relatorio, df, legenda, caminho, formato): caminho
+                           for caminho, (df, legenda, _) in pendentes.items()}
+                erro = None
+                for futuro, caminho in futuros.items():
+                    try:
+                        gerados.append(futuro.result())
+                    except Exception as excecao:
+                        logger.error(f"Falha ao gerar o relatório '{caminho}': {excecao}")
+                        erro = erro or excecao
+                        continue
+                    estado[caminho] = pendentes[caminho][2]
+                    logger.debug(f"Relatório salvo como '{caminho}'")
+                if erro is not None:
+                    raise erro
+        else:
+            for caminho, (df, legenda, assinatura) in pendentes.items():
+                gerados.append(renderiza_relatorio(df, legenda, caminho, formato))
+                estado[caminho] = assinatura
+                logger.debug(f"Relatório salvo como '{caminho}'")
+    finally:
+        if gerados:
+            _salva_estado(caminho_estado, estado)
+    return gerados
+
+
+def caminho_cubo(prefixo, extensao):
+    return config['report_path'] + prefixo + "Descartes" + extensao
+
+
+def salva_cubo(logger, cubo, prefixo, formato=None):
+    """
+    Grava a tabela agregada de descartes da execução ao lado dos relatórios
+    (ex.: "Report/2025_01_31_manha_Descartes.parquet"), lida pelo Power BI e para gerar
+    os relatórios novamente (`python relatorios.py 2025_01_31_manha`). Sem o pyarrow, grava em CSV.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        cubo (pd.DataFrame): Tabela agregada de descartes (ver descartes.cubo_descartes).
+        prefixo (str): Prefixo dos arquivos da execução (ex.: "/2025_01_31_manha_").
+        formato (str, opcional): "parquet" ou "csv". Padrão é config["relatorios"]["formato_cubo"].
+    Returns:
+        str: Caminho do arquivo gravado.
+    """
+    formato = formato or config.get("relatorios", {}).get("formato_cubo", "parquet")
+    if formato == "parquet":
+        caminho = caminho_cubo(prefixo, ".parquet")
+        try:
+            cubo.to_parquet(caminho, index=False)
+            logger.debug(f"Tabela de descartes salva como '{caminho}'")
+            return caminho
+        except ImportError:
+            logger.debug("pyarrow não instalado. Salvando a tabela de descartes em CSV.")
+    caminho = caminho_cubo(prefixo, ".csv")
+    cubo.to_csv(caminho, index=False, encoding="utf-8-sig")
+    logger.debug(f"Tabela de descartes salva como '{caminho}'")
+    return caminho
+
+
+def le_cubo(prefixo):
+    """
+    Lê a tabela agregada de descartes gravada por `salva_cubo` (Parquet ou CSV).
+    Args:
+        prefixo (str): Prefixo dos arquivos da execução (ex.: "/2025_01_31_manha_").
+    Returns:
+        pd.DataFrame: Tabela agregada de descartes.
+    """
+    caminho = caminho_cubo(prefixo, ".parquet")
+    if os.path.exists(caminho):
+        return pd.read_parquet(caminho)
+    return pd.read_csv(caminho_cubo(prefixo, ".csv"), encoding="utf-8-sig")
+
+
+def tabela_cidade(cubo, cidade):
+    """
+    Monta a matriz de descartes de uma cidade a partir da tabela agregada: uma linha por fonte
+    com os leads brutos, os leads de cada primeiro critério de descarte (na ordem dos critérios),
+    os leads limpos e a linha 'TOTAL'.
+    Args:
+        cubo (pd.DataFrame): Tabela agregada de descartes.
+        cidade (str): Cidade do relatório.
+    Returns:
+        pd.DataFrame: Matriz de descartes, ou None se a cidade não tiver leads.
+    """
+    sub = cubo[cubo['Cidade'] == cidade]
+    if len(sub) == 0:
+        return None
+    brutos = sub.groupby('Fonte Limpa')['Leads'].sum().rename('Brutos')
+    limpos = sub[sub['Descarte'].isna()].groupby('Fonte Limpa')['Leads'].sum().rename('Limpos')
+    descartes = sub[sub['Descarte'].notna()]
+    ordem = descartes.sort_values('Ordem Descarte')['Descarte'].drop_duplicates().tolist()
+    pivot_df = descartes.pivot_table(
+        index='Fonte Limpa', columns='Descarte', values='Leads', aggfunc='sum', fill_value=0)
+    m = pd.DataFrame(brutos).join(pivot_df[ordem], how='outer').join(
+        limpos, how='outer').fillna(0).astype(int)
+    m = m.sort_values(["Brutos", "Limpos"], ascending=False)
+    m.loc['TOTAL'] = m.sum()
+    return m
+
+
+def relatorios_descartes(logger, cubo, cidades, prefixo, data):
+    """
+    Monta os relatórios de descarte de cada cidade a partir da tabela agregada.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        cubo (pd.DataFrame): Tabela agregada de descartes.
+        cidades (list[str]): Cidades dos relatórios.
+        prefixo (str): Prefixo dos arquivos da execução (ex.: "/2025_01_31_manha_").
+        data (str): Data da execução exibida na legenda (dd/mm/aaaa).
+    Returns:
+        dict: Nome do arquivo -> (tabela, legenda), no formato de `gera_relatorios`.
+    """
+    relatorios = {}
+    for cidade in cidades:
+        m = tabela_cidade(cubo, cidade)
+        if m is None:
+            continue
+        logger.debug(f"Dataframe da cidade {cidade}\n{m}")
+        relatorios[f"{prefixo}_Relatorio_{cidade.upper()}"] = (
+            m, f"Relatório de Leads da cidade de {cidade.capitalize()} no dia {data}")
+    return relatorios
+
+
+# Critérios de descarte, na ordem de prioridade (o primeiro verdadeiro é o descarte do lead)
+COLUNAS_DESCARTES = ['Descarte Cidade', 'Descarte Telefone Invalido', 'Descarte Contagem CPF',
+                     'Descarte Contagem Telefone', 'Descarte Idade', 'Descarte Escolaridade',
+                     'Descarte Atendimento Ativo', 'Descarte Sucesso 30 Dias', 'Descarte 7 Dias',
+                     'Descarte Visto Recentemente']
+
+
+def publica_descartes(logger, cubo, prefixo):
+    """
+    Grava a tabela agregada de descartes da execução e gera os relatórios de cada cidade.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        cubo (pd.DataFrame): Tabela agregada de descartes (ver descartes.cubo_descartes).
+        prefixo (str): Prefixo dos arquivos da execução (ex.: "/2025_01_31_manha_").
+    """
+    # Grava a tabela agregada da execução (lida pelo Power BI e para gerar os relatórios novamente)
+    salva_cubo(logger, cubo, prefixo)
+    # Monta a matriz de descarte de cada cidade (os relatórios são gerados em paralelo)
+    relatorios = relatorios_descartes(
+        logger, cubo, config['cidades'], prefixo, datetime.now().strftime("%d/%m/%Y"))
+    gera_relatorios(logger, relatorios)
+    logger.info("Relatórios salvos com sucesso")
+
+
+def print_descarte(logger, df, prefixo):
+    # Agrega os leads por cidade, fonte e primeiro critério de descarte
+    cubo = cubo_descartes(logger, df, COLUNAS_DESCARTES)
+    publica_descartes(logger, cubo, prefixo)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Gera novamente os relatórios de descarte a partir da tabela agregada de uma execução")
+    parser.add_argument("prefixo", help="Prefixo da execução (ex.: 2025_01_31_manha)")
+    parser.add_argument("--formato", choices=list(EXTENSOES), default=None,
+                        help="Formato dos relatórios (padrão: config)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger = logging.getLogger("relatorios")
+    prefixo = f"/{args.prefixo.strip('/_')}_"
+    data = datetime.strptime(prefixo[1:11], "%Y_%m_%d").strftime("%d/%m/%Y")
+    relatorios = relatorios_descartes(
+        logger, le_cubo(prefixo), config['cidades'], prefixo, data)
+    gerados = gera_relatorios(logger, relatorios, args.formato)
+    logger.info(f"{len(gerados)} relatórios gerados ({len(relatorios) - len(gerados)} inalterados)")
+
+
+if __name__ == "__main__":
+    main()
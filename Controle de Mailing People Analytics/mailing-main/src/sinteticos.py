@@ -0,0 +1,419 @@
+import argparse
+import logging
+import os
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import config
+from historico import COLUNAS_HISTORICO
+from planilhas import escreve_excel
+
+
+# Participação de cada layout no total de leads gerados (dividida entre os arquivos do layout)
+PESOS_LAYOUTS = {
+    "indeed": 0.45,
+    "facebook": 0.12,
+    "facaparte": 0.10,
+    "indique": 0.05,
+    "campanhas": 0.10,
+    "mailing": 0.18,
+}
+
+# Arquivo gerado para layouts sem entrada em config["sheets"] (ex.: facebook)
+ENTRADAS_EXTRAS = {
+    "facebook": {"path": "sintetico_facebook.csv", "layout": "facebook", "sep": ","},
+}
+
+# Nome do relatório de tratativas do R&S lido por get_history_blocks
+ARQUIVO_HISTORICO = "Recursos Humanos - Analitico Casos.xlsx"
+
+# Colunas do relatório de tratativas do R&S, na ordem gravada. Inclui as colunas de data lidas com
+# parse_dates pela leitura original (DATA, DATA CADASTRO, DATA TRATATIVA e DATA ENCERRAMENTO)
+COLUNAS_RELATORIO_RS = ["DATA", "DATA CADASTRO", *COLUNAS_HISTORICO, "DATA ENCERRAMENTO", "OBSERVAÇÃO"]
+
+# Cidades com as grafias encontradas nas exportações, DDD e peso de cada uma
+CIDADES = [
+    (["Uberlândia", "UBERLANDIA", "uberlandia - MG", "Uberlândia/MG", "Udia"], "34", 0.45),
+    (["Jundiaí", "JUNDIAI", "Jundiaí - SP", "jundiai sp"], "11", 0.12),
+    (["Barueri", "BARUERI - SP", "barueri"], "11", 0.08),
+    (["Aracaju", "ARACAJU/SE", "Aracajú"], "79", 0.10),
+    (["Hortolândia", "Hortolandia - SP", "HORTOLÂNDIA"], "19", 0.08),
+    (["São Paulo", "Campinas", "Uberaba", "Recife", "Araguari"], "11", 0.12),
+    ([None], "34", 0.05),
+]
+
+ESCOLARIDADES = [
+    "Ensino Médio Completo", "ensino medio completo", "ENSINO MÉDIO INCOMPLETO", "Médio completo",
+    "Ensino Superior Completo", "Superior incompleto", "superior cursando", "Técnico",
+    "Graduação", "Pós-graduação", "Ensino Fundamental Completo", "Fundamental incompleto",
+    "2º grau completo", "Cursando faculdade", None,
+]
+
+PRENOMES = np.array([
+    "Maria", "José", "Ana", "João", "Antônio", "Francisca", "Carlos", "Luíza", "Paulo",
+    "Adriana", "Lucas", "Juliana", "Marcos", "Patrícia", "Gabriel", "Fernanda", "Rafael",
+    "Aline", "Felipe", "Camila", "Bruno", "Letícia", "Thiago", "Débora",
+])
+SOBRENOMES = np.array([
+    "da Silva", "dos Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves",
+    "Pereira", "Lima", "Gomes", "Ribeiro", "Carvalho", "Araújo", "Conceição", "Simões",
+])
+
+# Valores de "Fonte" de cada layout (os layouts do Indeed e do Indique usam a fonte_padrao)
+FONTES = {
+    "facebook": ["tardenoite_udia", "aberto_jundiai", "50+_udia", "instagram_barueri",
+                 "meta_aracaju", "Conjunto 3"],
+    "facaparte": ["Indeed", "Instagram", "Facebook", "Site da empresa", "Indicação de amigo",
+                  "Sala de Empregos", "SINE", "Google", "TikTok", "LinkedIn", "Outros"],
+    "campanhas": ["Facebook", "Google Ads rhcontratacao", "TikTok", "Orgânico GA", "Linkedin"],
+    "mailing": ["base extra", "facebook", "evento faculdade", "leads semente",
+                "captação externa panfleto", "curriculos"],
+}
+
+MOTIVOS = ["Contato COM Sucesso", "Contato SEM Sucesso", "Não atende", "Desistência"]
+
+
+def _escolhe(rng, opcoes, linhas, pesos=None):
+    # np.random.choice converte None para texto em arrays mistos; sorteia as posições
+    indices = rng.choice(len(opcoes), size=linhas, p=pesos)
+    return np.array(opcoes, dtype=object)[indices]
+
+
+def cpfs_validos(bases):
+    """
+    Calcula os dígitos verificadores de CPFs a partir de bases de 9 dígitos.
+    Args:
+        bases (np.ndarray): Bases inteiras (0 a 999999999).
+    Returns:
+        np.ndarray: CPFs válidos com 11 dígitos, como texto.
+    """
+    digitos = (bases[:, None] // 10 ** np.arange(8, -1, -1)) % 10
+    d1 = (digitos @ np.arange(10, 1, -1)) * 10 % 11 % 10
+    digitos = np.column_stack([digitos, d1])
+    d2 = (digitos @ np.arange(11, 1, -1)) * 10 % 11 % 10
+    return pd.Series(bases * 100 + d1 * 10 + d2).astype(str).str.zfill(11).to_numpy(dtype=object)
+
+
+def gera_pessoas(rng, quantidade):
+    """
+    Gera os candidatos distintos (CPF, telefones, nome, cidade e escolaridade). Os leads são
+    sorteados entre eles, para que o mesmo candidato apareça em mais de uma fonte.
+    Args:
+        rng (np.random.Generator): Gerador aleatório.
+        quantidade (int): Quantidade de candidatos distintos.
+    Returns:
+        pd.DataFrame: Um candidato por linha, com os valores já padronizados.
+    """
+    cidades = rng.choice(len(CIDADES), size=quantidade, p=[c[2] for c in CIDADES])
+    grafias = np.empty(quantidade, dtype=object)
+    ddds = np.empty(quantidade, dtype=object)
+    for i, (variantes, ddd, _) in enumerate(CIDADES):
+        linhas = np.flatnonzero(cidades == i)
+        grafias[linhas] = _escolhe(rng, variantes, len(linhas))
+        ddds[linhas] = ddd
+    celulares = pd.Series(rng.integers(80_000_000, 100_000_000, quantidade)).astype(str)
+    return pd.DataFrame({
+        "cpf": cpfs_validos(rng.choice(999_999_999, size=quantidade, replace=False) + 1),
+        "telefone": (pd.Series(ddds) + "9" + celulares).to_numpy(dtype=object),
+        "telefone_2": (pd.Series(ddds) + "9" + pd.Series(
+            rng.integers(80_000_000, 100_000_000, quantidade)).astype(str)).to_numpy(dtype=object),
+        "nome": (pd.Series(PRENOMES[rng.integers(0, len(PRENOMES), quantidade)]) + " " +
+                 pd.Series(SOBRENOMES[rng.integers(0, len(SOBRENOMES), quantidade)]) + " " +
+                 pd.Series(SOBRENOMES[rng.integers(0, len(SOBRENOMES), quantidade)])
+                 ).to_numpy(dtype=object),
+        "cidade": grafias,
+        "escolaridade": _escolhe(rng, ESCOLARIDADES, quantidade),
+        "nascimento": (pd.Timestamp("1965-01-01") + pd.to_timedelta(
+            rng.integers(0, 365 * 45, quantidade), unit="D")).to_numpy(),
+    })
+
+
+def suja_cpfs(rng, cpfs, excel=False):
+    """
+    Aplica aos CPFs os problemas encontrados nas exportações: máscara, dígito verificador
+    errado, dígitos faltando, valores vazios e, no Excel, números sem os zeros à esquerda.
+    """
+    cpfs = pd.Series(cpfs, dtype=object)
+    sorteio = rng.random(len(cpfs))
+    mascarados = cpfs.str[:3] + "." + cpfs.str[3:6] + "." + cpfs.str[6:9] + "-" + cpfs.str[9:]
+    errados = cpfs.str[:10] + ((cpfs.str[10].astype(int) + 1) % 10).astype(str)
+    resultado = cpfs.where(sorteio < 0.45, mascarados)
+    resultado = resultado.mask(sorteio >= 0.88, errados)
+    resultado = resultado.mask(sorteio >= 0.93, cpfs.str[:9])
+    resultado = resultado.mask(sorteio >= 0.96, None)
+    if excel:
+        numericos = (sorteio < 0.3)
+        resultado = resultado.astype(object)
+        resultado[numericos] = cpfs[numericos].astype(np.int64).to_numpy()
+    return resultado.to_numpy(dtype=object)
+
+
+def suja_telefones(rng, telefones, excel=False, vazios=0.03):
+    """
+    Aplica aos telefones (DDD + 9 dígitos) os formatos encontrados nas exportações: máscara,
+    prefixo "55" (com e sem "+"), sem DDD, sem o nono dígito, inválidos e vazios. No Excel,
+    parte dos telefones vem como número.
+    """
+    telefones = pd.Series(telefones, dtype=object)
+    sorteio = rng.random(len(telefones))
+    formatos = [
+        (0.30, "(" + telefones.str[:2] + ") " + telefones.str[2:7] + "-" + telefones.str[7:]),
+        (0.50, telefones),
+        (0.65, "55" + telefones),
+        (0.78, "+55 " + telefones.str[:2] + " " + telefones.str[2:7] + "-" + telefones.str[7:]),
+        (0.88, telefones.str[2:]),
+        (0.97, telefones.str[:2] + telefones.str[3:]),
+        (1.00, telefones.str[7:]),
+    ]
+    resultado = pd.Series(None, index=telefones.index, dtype=object)
+    limite_anterior = 0.0
+    for limite, valores in formatos:
+        linhas = (sorteio >= limite_anterior) & (sorteio < limite)
+        resultado[linhas] = valores[linhas]
+        limite_anterior = limite
+    if excel:
+        numericos = (sorteio >= 0.30) & (sorteio < 0.50)
+        resultado[numericos] = telefones[numericos].astype(np.int64).to_numpy()
+    resultado[rng.random(len(telefones)) < vazios] = None
+    return resultado.to_numpy(dtype=object)
+
+
+def suja_nomes(rng, nomes):
+    # Caixa alta, caixa baixa e espaços extras
+    nomes = pd.Series(nomes, dtype=object)
+    sorteio = rng.random(len(nomes))
+    nomes = nomes.where(sorteio >= 0.2, nomes.str.upper())
+    nomes = nomes.where((sorteio < 0.2) | (sorteio >= 0.35), nomes.str.lower())
+    return nomes.where((sorteio < 0.35) | (sorteio >= 0.45), " " + nomes + "  ").to_numpy(dtype=object)
+
+
+def gera_leads(rng, pessoas, linhas, referencia):
+    """
+    Sorteia os leads entre os candidatos e gera os campos de cada envio de formulário.
+    Args:
+        rng (np.random.Generator): Gerador aleatório.
+        pessoas (pd.DataFrame): Candidatos de `gera_pessoas`.
+        linhas (int): Quantidade de leads.
+        referencia (datetime): Data da execução (os envios são dos 3 dias anteriores).
+    Returns:
+        pd.DataFrame: Leads com os valores padronizados de cada candidato e a data do envio.
+    """
+    leads = pessoas.iloc[rng.integers(0, len(pessoas), linhas)].reset_index(drop=True)
+    segundos = rng.integers(0, 3 * 24 * 3600, linhas)
+    leads["data"] = pd.Timestamp(referencia) - pd.to_timedelta(segundos, unit="s")
+    leads["email"] = (leads["nome"].str.split().str[0].str.lower() + "." +
+                      pd.Series(rng.integers(1, 9999, linhas)).astype(str) +
+                      _escolhe(rng, ["@gmail.com", "@hotmail.com", "@outlook.com.br", "@gmail",
+                                     " @yahoo.com.br"], linhas, [0.5, 0.25, 0.15, 0.05, 0.05]))
+    leads["email"] = leads["email"].mask(rng.random(linhas) < 0.1, None)
+    return leads
+
+
+def formata_idades(rng, nascimentos, envios, layout):
+    # Idade como data de nascimento (texto ou data do Excel), idade em anos ou vazia
+    nascimentos = pd.Series(nascimentos)
+    sorteio = rng.random(len(nascimentos))
+    if layout == "indique":
+        return _escolhe(rng, ["Sim", "SIM", "Não", None], len(nascimentos), [0.7, 0.15, 0.1, 0.05])
+    if layout in ("facaparte", "campanhas"):
+        idades = nascimentos.astype(object)
+    else:
+        idades = nascimentos.dt.strftime("%d/%m/%Y").astype(object)
+    anos = ((pd.Series(envios) - nascimentos).dt.days // 365).astype(str) + " anos"
+    idades = idades.where(sorteio < 0.85, anos)
+    return idades.mask(sorteio >= 0.95, None).to_numpy(dtype=object)
+
+
+def monta_layout(rng, leads, layout):
+    """
+    Monta o arquivo de um layout a partir dos leads, com as colunas de config["layouts"] e
+    os formatos de cada origem.
+    Args:
+        rng (np.random.Generator): Gerador aleatório.
+        leads (pd.DataFrame): Leads de `gera_leads`.
+        layout (str): Nome do layout.
+    Returns:
+        pd.DataFrame: Conteúdo do arquivo (colunas com os nomes originais do layout).
+    """
+    linhas = len(leads)
+    excel = layout in ("facaparte", "indique", "campanhas")
+    campos = {
+        "Nome": suja_nomes(rng, leads["nome"]),
+        "CPF": suja_cpfs(rng, leads["cpf"], excel),
+        "Telefone": suja_telefones(rng, leads["telefone"], excel),
+        "Telefone 2": suja_telefones(rng, leads["telefone_2"], excel, vazios=0.6),
+        "Email": leads["email"].to_numpy(dtype=object),
+        "Idade": formata_idades(rng, leads["nascimento"], leads["data"], layout),
+        "Escolaridade": leads["escolaridade"].to_numpy(dtype=object),
+        "Cidade de Origem": leads["cidade"].to_numpy(dtype=object),
+        "Cidade da Vaga": leads["cidade"].to_numpy(dtype=object),
+        "Experiência Relevante": _escolhe(
+            rng, ["Atendente de telemarketing - 1 ano", "Vendedor - 6 meses", None], linhas),
+        "Cargo": _escolhe(rng, ["Atendente de Telemarketing", "Operador de Atendimento"], linhas),
+        "Matricula Indicador": _escolhe(
+            rng, ["123456", "E123456", "enumber 204518", 98765, None], linhas),
+        "Nome Indicador": suja_nomes(rng, _escolhe(rng, list(PRENOMES), linhas)),
+        "Fonte": _escolhe(rng, FONTES.get(layout, [None]), linhas),
+    }
+    if excel:
+        campos["Data Form"] = leads["data"].dt.floor("s").to_numpy(dtype=object)
+    elif layout == "indeed":
+        # O Indeed exporta apenas a data, sem horário
+        campos["Data Form"] = leads["data"].dt.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    else:
+        campos["Data Form"] = leads["data"].dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(dtype=object)
+    colunas = config["layouts"][layout]
+    if layout == "indeed":
+        # Layout posicional: colunas fora do layout preenchidas como na exportação
+        extras = {3: "Novo", 10: "Indeed", 11: "Sim; Não; Sim", 12: "", 13: "https://indeed.com/r/abcdef"}
+        total = max(max(colunas.values()), max(extras)) + 1
+        df = pd.DataFrame({posicao: extras.get(posicao, "") for posicao in range(total)},
+                          index=range(linhas))
+        for nome, posicao in colunas.items():
+            df[posicao] = campos[nome]
+        df.columns = [f"coluna_{posicao}" for posicao in range(total)]
+        return df
+    return pd.DataFrame({original: campos[nome] for nome, original in colunas.items()})
+
+
+def entradas_sinteticas(sheets=None):
+    """
+    Retorna as entradas lidas pelo pipeline: as de config["sheets"] e as de ENTRADAS_EXTRAS
+    para layouts sem arquivo configurado.
+    """
+    sheets = dict(sheets or config["sheets"])
+    layouts = {info["layout"] for info in sheets.values()}
+    for nome, info in ENTRADAS_EXTRAS.items():
+        if info["layout"] not in layouts:
+            sheets[nome] = info
+    return sheets
+
+
+def gera_historico(logger, rng, pessoas, caminho, linhas, referencia):
+    """
+    Gera o relatório de tratativas do R&S ("Analitico Casos") com as colunas de
+    COLUNAS_RELATORIO_RS, o cabeçalho na linha 7 e parte dos telefones dos candidatos em formatos
+    variados (número, texto com máscara e "55"). O caso é cadastrado até 20 dias antes da tratativa
+    e, se finalizado, encerrado até 2 dias depois dela (sem passar da referência).
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        rng (np.random.Generator): Gerador aleatório.
+        pessoas (pd.DataFrame): Candidatos de `gera_pessoas`.
+        caminho (str): Caminho do arquivo .xlsx.
+        linhas (int): Quantidade de tratativas.
+        referencia (datetime): Data da execução (as tratativas são dos 60 dias anteriores).
+    """
+    telefones = pd.Series(pessoas["telefone"].to_numpy()[rng.integers(0, len(pessoas), linhas)])
+    outros = pd.Series(rng.integers(31_980_000_000, 31_999_999_999, linhas)).astype(str)
+    telefones = telefones.where(rng.random(linhas) < 0.9, outros)
+    sorteio = rng.random(linhas)
+    formatados = telefones.astype(np.int64).astype(object)
+    formatados = formatados.where(sorteio < 0.5, "(" + telefones.str[:2] + ") " + telefones.str[2:])
+    formatados = formatados.where(sorteio < 0.8, "55" + telefones)
+    segundos = rng.integers(0, 60 * 24 * 3600, linhas)
+    datas = (pd.Timestamp(referencia) - pd.to_timedelta(segundos, unit="s")).floor("s")
+    valores = {
+        "TELEFONE CONTATO": formatados.to_numpy(dtype=object),
+        "DATA TRATATIVA": datas.to_numpy(dtype=object),
+        "MOTIVO ": _escolhe(rng, MOTIVOS, linhas, [0.3, 0.4, 0.2, 0.1]),
+        "FLAG FINALIZADO ": _escolhe(rng, [1, 0], linhas, [0.85, 0.15]),
+        "FLAG ULTIMA TRATATIVA": _escolhe(rng, [1, 0], linhas, [0.7, 0.3]),
+        "FILA": _escolhe(rng, ["Ativo", "Receptivo", "Reativação"], linhas, [0.7, 0.2, 0.1]),
+    }
+    cadastro = (datas - pd.to_timedelta(rng.integers(0, 20 * 24 * 3600, linhas), unit="s")).floor("s")
+    encerramento = (datas + pd.to_timedelta(rng.integers(0, 2 * 24 * 3600, linhas), unit="s")).floor("s")
+    encerramento = encerramento.where(encerramento <= pd.Timestamp(referencia), pd.Timestamp(referencia))
+    finalizado = valores["FLAG FINALIZADO "] == 1
+    relatorio = pd.DataFrame({
+        "DATA": cadastro.normalize().to_numpy(dtype=object),
+        "DATA CADASTRO": cadastro.to_numpy(dtype=object),
+        **valores,
+        "DATA ENCERRAMENTO": np.where(finalizado, encerramento.to_numpy(dtype=object), None),
+        "OBSERVAÇÃO": _escolhe(rng, ["", "retornar", None], linhas),
+    })[COLUNAS_RELATORIO_RS]
+    # Título na linha 1 (cabeçalho gravado por escreve_excel), 5 linhas em branco e o
+    # cabeçalho do relatório na linha 7
+    titulo = np.full((6, relatorio.shape[1]), None, dtype=object)
+    titulo[0, 0] = f"Gerado em {referencia:%d/%m/%Y %H:%M}"
+    titulo[5] = relatorio.columns
+    planilha = pd.DataFrame(
+        np.concatenate([titulo, relatorio.to_numpy(dtype=object)]),
+        columns=["Recursos Humanos - Analitico Casos"] + [""] * (relatorio.shape[1] - 1))
+    escreve_excel(logger, planilha, caminho, aba="Tratativas")
+
+
+def gera_entradas(logger, pasta, linhas, seed=0, referencia=None, linhas_historico=None,
+                  sheets=None):
+    """
+    Gera na pasta os arquivos de entrada sintéticos de todos os layouts de config["layouts"]
+    (com os nomes e abas de config["sheets"]) e o relatório de tratativas do R&S. Com a mesma
+    semente e referência, os arquivos gerados são sempre os mesmos.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        pasta (str): Pasta de entrada a ser preenchida.
+        linhas (int): Total de leads, dividido entre os arquivos conforme PESOS_LAYOUTS.
+        seed (int): Semente do gerador aleatório.
+        referencia (datetime, opcional): Data da execução simulada. Padrão é agora.
+        linhas_historico (int, opcional): Tratativas do relatório do R&S. Padrão é metade dos leads.
+        sheets (dict, opcional): Entradas configuradas. Padrão é config["sheets"].
+    Returns:
+        dict: Entradas geradas, no formato de config["sheets"] (para get_all_sheets).
+    """
+    referencia = referencia or datetime.now()
+    linhas_historico = linhas // 2 if linhas_historico is None else linhas_historico
+    rng = np.random.default_rng(seed)
+    os.makedirs(pasta, exist_ok=True)
+    sheets = entradas_sinteticas(sheets)
+    # Entradas que apontam para o mesmo arquivo geram um único arquivo
+    arquivos = {}
+    for info in sheets.values():
+        arquivos.setdefault(info["path"], info)
+    por_layout = {}
+    for info in arquivos.values():
+        por_layout.setdefault(info["layout"], []).append(info)
+    pesos = {layout: PESOS_LAYOUTS.get(layout, 0.05) for layout in por_layout}
+    # Com 3 candidatos para cada lead, cerca de 15% dos leads repetem um candidato já sorteado
+    pessoas = gera_pessoas(rng, max(linhas * 3, 1))
+    for layout, infos in sorted(por_layout.items()):
+        quantidade = int(round(linhas * pesos[layout] / sum(pesos.values())))
+        divisao = np.array_split(np.arange(quantidade), len(infos))
+        for info, parte in zip(infos, divisao):
+            leads = gera_leads(rng, pessoas, len(parte), referencia)
+            df = monta_layout(rng, leads, layout)
+            caminho = os.path.join(pasta, info["path"])
+            if caminho.endswith((".xlsx", ".xls")):
+                escreve_excel(logger, df, caminho, aba=info["sheet"])
+            else:
+                df.to_csv(caminho, index=False, sep=info.get("sep") or ",", encoding="utf-8")
+            logger.debug(f"{len(df)} leads gravados em '{caminho}'")
+    gera_historico(logger, rng, pessoas, os.path.join(pasta, ARQUIVO_HISTORICO),
+                   linhas_historico, referencia)
+    logger.info(
+        f"Entradas sintéticas geradas em '{pasta}': {linhas} leads em {len(arquivos)} arquivos "
+        f"e {linhas_historico} tratativas no relatório do R&S")
+    return sheets
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Gera arquivos de entrada sintéticos (todos os layouts) e o relatório do R&S")
+    parser.add_argument("pasta", help="Pasta onde os arquivos serão gerados")
+    parser.add_argument("--linhas", type=int, default=100_000, help="Total de leads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--historico", type=int, default=None,
+                        help="Tratativas do relatório do R&S (padrão: metade dos leads)")
+    parser.add_argument("--referencia", default=None,
+                        help="Data da execução simulada (AAAA-MM-DD HH:MM), para arquivos reprodutíveis")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    referencia = datetime.fromisoformat(args.referencia) if args.referencia else None
+    gera_entradas(logging.getLogger("sinteticos"), args.pasta, args.linhas, args.seed,
+                  referencia, args.historico)
+
+
+if __name__ == "__main__":
+    main()
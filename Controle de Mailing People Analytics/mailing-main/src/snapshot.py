@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from config import config
+
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, lendo em blocos.
+    Args:
+        caminho (str): Caminho do arquivo.
+        tamanho_bloco (int): Tamanho de cada bloco lido, em bytes.
+    Returns:
+        str: Hash hexadecimal do conteúdo.
+    """
+    h = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _salva_dados(logger, df, destino_base):
+    """
+    Salva o DataFrame em Parquet (colunas tipadas). Se o pyarrow não estiver instalado
+    ou alguma coluna tiver tipos mistos não suportados pelo Parquet, salva em pickle.
+    Returns:
+        str: Formato utilizado ('parquet' ou 'pickle').
+    """
+    temporario = destino_base + ".tmp"
+    try:
+        df.to_parquet(temporario, index=True)
+        formato = "parquet"
+    except Exception as e:
+        logger.debug(f"Snapshot em Parquet indisponível ({e}). Usando pickle.")
+        df.to_pickle(temporario)
+        formato = "pickle"
+    os.replace(temporario, f"{destino_base}.{formato}")
+    return formato
+
+
+def carrega_snapshot(logger, caminho, ler, chave="", pasta=None):
+    """
+    Retorna o conteúdo de um arquivo de entrada a partir de um snapshot binário local,
+    lendo o arquivo original (através de `ler`) apenas quando ele mudou.
+    O snapshot é válido quando o tamanho e a data de modificação do arquivo são os mesmos;
+    se apenas a data mudou, o hash do conteúdo é comparado antes de descartar o snapshot.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        caminho (str): Caminho do arquivo de entrada.
+        ler (Callable[[], pd.DataFrame]): Função que lê o arquivo original.
+        chave (str): Complemento da chave do snapshot (ex.: aba e layout lidos).
+        pasta (str, opcional): Pasta dos snapshots. Padrão é config["snapshot_path"].
+    Returns:
+        pd.DataFrame: Conteúdo do arquivo.
+    """
+    pasta = pasta or config["snapshot_path"]
+    stat = os.stat(caminho)
+    nome = hashlib.sha1(
+        f"{os.path.abspath(caminho)}|{chave}".encode("utf-8")).hexdigest()[:20]
+    base = os.path.join(pasta, nome)
+    meta_path = base + ".json"
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as arquivo:
+            meta = json.load(arquivo)
+    conteudo = None
+    if meta and os.path.exists(f"{base}.{meta['formato']}") and meta["tamanho"] == stat.st_size:
+        valido = meta["mtime_ns"] == stat.st_mtime_ns
+        if not valido:
+            conteudo = hash_arquivo(caminho)
+            valido = conteudo == meta["hash"]
+            if valido:
+                meta["mtime_ns"] = stat.st_mtime_ns
+                with open(meta_path, "w", encoding="utf-8") as arquivo:
+                    json.dump(meta, arquivo)
+        if valido:
+            logger.info(f"Usando snapshot de '{caminho}' (arquivo sem alterações).")
+            if meta["formato"] == "parquet":
+                return pd.read_parquet(f"{base}.parquet")
+            return pd.read_pickle(f"{base}.pickle")
+    df = ler()
+    os.makedirs(pasta, exist_ok=True)
+    for formato in ("parquet", "pickle"):
+        if os.path.exists(f"{base}.{formato}"):
+            os.remove(f"{base}.{formato}")
+    meta = {
+        "caminho": os.path.abspath(caminho),
+        "chave": chave,
+        "tamanho": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": conteudo or hash_arquivo(caminho),
+        "formato": _salva_dados(logger, df, base),
+    }
+    with open(meta_path, "w", encoding="utf-8") as arquivo:
+        json.dump(meta, arquivo)
+    logger.debug(f"Snapshot de '{caminho}' atualizado em '{base}.{meta['formato']}'.")
+    return df
+
+
+def limpa_snapshots(logger, pasta=None):
+    """
+    Remove todos os snapshots da pasta de snapshots.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        pasta (str, opcional): Pasta dos snapshots. Padrão é config["snapshot_path"].
+    """
+    pasta = pasta or config["snapshot_path"]
+    if not os.path.isdir(pasta):
+        return
+    removidos = 0
+    for arquivo in os.listdir(pasta):
+        if arquivo.endswith((".json", ".parquet", ".pickle", ".tmp")):
+            os.remove(os.path.join(pasta, arquivo))
+            removidos += 1
+    logger.info(f"Cache de leitura limpo ({removidos} arquivos removidos).")
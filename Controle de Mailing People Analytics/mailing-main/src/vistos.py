@@ -0,0 +1,223 @@
+import sqlite3
+import uuid
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom sobre chaves numéricas (CPF e telefone padronizados), usado para
+    descartar rapidamente, sem consultar o SQLite, as chaves que nunca foram vistas.
+    As posições são calculadas de forma vetorizada com NumPy (hash duplo a partir do
+    splitmix64), de modo que o filtro pode ser gravado em disco e reaproveitado.
+    """
+
+    def __init__(self, bits=2 ** 26, hashes=7):
+        self.bits = int(bits)
+        self.hashes = int(hashes)
+        self.vetor = np.zeros((self.bits + 7) // 8, dtype=np.uint8)
+
+    @staticmethod
+    def _mistura(valores):
+        # splitmix64 (aritmética módulo 2**64)
+        with np.errstate(over="ignore"):
+            z = valores + np.uint64(0x9E3779B97F4A7C15)
+            z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            return z ^ (z >> np.uint64(31))
+
+    def _posicoes(self, tipo, chaves):
+        semente = np.uint64(sum(tipo.encode("utf-8")) * 0x100000001B3)
+        h1 = self._mistura(chaves.astype(np.uint64) ^ semente)
+        h2 = self._mistura(h1) | np.uint64(1)
+        i = np.arange(self.hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return (h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(self.bits)
+
+    def adiciona(self, tipo, chaves):
+        """
+        Adiciona chaves numéricas (np.ndarray de inteiros) ao filtro.
+        """
+        if len(chaves) == 0:
+            return
+        posicoes = self._posicoes(tipo, chaves).ravel()
+        np.bitwise_or.at(self.vetor, (posicoes >> np.uint64(3)).astype(np.int64),
+                         (1 << (posicoes & np.uint64(7))).astype(np.uint8))
+
+    def contem(self, tipo, chaves):
+        """
+        Retorna, para cada chave, False se ela certamente não foi adicionada
+        e True se ela possivelmente foi adicionada.
+        """
+        if len(chaves) == 0:
+            return np.zeros(0, dtype=bool)
+        posicoes = self._posicoes(tipo, chaves)
+        bytes_ = self.vetor[(posicoes >> np.uint64(3)).astype(np.int64)]
+        return ((bytes_ >> (posicoes & np.uint64(7)).astype(np.uint8)) & 1).all(axis=1)
+
+    def salva(self, caminho, versao):
+        temporario = caminho + ".tmp.npz"
+        np.savez(temporario, vetor=self.vetor, bits=self.bits,
+                 hashes=self.hashes, versao=versao)
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carrega(cls, caminho, bits, hashes, versao):
+        """
+        Carrega o filtro gravado, ou None se ele não existir, tiver outros parâmetros
+        ou estiver desatualizado em relação à base de chaves vistas.
+        """
+        if not os.path.exists(caminho):
+            return None
+        with np.load(caminho) as dados:
+            if (int(dados["bits"]) != bits or int(dados["hashes"]) != hashes
+                    or str(dados["versao"]) != versao):
+                return None
+            filtro = cls(bits, hashes)
+            filtro.vetor = dados["vetor"]
+        return filtro
+
+
+def chaves_numericas(chaves):
+    """
+    Converte chaves compostas apenas por dígitos para inteiros.
+    Args:
+        chaves (pd.Series): Chaves padronizadas (texto).
+    Returns:
+        tuple: (np.ndarray de inteiros, máscara das chaves convertidas).
+    """
+    texto = chaves.astype(str)
+    numericas = (texto.str.fullmatch(r"\d{1,18}")).to_numpy(dtype=bool)
+    valores = np.zeros(len(texto), dtype=np.int64)
+    valores[numericas] = texto[numericas].astype(np.int64).to_numpy()
+    return valores, numericas
+
+
+def abre_vistos(caminho):
+    """
+    Abre (criando se necessário) a base local de chaves (CPF e telefone) já vistas em execuções
+    anteriores, com a data e a fonte da primeira ocorrência.
+    Args:
+        caminho (str): Caminho do arquivo SQLite.
+    Returns:
+        sqlite3.Connection: Conexão com a base.
+    """
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    # Tabela sem rowid: a chave primária é o próprio índice de busca
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS vistos ("
+        "tipo TEXT NOT NULL, chave TEXT NOT NULL, primeira_data TEXT, primeira_fonte TEXT, "
+        "ultima_data TEXT, ultima_execucao TEXT, anterior_data TEXT, "
+        "PRIMARY KEY (tipo, chave)) WITHOUT ROWID")
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS controle (chave TEXT PRIMARY KEY, valor TEXT)")
+    return conexao
+
+
+def versao_vistos(conexao):
+    linha = conexao.execute(
+        "SELECT valor FROM controle WHERE chave = 'versao'").fetchone()
+    return linha[0] if linha else "0"
+
+
+def carrega_filtro(logger, conexao, caminho, bits, hashes):
+    """
+    Carrega o filtro de Bloom da base de chaves vistas, reconstruindo-o a partir do SQLite
+    quando não existe ou está desatualizado.
+    Args:
+        logger (logging.Logger): Logger para registrar informações e depuração.
+        conexao (sqlite3.Connection): Conexão com a base de chaves vistas.
+        caminho (str): Caminho do arquivo do filtro.
+        bits (int): Tamanho do filtro em bits.
+        hashes (int): Quantidade de funções de hash.
+    Returns:
+        FiltroBloom: Filtro com todas as chaves da base.
+    """
+    versao = versao_vistos(conexao)
+    filtro = FiltroBloom.carrega(caminho, bits, hashes, versao)
+    if filtro is not None:
+        return filtro
+    logger.info("Reconstruindo o filtro de Bloom das chaves vistas.")
+    filtro = FiltroBloom(bits, hashes)
+    cursor = conexao.execute("SELECT tipo, chave FROM vistos")
+    while True:
+        linhas = cursor.fetchmany(500_000)
+        if not linhas:
+            break
+        lote = pd.DataFrame(linhas, columns=["tipo", "chave"])
+        for tipo, grupo in lote.groupby("tipo"):
+            valores, numericas = chaves_numericas(grupo["chave"])
+            filtro.adiciona(tipo, valores[numericas])
+    filtro.salva(caminho, versao)
+    return filtro
+
+
+def consulta_vistos(conexao, tipo, chaves, execucao, limite, filtro=None):
+    """
+    Busca as chaves vistas em outra execução a partir da data limite.
+    Args:
+        conexao (sqlite3.Connection): Conexão com a base de chaves vistas.
+        tipo (str): Tipo da chave ("cpf" ou "telefone").
+        chaves (pd.Series): Chaves distintas do lote atual.
+        execucao (str): Identificador da execução atual (reexecuções não contam como repetição).
+        limite (str): Data mínima (ISO) da ocorrência anterior.
+        filtro (FiltroBloom, opcional): Filtro para evitar consultar chaves nunca vistas.
+    Returns:
+        set: Chaves vistas recentemente.
+    """
+    if filtro is not None:
+        valores, numericas = chaves_numericas(chaves)
+        possiveis = ~numericas
+        possiveis[numericas] = filtro.contem(tipo, valores[numericas])
+        chaves = chaves[possiveis]
+    conexao.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS lote_vistos (chave TEXT PRIMARY KEY)")
+    conexao.execute("DELETE FROM lote_vistos")
+    conexao.executemany(
+        "INSERT OR IGNORE INTO lote_vistos VALUES (?)", ((c,) for c in chaves))
+    linhas = conexao.execute(
+        "SELECT v.chave FROM lote_vistos l JOIN vistos v ON v.tipo = ? AND v.chave = l.chave "
+        "WHERE ((v.ultima_execucao != ? AND v.ultima_data >= ?) "
+        "OR (v.ultima_execucao = ? AND v.anterior_data >= ?))",
+        (tipo, execucao, limite, execucao, limite)).fetchall()
+    return {linha[0] for linha in linhas}
+
+
+def registra_vistos(conexao, tipo, chaves, fontes, data, execucao, filtro=None):
+    """
+    Registra as chaves do lote atual. A data e a fonte da primeira ocorrência são mantidas;
+    a última ocorrência passa a ser a execução atual.
+    Args:
+        conexao (sqlite3.Connection): Conexão com a base de chaves vistas.
+        tipo (str): Tipo da chave ("cpf" ou "telefone").
+        chaves (pd.Series): Chaves distintas do lote atual.
+        fontes (pd.Series): Fonte de cada chave (mesmo índice de `chaves`).
+        data (str): Data (ISO) da execução.
+        execucao (str): Identificador da execução atual.
+        filtro (FiltroBloom, opcional): Filtro atualizado com as novas chaves.
+    """
+    # Chaves ordenadas: as inserções seguem a ordem do índice (páginas do B-tree em sequência)
+    ordem = np.argsort(chaves.to_numpy(dtype=object).astype(str), kind="stable")
+    fontes = fontes.astype(object).where(fontes.notna(), None)
+    conexao.executemany(
+        "INSERT INTO vistos VALUES (?, ?, ?, ?, ?, ?, NULL) "
+        "ON CONFLICT(tipo, chave) DO UPDATE SET "
+        "anterior_data = CASE WHEN vistos.ultima_execucao = excluded.ultima_execucao "
+        "THEN vistos.anterior_data ELSE vistos.ultima_data END, "
+        "ultima_data = excluded.ultima_data, ultima_execucao = excluded.ultima_execucao",
+        ((tipo, chave, data, fonte, data, execucao)
+         for chave, fonte in zip(chaves.to_numpy(dtype=object)[ordem],
+                                 fontes.to_numpy(dtype=object)[ordem])))
+    # Nova versão da base: filtros gravados antes desta atualização deixam de ser válidos
+    conexao.execute(
+        "INSERT OR REPLACE INTO controle VALUES ('versao', ?)", (uuid.uuid4().hex,))
+    if filtro is not None:
+        valores, numericas = chaves_numericas(chaves)
+        filtro.adiciona(tipo, valores[numericas])
@@ -0,0 +1,37 @@
+import logging
+import os
+import sys
+
+import pytest
+
+
+# Os módulos de src são importados pelo nome, como em `python clean.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("testes")
+
+
+@pytest.fixture
+def escreve_relatorio_rs():
+    """
+    Grava um relatório de tratativas do R&S ("Analitico Casos") no formato real: título na
+    linha 1 e cabeçalho da aba Tratativas na linha 7.
+    """
+    def escreve(caminho, tratativas, aba="Tratativas"):
+        from openpyxl import Workbook
+
+        pasta = Workbook()
+        planilha = pasta.active
+        planilha.title = aba
+        planilha.append(["Recursos Humanos - Analitico Casos"])
+        for _ in range(5):
+            planilha.append([])
+        planilha.append(list(tratativas.columns))
+        for linha in tratativas.itertuples(index=False):
+            planilha.append([None if v is None or v != v else v for v in linha])
+        pasta.save(caminho)
+        return caminho
+    return escreve
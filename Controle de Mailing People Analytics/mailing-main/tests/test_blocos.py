@@ -0,0 +1,116 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from arquivos import DivisaoPlanilhasEmBlocos, divide_planilhas
+from dataset import GravacaoDataset, grava_dataset
+from descartes import cubo_descartes, filtra_idade, soma_cubos
+from limpeza import avisa_fontes_nao_mapeadas, map_fonte
+from planilhas import EscritorExcel, escreve_excel
+from relatorios import COLUNAS_DESCARTES
+
+
+def _blocos(df, tamanho):
+    return [df.iloc[inicio:inicio + tamanho] for inicio in range(0, len(df), tamanho)]
+
+
+def _leads(linhas, seed=0):
+    rng = np.random.default_rng(seed)
+    cidades = np.array(["Uberlandia", "Uberaba", "Araguari", None], dtype=object)
+    fontes = np.array(["Indeed", "Site", "Infojobs", None], dtype=object)
+    leads = pd.DataFrame({
+        "Nome Limpo": [f"pessoa {i}" for i in range(linhas)],
+        "CPF Limpo": rng.integers(1, 10**11, linhas).astype(str),
+        "Telefone Limpo": rng.integers(10**10, 10**11, linhas).astype(str),
+        "Telefone 2 Limpo": pd.Series(rng.integers(10**10, 10**11, linhas).astype(str)).where(
+            rng.random(linhas) < 0.5, None),
+        "Fonte Limpa": rng.choice(fontes, linhas),
+        "Modalidade da Entrevista": "ONLINE",
+        "Cidade": rng.choice(cidades, linhas),
+        "Idade Limpo": pd.Series(rng.integers(15, 60, linhas), dtype=object).where(
+            rng.random(linhas) < 0.9, None),
+        "Data Captacao": "18/10/2026",
+        "Turno": rng.choice(["MANHA", "TARDE"], linhas),
+    })
+    for coluna in COLUNAS_DESCARTES:
+        leads[coluna] = rng.random(linhas) < 0.1
+    leads["Planilha"] = leads["Cidade"].fillna("OUTRAS").str.upper() + "_" + leads["Turno"]
+    return leads
+
+
+@pytest.mark.parametrize("engine", ["xlsxwriter", "openpyxl"])
+def test_excel_em_blocos_igual_ao_inteiro(logger, tmp_path, engine):
+    leads = _leads(250)
+    escreve_excel(logger, leads, tmp_path / "inteiro.xlsx", engine=engine)
+    with EscritorExcel(logger, tmp_path / "blocos.xlsx", engine=engine) as escritor:
+        for bloco in _blocos(leads, 70):
+            escritor.acrescenta(bloco)
+    inteiro = pd.read_excel(tmp_path / "inteiro.xlsx", dtype=str)
+    pd.testing.assert_frame_equal(pd.read_excel(tmp_path / "blocos.xlsx", dtype=str), inteiro)
+    assert len(inteiro) == len(leads)
+
+
+def test_planilhas_em_blocos_iguais_as_do_mailing_inteiro(logger, tmp_path):
+    mailing = _leads(1800)
+    (tmp_path / "inteiro").mkdir()
+    (tmp_path / "blocos").mkdir()
+    divide_planilhas(logger, mailing.copy(), str(tmp_path / "inteiro"), "/prefixo", arquivos_por_planilha=1)
+    divisao = DivisaoPlanilhasEmBlocos(logger, str(tmp_path / "blocos"), "/prefixo", arquivos_por_planilha=1)
+    for bloco in _blocos(mailing, 250):
+        divisao.acrescenta(bloco.copy())
+    divisao.conclui()
+    arquivos = sorted(os.listdir(tmp_path / "inteiro"))
+    assert sorted(os.listdir(tmp_path / "blocos")) == arquivos
+    # 1800 leads em 8 planilhas: mais de 100 linhas por planilha, divididas em vários arquivos
+    assert len(arquivos) > 8
+    for arquivo in arquivos:
+        assert (tmp_path / "blocos" / arquivo).read_bytes() == (tmp_path / "inteiro" / arquivo).read_bytes()
+
+
+def test_soma_dos_cubos_dos_blocos_igual_ao_cubo_inteiro(logger):
+    leads = _leads(2000, seed=3)
+    inteiro = cubo_descartes(logger, leads, COLUNAS_DESCARTES)
+    somado = soma_cubos(logger, [cubo_descartes(logger, bloco, COLUNAS_DESCARTES)
+                                 for bloco in _blocos(leads, 300)])
+    pd.testing.assert_frame_equal(somado, inteiro)
+
+
+def test_dataset_em_blocos_igual_ao_inteiro(logger, tmp_path):
+    pytest.importorskip("pyarrow")
+    leads = _leads(600, seed=5).drop(columns=["Planilha"])
+    grava_dataset(logger, leads, str(tmp_path / "inteiro"))
+    with GravacaoDataset(logger, str(tmp_path / "blocos")) as gravacao:
+        for bloco in _blocos(leads, 130):
+            gravacao.acrescenta(bloco)
+    assert len(gravacao.arquivos) == 2
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "blocos"), pd.read_parquet(tmp_path / "inteiro"))
+
+
+def test_fontes_nao_mapeadas_avisadas_uma_vez(logger, caplog):
+    fontes = {"INDEED": ["indeed"], "SITE": ["site"]}
+    leads = pd.DataFrame({"Fonte": ["Indeed", "Panfleto", "Radio", "Site", "Panfleto", "", None] * 30})
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        esperado = map_fonte(logger, leads.copy(), "Fonte", fontes)["Fonte Limpa"]
+    aviso_inteiro = [r.getMessage() for r in caplog.records]
+    caplog.clear()
+    nao_mapeadas = {}
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        blocos = [map_fonte(logger, bloco.copy(), "Fonte", fontes, nao_mapeadas)["Fonte Limpa"]
+                  for bloco in _blocos(leads, 40)]
+        assert caplog.records == []
+        avisa_fontes_nao_mapeadas(logger, nao_mapeadas)
+    pd.testing.assert_series_equal(pd.concat(blocos), esperado)
+    assert [r.getMessage() for r in caplog.records] == aviso_inteiro
+    assert aviso_inteiro == ["Fontes não mapeadas (2): 'Panfleto' (60), 'Radio' (30)"]
+
+
+@pytest.mark.parametrize("idade, descarte", [
+    (17, True), (18, False), (np.int64(16), True), (17.0, True), (30.0, False),
+    (np.nan, False), (None, False), ("<18", True), ("+18", False),
+])
+def test_filtra_idade_independe_do_tipo_da_coluna(logger, idade, descarte):
+    # Em um bloco sem textos ('+18'/'<18'), a coluna 'Idade Limpo' vira int64 ou float64
+    assert filtra_idade(logger, idade) is descarte
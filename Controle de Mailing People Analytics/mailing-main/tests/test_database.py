@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import inspect, text
+from sqlalchemy.pool import StaticPool
+
+from config import config
+from database import SincronizacaoExecucao, carrega_tabela, sincroniza_execucao, url_banco
+from esquema import TIPOS_COLUNAS
+
+
+# Tipo refletido pelo SQLite para cada tipo de schema.md
+TIPOS_SQLITE = {
+    "Texto": "TEXT",
+    "Número": "BIGINT",
+    "Data": "DATE",
+    "Data/Hora": "DATETIME",
+    "Booleano": "BOOLEAN",
+}
+
+
+@pytest.fixture
+def engine():
+    # Uma única conexão: o banco em memória do SQLite existe apenas dentro dela
+    engine = sqlalchemy.create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def sem_variaveis_banco(monkeypatch):
+    for variavel in ["MAILING_DB_URL", "MAILING_DB_HOST", "MAILING_DB_PORT", "MAILING_DB_NAME",
+                     "MAILING_DB_USER", "MAILING_DB_PASSWORD"]:
+        monkeypatch.delenv(variavel, raising=False)
+
+
+def _leads(linhas, execucao="2026-10-18", seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Data Form": pd.Series(pd.date_range("2026-10-17 08:00", periods=linhas, freq="7min")).where(
+            rng.random(linhas) < 0.8),
+        "Nome Limpo": pd.Series([f"Pessoa {i}" for i in range(linhas)]).where(rng.random(linhas) < 0.9),
+        "CPF Limpo": [f"{i:011d}" for i in rng.integers(1, 10**11, linhas)],
+        "Idade Limpo": pd.Series(rng.integers(16, 60, linhas), dtype=object).where(
+            rng.random(linhas) < 0.7, None),
+        "Telefone Limpo": rng.integers(10**10, 10**11, linhas).astype(str),
+        "Data Captacao": "18/10/2026",
+        "Datetime de Execução": execucao,
+        "Contagem CPF": rng.integers(1, 3, linhas),
+        "Descarte Idade": pd.Series(rng.random(linhas) < 0.2, dtype=object).where(
+            rng.random(linhas) < 0.9, None),
+        "Descarte Cidade": rng.random(linhas) < 0.3,
+        "Coluna Extra": "x",
+    })
+
+
+def _tabela(engine, tabela):
+    with engine.connect() as conexao:
+        return pd.read_sql_table(tabela, conexao)
+
+
+def test_carrega_tabela_cria_tipos_de_schema_md(logger, engine):
+    leads = _leads(50)
+    carrega_tabela(logger, leads, "leads", engine=engine, linhas_por_lote=16)
+    tipos = {c["name"]: str(c["type"]) for c in inspect(engine).get_columns("leads")}
+    esperados = {c: TIPOS_SQLITE[TIPOS_COLUNAS[c]] for c in leads.columns if c in TIPOS_COLUNAS}
+    assert {c: tipos[c] for c in esperados} == esperados
+    # Colunas fora de schema.md seguem o tipo inferido pelo pandas
+    assert tipos["Coluna Extra"] == "TEXT"
+
+
+def test_carrega_tabela_grava_nulos_como_null(logger, engine):
+    leads = _leads(200, seed=1)
+    carrega_tabela(logger, leads, "leads", engine=engine, linhas_por_lote=64)
+    with engine.connect() as conexao:
+        for coluna in ["Data Form", "Nome Limpo", "Idade Limpo", "Descarte Idade"]:
+            nulos = conexao.execute(text(f'SELECT COUNT(*) FROM leads WHERE "{coluna}" IS NULL')).scalar()
+            assert nulos == leads[coluna].isna().sum(), coluna
+    gravado = _tabela(engine, "leads")
+    assert len(gravado) == len(leads)
+    assert gravado["Idade Limpo"].dropna().astype(int).tolist() == leads["Idade Limpo"].dropna().tolist()
+    with engine.connect() as conexao:
+        datas = conexao.execute(text('SELECT DISTINCT "Data Captacao" FROM leads')).scalars().all()
+    assert datas == ["2026-10-18"]
+    assert gravado["Descarte Cidade"].tolist() == leads["Descarte Cidade"].tolist()
+
+
+def test_idade_limpo_mantem_maioridade_como_texto(logger, engine):
+    # valida_idade devolve '+18'/'<18' nos layouts que só perguntam a maioridade; em blocos sem
+    # esses textos, a coluna chega como float64
+    leads = _leads(6).assign(**{"Idade Limpo": ["+18", "<18", 25, None, 40.0, np.nan]})
+    carrega_tabela(logger, leads, "leads", engine=engine)
+    carrega_tabela(logger, _leads(2).assign(**{"Idade Limpo": [19.0, np.nan]}), "leads", engine=engine)
+    with engine.connect() as conexao:
+        idades = conexao.execute(text('SELECT "Idade Limpo" FROM leads')).scalars().all()
+    assert idades == ["+18", "<18", "25", None, "40", None, "19", None]
+
+
+def test_sincroniza_execucao_substitui_o_mesmo_prefixo(logger, engine):
+    sincroniza_execucao(logger, _leads(40, seed=1), "2026_10_18_manha", tabela="leads", engine=engine)
+    sincroniza_execucao(logger, _leads(25, seed=2), "2026_10_18_tarde", tabela="leads", engine=engine)
+    sincroniza_execucao(logger, _leads(30, seed=3), "2026_10_18_manha", tabela="leads", engine=engine)
+    gravado = _tabela(engine, "leads")
+    assert gravado.groupby("Prefixo").size().to_dict() == {"2026_10_18_manha": 30, "2026_10_18_tarde": 25}
+    # As linhas da reexecução são as da última gravação
+    manha = gravado[gravado["Prefixo"] == "2026_10_18_manha"]
+    assert sorted(manha["CPF Limpo"]) == sorted(_leads(30, seed=3)["CPF Limpo"])
+
+
+def test_sincroniza_execucao_mantem_outra_data_com_o_mesmo_prefixo(logger, engine):
+    sincroniza_execucao(logger, _leads(10, "2026-10-17"), "manha", tabela="leads", engine=engine)
+    sincroniza_execucao(logger, _leads(12, "2026-10-18"), "manha", tabela="leads", engine=engine)
+    sincroniza_execucao(logger, _leads(8, "2026-10-18", seed=4), "manha", tabela="leads", engine=engine)
+    gravado = _tabela(engine, "leads")
+    datas = gravado["Datetime de Execução"].dt.strftime("%Y-%m-%d")
+    assert datas.value_counts().to_dict() == {"2026-10-17": 10, "2026-10-18": 8}
+
+
+def test_sincronizacao_em_blocos_igual_a_inteira(logger, engine):
+    leads = _leads(120, seed=5)
+    sincroniza_execucao(logger, leads, "inteira", tabela="leads", engine=engine)
+    with SincronizacaoExecucao(logger, "blocos", tabela="leads", engine=engine, linhas_por_lote=16) as sincronizacao:
+        for inicio in range(0, len(leads), 50):
+            sincronizacao.acrescenta(leads.iloc[inicio:inicio + 50])
+    gravado = _tabela(engine, "leads")
+    inteira = gravado[gravado["Prefixo"] == "inteira"].drop(columns="Prefixo").reset_index(drop=True)
+    blocos = gravado[gravado["Prefixo"] == "blocos"].drop(columns="Prefixo").reset_index(drop=True)
+    pd.testing.assert_frame_equal(blocos, inteira)
+
+
+def test_sincronizacao_com_erro_mantem_a_execucao_anterior(logger, engine):
+    sincroniza_execucao(logger, _leads(20, seed=6), "manha", tabela="leads", engine=engine)
+    with pytest.raises(RuntimeError):
+        with SincronizacaoExecucao(logger, "manha", tabela="leads", engine=engine) as sincronizacao:
+            sincronizacao.acrescenta(_leads(5, seed=7))
+            raise RuntimeError("falha no bloco seguinte")
+    gravado = _tabela(engine, "leads")
+    assert sorted(gravado["CPF Limpo"]) == sorted(_leads(20, seed=6)["CPF Limpo"])
+
+
+def test_url_banco_exige_credenciais(monkeypatch, sem_variaveis_banco):
+    monkeypatch.setitem(config, "banco", dict(config["banco"], url=None))
+    with pytest.raises(ValueError, match="MAILING_DB_HOST"):
+        url_banco()
+    monkeypatch.setenv("MAILING_DB_HOST", "servidor")
+    monkeypatch.setenv("MAILING_DB_NAME", "base")
+    monkeypatch.setenv("MAILING_DB_USER", "usuario")
+    monkeypatch.setenv("MAILING_DB_PASSWORD", "segredo")
+    url = url_banco()
+    assert (url.host, url.port, url.database, url.username, url.password) == (
+        "servidor", 5432, "base", "usuario", "segredo")
+
+
+def test_configuracao_sem_credenciais_versionadas():
+    assert all(config["banco"][chave] is None for chave in ["host", "database", "user", "password"])
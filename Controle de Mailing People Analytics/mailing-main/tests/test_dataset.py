@@ -0,0 +1,166 @@
+import logging
+import os
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+from dataset import ARQUIVO_PARTICAO, PARTICAO_PADRAO, GravacaoDataset, compacta_dataset, grava_dataset
+from esquema import TIPOS_COLUNAS
+from limpeza import valida_idade
+
+
+# Tipo Arrow gravado para cada tipo de schema.md
+TIPOS_ARROW = {
+    "Texto": pa.string(),
+    "Número": pa.int64(),
+    "Data": pa.date32(),
+    "Data/Hora": pa.timestamp("us"),
+    "Booleano": pa.bool_(),
+}
+
+# Idades como chegam dos layouts (maioridade, anos, texto livre e vazio)
+IDADES_ENTRADA = ["Sim", "Não", 25, "40 anos", "17", None, ""]
+
+
+def _leads(linhas, datas=("18/10/2026",), turnos=("MANHA",), seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Data Form": pd.Series(pd.date_range("2026-10-17 08:00", periods=linhas, freq="3min")).where(
+            rng.random(linhas) < 0.8),
+        "Nome Limpo": [f"Pessoa {i}" for i in range(linhas)],
+        "CPF Limpo": [f"{i:011d}" for i in rng.integers(1, 10**11, linhas)],
+        "Idade Limpo": [valida_idade(logging.getLogger("testes"), IDADES_ENTRADA[i])
+                        for i in rng.integers(0, len(IDADES_ENTRADA), linhas)],
+        "Data Captacao": rng.choice(list(datas), linhas),
+        "Datetime de Execução": "2026-10-18",
+        "Data do Exame": None,
+        "Contagem CPF": rng.integers(1, 3, linhas),
+        "Descarte Idade": rng.random(linhas) < 0.2,
+        "Turno": rng.choice(list(turnos), linhas),
+        "Coluna Extra": "x",
+    })
+
+
+def _particao(pasta, data, turno):
+    return os.path.join(pasta, f"Data Captacao={data}", f"Turno={turno}")
+
+
+def _arquivos(pasta):
+    return sorted(os.path.relpath(os.path.join(raiz, nome), pasta)
+                  for raiz, _, nomes in os.walk(pasta) for nome in nomes)
+
+
+def test_particoes_no_formato_hive(logger, tmp_path):
+    leads = _leads(300, datas=("17/10/2026", "18/10/2026"), turnos=("MANHA", "TARDE"))
+    arquivos = grava_dataset(logger, leads, str(tmp_path))
+    esperados = [os.path.join(f"Data Captacao={d}", f"Turno={t}", ARQUIVO_PARTICAO)
+                 for d in ["2026-10-17", "2026-10-18"] for t in ["MANHA", "TARDE"]]
+    assert _arquivos(tmp_path) == esperados
+    assert sorted(os.path.relpath(a, tmp_path) for a in arquivos) == esperados
+    # As colunas de partição ficam apenas no caminho e voltam na leitura do dataset
+    assert "Turno" not in pq.read_schema(tmp_path / esperados[0]).names
+    lido = pd.read_parquet(tmp_path)
+    datas = pd.to_datetime(leads["Data Captacao"], format="%d/%m/%Y").dt.strftime("%Y-%m-%d")
+    esperado = leads.groupby([datas, "Turno"]).size().to_dict()
+    assert lido.groupby([lido["Data Captacao"].astype(str), lido["Turno"].astype(str)]).size().to_dict() == esperado
+
+
+def test_tipos_seguem_schema_md(logger, tmp_path):
+    grava_dataset(logger, _leads(50), str(tmp_path))
+    schema = pq.read_schema(_particao(tmp_path, "2026-10-18", "MANHA") + "/" + ARQUIVO_PARTICAO)
+    for campo in schema:
+        if campo.name in TIPOS_COLUNAS:
+            assert campo.type == TIPOS_ARROW[TIPOS_COLUNAS[campo.name]], campo.name
+    # Colunas fora de schema.md são gravadas como texto
+    assert schema.field("Coluna Extra").type == pa.string()
+    tabela = pq.read_table(_particao(tmp_path, "2026-10-18", "MANHA"))
+    assert tabela.column("Idade Limpo").null_count == _leads(50)["Idade Limpo"].isna().sum()
+    assert tabela.column("Data do Exame").null_count == 50
+
+
+def test_reexecucao_substitui_apenas_a_sua_particao(logger, tmp_path):
+    grava_dataset(logger, _leads(40, turnos=("MANHA", "TARDE"), seed=1), str(tmp_path))
+    tarde = os.path.join(_particao(tmp_path, "2026-10-18", "TARDE"), ARQUIVO_PARTICAO)
+    antes = open(tarde, "rb").read()
+    reexecucao = _leads(15, seed=2)
+    grava_dataset(logger, reexecucao, str(tmp_path))
+    manha = pd.read_parquet(_particao(tmp_path, "2026-10-18", "MANHA"))
+    assert sorted(manha["CPF Limpo"]) == sorted(reexecucao["CPF Limpo"])
+    assert open(tarde, "rb").read() == antes
+    assert _arquivos(tmp_path) == [
+        os.path.join("Data Captacao=2026-10-18", f"Turno={t}", ARQUIVO_PARTICAO) for t in ["MANHA", "TARDE"]]
+
+
+def test_reexecucao_interrompida_mantem_a_particao_anterior(logger, tmp_path):
+    anterior = _leads(30, seed=3)
+    grava_dataset(logger, anterior, str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with GravacaoDataset(logger, str(tmp_path)) as gravacao:
+            gravacao.acrescenta(_leads(10, seed=4))
+            raise RuntimeError("falha antes do fim da execução")
+    manha = pd.read_parquet(_particao(tmp_path, "2026-10-18", "MANHA"))
+    assert sorted(manha["CPF Limpo"]) == sorted(anterior["CPF Limpo"])
+    # Nenhum arquivo temporário fica para trás
+    assert _arquivos(tmp_path) == [os.path.join("Data Captacao=2026-10-18", "Turno=MANHA", ARQUIVO_PARTICAO)]
+
+
+def test_compactacao_ignora_particoes_recentes_e_ja_compactadas(logger, tmp_path):
+    antiga = (datetime.now() - timedelta(days=60))
+    recente = datetime.now()
+    leads = _leads(200, datas=(f"{antiga:%d/%m/%Y}", f"{recente:%d/%m/%Y}"), seed=5)
+    grava_dataset(logger, leads, str(tmp_path))
+    particao_antiga = os.path.join(_particao(tmp_path, f"{antiga:%Y-%m-%d}", "MANHA"), ARQUIVO_PARTICAO)
+    particao_recente = os.path.join(_particao(tmp_path, f"{recente:%Y-%m-%d}", "MANHA"), ARQUIVO_PARTICAO)
+    original = pd.read_parquet(particao_antiga)
+    # Temporário deixado por uma gravação interrompida
+    temporario = os.path.join(os.path.dirname(particao_recente), "~gravando_x.parquet.tmp")
+    open(temporario, "wb").close()
+
+    assert compacta_dataset(logger, str(tmp_path), dias=30) == 1
+    assert not os.path.exists(temporario)
+    metadados = pq.read_schema(particao_antiga).metadata
+    assert metadados[b"compactado"] == b"1"
+    assert pq.ParquetFile(particao_antiga).metadata.row_group(0).column(0).compression == "ZSTD"
+    pd.testing.assert_frame_equal(pd.read_parquet(particao_antiga), original)
+    assert b"compactado" not in (pq.read_schema(particao_recente).metadata or {})
+
+    # Segunda execução: a partição já compactada não é regravada
+    modificado = os.stat(particao_antiga).st_mtime_ns
+    assert compacta_dataset(logger, str(tmp_path), dias=30) == 0
+    assert os.stat(particao_antiga).st_mtime_ns == modificado
+
+
+def test_idade_limpo_mantem_maioridade(logger, tmp_path):
+    leads = _leads(80, seed=6)
+    assert {"+18", "<18"} <= set(leads["Idade Limpo"])
+    grava_dataset(logger, leads, str(tmp_path))
+    lido = pd.read_parquet(_particao(tmp_path, "2026-10-18", "MANHA"))
+    esperado = [None if pd.isna(v) else str(v) for v in leads["Idade Limpo"]]
+    assert [None if pd.isna(v) else v for v in lido["Idade Limpo"]] == esperado
+
+
+def test_leads_sem_data_ou_turno_vao_para_a_particao_padrao(logger, tmp_path, caplog):
+    leads = _leads(5, seed=7)
+    leads["Data Captacao"] = ["18/10/2020", "", "data invalida", None, "18/10/2020"]
+    leads["Turno"] = ["MANHA", "MANHA", "TARDE", "MANHA", " "]
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        grava_dataset(logger, leads, str(tmp_path))
+    particoes = [("2020-10-18", "MANHA"), ("2020-10-18", PARTICAO_PADRAO),
+                 (PARTICAO_PADRAO, "MANHA"), (PARTICAO_PADRAO, "TARDE")]
+    assert _arquivos(tmp_path) == sorted(
+        os.path.join(f"Data Captacao={d}", f"Turno={t}", ARQUIVO_PARTICAO) for d, t in particoes)
+    # O particionamento Hive lê a partição padrão como nula
+    lido = ds.dataset(tmp_path, partitioning="hive").to_table().to_pandas()
+    assert len(lido) == len(leads)
+    assert lido["Data Captacao"].isna().sum() == 3 and lido["Turno"].isna().sum() == 1
+    assert [r.getMessage() for r in caplog.records] == [
+        f"4 lead(s) sem 'Data Captacao' válida ou sem 'Turno' gravado(s) na partição {PARTICAO_PADRAO}"]
+    # Sem data, a partição padrão não é compactada com as partições antigas
+    assert compacta_dataset(logger, str(tmp_path), dias=30) == 2
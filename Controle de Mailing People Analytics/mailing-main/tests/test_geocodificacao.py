@@ -0,0 +1,99 @@
+import random
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import geocodificacao
+from geocodificacao import BackendOffline, padroniza_enderecos_lote
+
+
+ENDERECOS = {
+    "Rua das Flores, 10 - Uberlândia": "Rua das Flores, 10, Uberlândia, MG, Brasil",
+    "Av. Paulista, 1000 - São Paulo": "Avenida Paulista, 1000, São Paulo, SP, Brasil",
+    "Rua XV de Novembro, 5 - Jundiaí": "Rua XV de Novembro, 5, Jundiaí, SP, Brasil",
+    "Endereço inexistente": None,
+}
+
+
+class BackendContado(BackendOffline):
+    """
+    BackendOffline que registra os endereços consultados e falha nos endereços de `falhas`.
+    """
+
+    def __init__(self, enderecos, falhas=(), atraso=0):
+        super().__init__(enderecos)
+        self.falhas = set(falhas)
+        self.atraso = atraso
+        self.consultas = []
+        self.lock = threading.Lock()
+
+    def __call__(self, endereco):
+        with self.lock:
+            self.consultas.append(endereco)
+        if self.atraso:
+            time.sleep(random.uniform(0, self.atraso))
+        if endereco in self.falhas:
+            raise ConnectionError("falha de rede")
+        return super().__call__(endereco)
+
+
+@pytest.fixture
+def parametros(tmp_path):
+    return {"url": None, "cache_path": str(tmp_path / "geocodificacao.sqlite"), "ttl_dias": 90,
+            "workers": 2, "requisicoes_por_segundo": 0, "timeout": 1}
+
+
+def test_enderecos_repetidos_consultados_uma_vez(logger, parametros):
+    backend = BackendContado(ENDERECOS)
+    enderecos = pd.Series(["Rua das Flores, 10 - Uberlândia", "RUA DAS FLORES 10 UBERLANDIA", None, "",
+                           "Av. Paulista, 1000 - São Paulo", "Rua das Flores, 10 - Uberlândia",
+                           "Endereço inexistente"], index=[10, 11, 12, 13, 14, 15, 16])
+    resultado = padroniza_enderecos_lote(logger, enderecos, backend, parametros)
+    assert len(backend.consultas) == 3
+    assert resultado.index.tolist() == enderecos.index.tolist()
+    assert resultado.tolist() == [ENDERECOS["Rua das Flores, 10 - Uberlândia"]] * 2 + [None, None] + [
+        ENDERECOS["Av. Paulista, 1000 - São Paulo"], ENDERECOS["Rua das Flores, 10 - Uberlândia"], None]
+
+
+@pytest.mark.parametrize("dtype", ["string", object])
+def test_colunas_com_pd_na(logger, parametros, dtype):
+    enderecos = pd.Series(["Av. Paulista, 1000 - São Paulo", pd.NA, "", "Endereço inexistente"], dtype=dtype)
+    resultado = padroniza_enderecos_lote(logger, enderecos, BackendContado(ENDERECOS), parametros)
+    assert resultado.tolist() == [ENDERECOS["Av. Paulista, 1000 - São Paulo"], None, None, None]
+
+
+def test_cache_valido_e_expirado(logger, parametros, monkeypatch):
+    enderecos = pd.Series(list(ENDERECOS))
+    primeira = padroniza_enderecos_lote(logger, enderecos, BackendContado(ENDERECOS), parametros)
+    # Dentro da validade, nenhuma consulta (inclusive dos endereços não encontrados)
+    backend = BackendContado(ENDERECOS)
+    pd.testing.assert_series_equal(padroniza_enderecos_lote(logger, enderecos, backend, parametros), primeira)
+    assert backend.consultas == []
+    # Após o TTL, os endereços são consultados novamente
+    agora = time.time()
+    monkeypatch.setattr(geocodificacao.time, "time", lambda: agora + 91 * 86400)
+    backend = BackendContado(ENDERECOS)
+    pd.testing.assert_series_equal(padroniza_enderecos_lote(logger, enderecos, backend, parametros), primeira)
+    assert sorted(backend.consultas) == sorted(ENDERECOS)
+
+
+def test_falhas_do_backend_nao_vao_para_o_cache(logger, parametros):
+    enderecos = pd.Series(list(ENDERECOS))
+    falha = "Av. Paulista, 1000 - São Paulo"
+    resultado = padroniza_enderecos_lote(logger, enderecos, BackendContado(ENDERECOS, [falha]), parametros)
+    assert resultado[1] is None
+    backend = BackendContado(ENDERECOS)
+    resultado = padroniza_enderecos_lote(logger, enderecos, backend, parametros)
+    assert backend.consultas == [falha]
+    assert resultado.tolist() == list(ENDERECOS.values())
+
+
+def test_ordem_mantida_com_consultas_paralelas(logger, parametros):
+    enderecos = {f"Rua {i}, {i * 7} - Cidade {i % 13}": f"Rua {i}, Cidade {i % 13}, Brasil" for i in range(60)}
+    entrada = pd.Series(random.Random(0).choices(list(enderecos), k=200))
+    backend = BackendContado(enderecos, atraso=0.005)
+    resultado = padroniza_enderecos_lote(logger, entrada, backend, dict(parametros, workers=8))
+    assert resultado.tolist() == [enderecos[e] for e in entrada]
+    assert sorted(backend.consultas) == sorted(set(entrada))
@@ -0,0 +1,198 @@
+import random
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from descartes import bloqueio_historico
+from historico import COLUNAS_HISTORICO, abre_indice, atualiza_indice, consulta_indice
+from limpeza import limpa_telefone_lote
+
+
+REFERENCIA = datetime(2025, 3, 1, 9, 0)
+
+
+def _tratativa(telefone, data, motivo="Contato SEM Sucesso", finalizado=1, ultima=1, fila="Ativo"):
+    return {"TELEFONE CONTATO": telefone, "DATA TRATATIVA": data, "MOTIVO ": motivo,
+            "FLAG FINALIZADO ": finalizado, "FLAG ULTIMA TRATATIVA": ultima, "FILA": fila}
+
+
+def _leitura_completa(logger, caminho, referencia=REFERENCIA):
+    # Leitura completa do relatório, como antes do índice: filtros, última tratativa por telefone
+    relatorio = pd.read_excel(caminho, sheet_name="Tratativas", skiprows=6)
+    relatorio = relatorio[(relatorio['FLAG ULTIMA TRATATIVA'] == 1) &
+                          (relatorio['FILA'] != "Receptivo")].copy()
+    relatorio['Telefone Limpo'] = limpa_telefone_lote(
+        logger, relatorio['TELEFONE CONTATO'].astype(object))
+    relatorio = relatorio.dropna(subset=['Telefone Limpo'])
+    relatorio = relatorio.loc[relatorio.groupby('Telefone Limpo')['DATA TRATATIVA'].idxmax()]
+    return dict(zip(relatorio['Telefone Limpo'], bloqueio_historico(relatorio, pd.Timestamp(referencia))))
+
+
+def _status_indice(conexao, telefones, referencia=REFERENCIA):
+    relatorio = consulta_indice(conexao, telefones)
+    return dict(zip(relatorio['Telefone Limpo'], bloqueio_historico(relatorio, pd.Timestamp(referencia))))
+
+
+def _bloqueio_linha(row, referencia):
+    # Regra linha a linha anterior à vetorização de bloqueio_historico
+    motivo = row['MOTIVO ']
+    data = row["DATA TRATATIVA"]
+    if row['FLAG FINALIZADO '] != 1:
+        return 'Em Atendimento'
+    elif (motivo == 'Contato COM Sucesso') and (referencia <= data + pd.Timedelta(days=30)):
+        return 'Agendado 30 Dias'
+    elif (referencia <= data + pd.Timedelta(days=7)):
+        return '7 Dias'
+    else:
+        return 'Liberado'
+
+
+# (dias antes da referência, motivo, flag finalizado, status esperado)
+CASOS_BLOQUEIO = [
+    (6, "Contato SEM Sucesso", 1, "7 Dias"),
+    (7, "Contato SEM Sucesso", 1, "7 Dias"),
+    (8, "Contato SEM Sucesso", 1, "Liberado"),
+    (6, "Contato COM Sucesso", 1, "Agendado 30 Dias"),
+    (29, "Contato COM Sucesso", 1, "Agendado 30 Dias"),
+    (30, "Contato COM Sucesso", 1, "Agendado 30 Dias"),
+    (31, "Contato COM Sucesso", 1, "Liberado"),
+    (29, "Não atende", 1, "Liberado"),
+    (-1, "Contato SEM Sucesso", 1, "7 Dias"),
+    (40, "Contato SEM Sucesso", 0, "Em Atendimento"),
+    (2, "Contato COM Sucesso", 0, "Em Atendimento"),
+    (40, "Contato SEM Sucesso", None, "Em Atendimento"),
+    (40, "Contato SEM Sucesso", "1", "Em Atendimento"),
+    (None, "Contato COM Sucesso", 1, "Liberado"),
+    (None, "Contato SEM Sucesso", 0, "Em Atendimento"),
+]
+
+
+@pytest.mark.parametrize("dias, motivo, finalizado, esperado", CASOS_BLOQUEIO)
+def test_bloqueio_historico_igual_a_regra_linha_a_linha(dias, motivo, finalizado, esperado):
+    referencia = pd.Timestamp(REFERENCIA)
+    data = pd.NaT if dias is None else referencia - pd.Timedelta(days=dias)
+    relatorio = pd.DataFrame({"DATA TRATATIVA": pd.Series([data], dtype="datetime64[ns]"),
+                              "MOTIVO ": [motivo], "FLAG FINALIZADO ": pd.Series([finalizado], dtype=object)})
+    assert bloqueio_historico(relatorio, referencia).tolist() == [esperado]
+    assert _bloqueio_linha(relatorio.iloc[0], referencia) == esperado
+
+
+def test_bloqueio_historico_em_lote_igual_a_regra_linha_a_linha():
+    referencia = pd.Timestamp(REFERENCIA)
+    relatorio = pd.DataFrame({
+        "DATA TRATATIVA": pd.Series([pd.NaT if d is None else referencia - pd.Timedelta(days=d)
+                                     for d, _, _, _ in CASOS_BLOQUEIO], dtype="datetime64[ns]"),
+        "MOTIVO ": [m for _, m, _, _ in CASOS_BLOQUEIO],
+        "FLAG FINALIZADO ": pd.Series([f for _, _, f, _ in CASOS_BLOQUEIO], dtype=object),
+    })
+    esperado = [_bloqueio_linha(row, referencia) for _, row in relatorio.iterrows()]
+    assert bloqueio_historico(relatorio, referencia).tolist() == esperado
+    assert esperado == [e for _, _, _, e in CASOS_BLOQUEIO]
+
+
+@pytest.fixture
+def indice(tmp_path):
+    conexao = abre_indice(str(tmp_path / "historico.sqlite"))
+    yield conexao
+    conexao.close()
+
+
+@pytest.fixture
+def relatorio(tmp_path, escreve_relatorio_rs):
+    caminho = str(tmp_path / "Recursos Humanos - Analitico Casos.xlsx")
+
+    def grava(tratativas):
+        return escreve_relatorio_rs(caminho, pd.DataFrame(tratativas, columns=COLUNAS_HISTORICO))
+    return grava
+
+
+def _atualiza(logger, indice, caminho, **kwargs):
+    kwargs.setdefault("agora", REFERENCIA)
+    atualiza_indice(logger, indice, caminho, limpa_telefone_lote, 3, **kwargs)
+
+
+def test_receptivo_mais_recente_mantem_atendimento_ativo(logger, indice, relatorio):
+    # Caso aberto no Ativo e contato mais recente pelo Receptivo: o telefone continua bloqueado
+    tratativas = [
+        _tratativa("34999887766", REFERENCIA - timedelta(days=5), finalizado=0),
+        _tratativa("34988776655", REFERENCIA - timedelta(days=40)),
+    ]
+    _atualiza(logger, indice, relatorio(tratativas))
+    tratativas.append(_tratativa(
+        "(34) 99988-7766", REFERENCIA - timedelta(days=2), motivo="Contato COM Sucesso", fila="Receptivo"))
+    caminho = relatorio(tratativas)
+    _atualiza(logger, indice, caminho)
+
+    esperado = _leitura_completa(logger, caminho)
+    assert esperado == {"34999887766": "Em Atendimento", "34988776655": "Liberado"}
+    assert _status_indice(indice, list(esperado)) == esperado
+
+
+def test_telefone_apenas_do_receptivo_nao_e_indexado(logger, indice, relatorio):
+    caminho = relatorio([_tratativa("34999887766", REFERENCIA - timedelta(days=1), fila="Receptivo")])
+    _atualiza(logger, indice, caminho)
+    assert _leitura_completa(logger, caminho) == {}
+    assert _status_indice(indice, ["34999887766"]) == {}
+
+
+def test_finalizacao_tardia_corrigida_na_reconstrucao(logger, indice, relatorio):
+    aberta = _tratativa("34999887766", REFERENCIA - timedelta(days=20), finalizado=0)
+    recente = _tratativa("34988776655", REFERENCIA - timedelta(days=1))
+    _atualiza(logger, indice, relatorio([aberta, recente]))
+    # Caso finalizado depois, sem nova DATA TRATATIVA e fora da margem de releitura
+    caminho = relatorio([{**aberta, "FLAG FINALIZADO ": 1}, recente])
+    esperado = _leitura_completa(logger, caminho)
+    assert esperado["34999887766"] == "Liberado"
+
+    # A leitura incremental não vê a alteração (limitação documentada em atualiza_indice)
+    _atualiza(logger, indice, caminho, agora=REFERENCIA + timedelta(days=1))
+    assert _status_indice(indice, list(esperado))["34999887766"] == "Em Atendimento"
+
+    # Passados `reconstrucao_dias`, o índice é reconstruído com a leitura completa
+    relatorio([{**aberta, "FLAG FINALIZADO ": 1}, recente, _tratativa("34977665544", REFERENCIA)])
+    _atualiza(logger, indice, caminho, agora=REFERENCIA + timedelta(days=8))
+    esperado = _leitura_completa(logger, caminho)
+    assert _status_indice(indice, list(esperado)) == esperado
+
+
+def test_indice_de_versao_anterior_e_reconstruido(logger, indice, relatorio):
+    caminho = relatorio([
+        _tratativa("34999887766", REFERENCIA - timedelta(days=5), finalizado=0),
+        _tratativa("34999887766", REFERENCIA - timedelta(days=2), fila="Receptivo"),
+    ])
+    _atualiza(logger, indice, caminho)
+    # Índice gravado pela versão que indexava o Receptivo (relatório sem alterações desde então)
+    indice.execute("UPDATE tratativas SET fila = 'Receptivo', data_tratativa = ?",
+                   ((REFERENCIA - timedelta(days=2)).isoformat(sep=' '),))
+    indice.execute("DELETE FROM controle WHERE chave = 'versao'")
+    indice.commit()
+    _atualiza(logger, indice, caminho)
+    assert _status_indice(indice, ["34999887766"]) == _leitura_completa(logger, caminho) == {
+        "34999887766": "Em Atendimento"}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_atualizacoes_incrementais_equivalem_a_leitura_completa(logger, indice, relatorio, seed):
+    rng = random.Random(seed)
+    telefones = [f"34{rng.randrange(10**8, 10**9)}" for _ in range(60)]
+    inicio = REFERENCIA - timedelta(days=60)
+    tratativas = []
+    for exportacao in range(6):
+        fim = inicio + timedelta(days=10 * (exportacao + 1))
+        for _ in range(40):
+            # Inclui tratativas lançadas com atraso (dentro da margem de 3 dias)
+            data = fim - timedelta(seconds=rng.randrange(int(timedelta(days=12).total_seconds())))
+            telefone = rng.choice(telefones)
+            tratativas.append(_tratativa(
+                rng.choice([telefone, int(telefone), f"({telefone[:2]}) {telefone[2:]}", "55" + telefone]),
+                data,
+                motivo=rng.choice(["Contato COM Sucesso", "Contato SEM Sucesso", "Não atende"]),
+                finalizado=rng.choice([1, 1, 1, 0]),
+                ultima=rng.choice([1, 1, 0]),
+                fila=rng.choice(["Ativo", "Ativo", "Receptivo", "Reativação"])))
+        caminho = relatorio(tratativas)
+        _atualiza(logger, indice, caminho)
+        esperado = _leitura_completa(logger, caminho)
+        assert _status_indice(indice, telefones) == esperado
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark_importacao import MODULOS, PESADAS
+
+
+PASTA_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+@pytest.mark.parametrize("modulo", MODULOS)
+def test_importacao_nao_carrega_bibliotecas_pesadas(modulo):
+    # Interpretador novo: os testes anteriores já podem ter carregado essas bibliotecas
+    codigo = (f"import sys, {modulo}; "
+              f"print(','.join(p for p in {PESADAS!r} if p in sys.modules))")
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=PASTA_SRC,
+                               capture_output=True, text=True, check=True)
+    assert resultado.stdout.strip() == ""
@@ -0,0 +1,257 @@
+import logging
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datetime import datetime
+
+from historico import COLUNAS_HISTORICO, le_tratativas
+from config import config
+from limpeza import (
+    compila_fontes, limpa_telefone_lote, limpar_telefone, map_fonte, processar_leads, valida_cpf,
+    valida_cpf_lote)
+from normalizacao import clean_text
+
+
+def _cpf_valido(rng, zeros_a_esquerda=0):
+    base = [0] * zeros_a_esquerda + [rng.randrange(10) for _ in range(9 - zeros_a_esquerda)]
+    for peso in (10, 11):
+        base.append(sum(d * (peso - i) for i, d in enumerate(base)) * 10 % 11 % 10)
+    return "".join(map(str, base))
+
+
+def _cpfs_aleatorios(quantidade, seed=0):
+    rng = random.Random(seed)
+    valores = []
+    for _ in range(quantidade):
+        cpf = _cpf_valido(rng, rng.choice([0, 0, 0, 1, 2]))
+        forma = rng.randrange(9)
+        if forma == 0:
+            valores.append(cpf)
+        elif forma == 1:
+            valores.append(f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}")
+        elif forma == 2:
+            valores.append(float(cpf))
+        elif forma == 3:
+            valores.append(int(cpf))
+        elif forma == 4:
+            # Sem os zeros à esquerda (como o Excel grava)
+            valores.append(cpf.lstrip("0"))
+        elif forma == 5:
+            # Dígito verificador errado
+            valores.append(cpf[:-1] + str((int(cpf[-1]) + 1) % 10))
+        elif forma == 6:
+            valores.append(str(rng.randrange(10 ** rng.randrange(1, 14))))
+        elif forma == 7:
+            valores.append(" " + cpf + "x")
+        else:
+            valores.append(rng.choice([None, np.nan, pd.NA, pd.NaT, "", " ", "abc"]))
+    return valores
+
+
+ESPECIAIS = [
+    None, np.nan, pd.NA, pd.NaT, "", " ", "-", "abc",
+    0, 0.0, "0", "00000000000", "000.000.000-00",
+    99999999999, 99999999999.0, "99999999999", "999.999.999-99",
+    "52998224725", "529.982.247-25", 52998224725, 52998224725.0,
+    # Curtos: completados com zeros até 11 dígitos
+    "1234567890", "191", 191, 191.0, "0000000191", "123", 12.0,
+    # Longos demais
+    "529982247250", 529982247250,
+    # Dígitos não ASCII seguem pela versão escalar
+    "٥٢٩٩٨٢٢٤٧٢٥",
+]
+
+
+@pytest.mark.parametrize("valor", ESPECIAIS, ids=repr)
+def test_valida_cpf_lote_casos_especiais(logger, valor):
+    assert valida_cpf_lote(logger, pd.Series([valor], dtype=object)).tolist() == [valida_cpf(logger, valor)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_valida_cpf_lote_equivale_a_versao_escalar(logger, seed):
+    valores = _cpfs_aleatorios(2000, seed) + ESPECIAIS
+    serie = pd.Series(valores, dtype=object, index=range(10, 10 + len(valores)))
+    resultado = valida_cpf_lote(logger, serie)
+    assert resultado.index.equals(serie.index)
+    assert resultado.tolist() == [valida_cpf(logger, v) for v in valores]
+
+
+def test_valida_cpf_lote_serie_vazia(logger):
+    assert valida_cpf_lote(logger, pd.Series([], dtype=object)).tolist() == []
+
+
+# (entrada, esperado) de cada regra de limpar_telefone, por quantidade de dígitos
+REGRAS_TELEFONE = [
+    # 8 dígitos: DDD padrão "34"; celular (6 a 9) ganha o "9"
+    ("32101234", "3432101234"),
+    ("5210-1234", "3452101234"),
+    ("99887766", "34999887766"),
+    ("61234567", "34961234567"),
+    # 9 dígitos: DDD padrão
+    ("999887766", "34999887766"),
+    ("3210-12345", "34321012345"),
+    # 10 dígitos: "55" + 8 dígitos ou DDD + 8 dígitos (celular ganha o "9")
+    ("5532101234", "3432101234"),
+    ("5599887766", "34999887766"),
+    ("(34) 3210-1234", "3432101234"),
+    ("(11) 9988-7766", "11999887766"),
+    # 11 dígitos: "55" + 9 dígitos (DDD padrão) ou DDD + 9 dígitos
+    ("55999887766", "34999887766"),
+    ("(34) 99988-7766", "34999887766"),
+    ("011 99988-7766", "11999887766"),
+    # 12 dígitos: apenas com "55" (+ DDD + 8 dígitos)
+    ("553432101234", "3432101234"),
+    ("+55 (11) 9988-7766", "11999887766"),
+    ("123432101234", None),
+    # 13 dígitos: apenas com "55" (+ DDD + 9 dígitos)
+    ("5534999887766", "34999887766"),
+    ("1234999887766", None),
+    # Fora de 8 a 13 dígitos
+    ("9988776", None),
+    ("55349998877661", None),
+    ("0000000", None),
+    # Floats do Excel (sem filter_numbers nem remoção de zeros)
+    (32101234.0, "3432101234"),
+    (34999887766.0, "34999887766"),
+    (5534999887766.0, "34999887766"),
+    (99887766.0, "34999887766"),
+    (1234567.0, None),
+    (-34999887766.0, None),
+    # Inteiros (relatório do R&S lido pelo calamine/openpyxl)
+    (34999887766, "34999887766"),
+    (553432101234, "3432101234"),
+    # Vazios
+    (None, None), (np.nan, None), (pd.NA, None), ("", None), ("abc", None),
+]
+
+
+@pytest.mark.parametrize("valor,esperado", REGRAS_TELEFONE, ids=repr)
+def test_limpa_telefone_lote_regras(logger, valor, esperado):
+    assert limpar_telefone(logger, valor) == esperado
+    assert limpa_telefone_lote(logger, pd.Series([valor], dtype=object)).tolist() == [esperado]
+
+
+def _telefones_aleatorios(quantidade, seed=0):
+    rng = random.Random(seed)
+    valores = []
+    for _ in range(quantidade):
+        digitos = "".join(str(rng.randrange(10)) for _ in range(rng.randrange(6, 15)))
+        forma = rng.randrange(7)
+        if forma == 0:
+            valores.append(digitos)
+        elif forma == 1:
+            valores.append(f"({digitos[:2]}) {digitos[2:-4]}-{digitos[-4:]}")
+        elif forma == 2:
+            valores.append("55" + digitos)
+        elif forma == 3:
+            valores.append(float(digitos))
+        elif forma == 4:
+            valores.append("0" + digitos)
+        elif forma == 5:
+            valores.append(int(digitos))
+        else:
+            valores.append(rng.choice([None, np.nan, pd.NA, "", " ", "sem telefone"]))
+    return valores
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_limpa_telefone_lote_equivale_a_versao_escalar(logger, seed):
+    valores = _telefones_aleatorios(3000, seed) + [v for v, _ in REGRAS_TELEFONE]
+    serie = pd.Series(valores, dtype=object, index=range(5, 5 + len(valores)))
+    resultado = limpa_telefone_lote(logger, serie)
+    assert resultado.index.equals(serie.index)
+    assert resultado.tolist() == [limpar_telefone(logger, v) for v in valores]
+
+
+def test_telefones_dos_leads(logger):
+    # Caminho dos leads: processar_leads aplica a versão vetorizada às duas colunas de telefone
+    valores = _telefones_aleatorios(500, seed=10)
+    leads = pd.DataFrame({"Telefone": valores, "Telefone 2": valores[::-1]})
+    leads = processar_leads(logger, leads)
+    assert leads["Telefone Limpo"].tolist() == [limpar_telefone(logger, v) for v in valores]
+    assert leads["Telefone 2 Limpo"].tolist() == [limpar_telefone(logger, v) for v in valores[::-1]]
+
+
+def test_telefones_do_historico(logger, tmp_path, escreve_relatorio_rs):
+    # Caminho do histórico: telefones como lidos do relatório do R&S (números e textos com máscara)
+    telefones = [v for v in _telefones_aleatorios(300, seed=20)
+                 if isinstance(v, str) and v.strip()] + [
+        34999887766, 3432101234, 553432101234, "(34) 99988-7766", "55 34 3210-1234", 99887766]
+    tratativas = pd.DataFrame({
+        "TELEFONE CONTATO": telefones,
+        "DATA TRATATIVA": [datetime(2025, 1, 1, 8, i % 60) for i in range(len(telefones))],
+        "MOTIVO ": "Contato SEM Sucesso",
+        "FLAG FINALIZADO ": 1,
+        "FLAG ULTIMA TRATATIVA": 1,
+        "FILA": "Ativo",
+    })[COLUNAS_HISTORICO]
+    caminho = escreve_relatorio_rs(str(tmp_path / "historico.xlsx"), tratativas)
+    relatorio = le_tratativas(logger, caminho)
+    brutos = relatorio["TELEFONE CONTATO"]
+    assert len(brutos) == len(set(telefones))
+    assert limpa_telefone_lote(logger, brutos).tolist() == [limpar_telefone(logger, v) for v in brutos]
+
+
+def _mapear_fonte_anterior(valor, fontes):
+    # Classificação anterior à expressão compilada: primeira fonte (na ordem do dicionário) que casar
+    if pd.isna(valor) or valor.strip() == "":
+        return ""
+    valor_limpo = clean_text(valor)
+    for chave, substrings in fontes.items():
+        if any(substring in valor_limpo for substring in substrings):
+            return chave
+    return ""
+
+
+# Fontes sobrepostas: "indeedsite" casa com as três primeiras, "site" com as duas últimas
+FONTES_SOBREPOSTAS = {
+    "INDEED": ["indeed"],
+    "SITE INDEED": ["indeedsite", "siteindeed"],
+    "SITE": ["site", "sitedaempresa"],
+    "VAZIA": [],
+    "EMPRESA": ["empresa", "site"],
+    "ESPECIAL": ["a.b", "(x)", "c+"],
+}
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("Indeed", "INDEED"),
+    ("Site Indeed", "INDEED"),
+    ("Indeed Site", "INDEED"),
+    ("Site da Empresa", "SITE"),
+    ("Empresa", "EMPRESA"),
+    # Substrings com caracteres de regex são literais ("a.b" não casa com "axb") e a pontuação
+    # é removida do valor antes da comparação
+    ("axb", ""),
+    ("a.b", ""),
+    ("(X)", ""),
+    ("Radio", ""),
+    ("", ""),
+    ("   ", ""),
+])
+def test_compila_fontes_mantem_a_prioridade_da_primeira_fonte(valor, esperado):
+    classificar = compila_fontes(FONTES_SOBREPOSTAS)
+    assert _mapear_fonte_anterior(valor, FONTES_SOBREPOSTAS) == esperado
+    if valor.strip():
+        assert classificar(clean_text(valor)) == esperado
+
+
+@pytest.mark.parametrize("fontes", [FONTES_SOBREPOSTAS, config["fontes"]], ids=["sobrepostas", "config"])
+def test_map_fonte_igual_a_classificacao_anterior(logger, fontes):
+    rng = random.Random(1)
+    palavras = [s for substrings in fontes.values() for s in substrings] + ["radio", "panfleto", "xyz"]
+    valores = [" ".join(rng.sample(palavras, rng.randint(1, 3))).title() for _ in range(400)]
+    valores += [None, "", "  ", np.nan]
+    df = map_fonte(logger, pd.DataFrame({"Fonte": valores}), "Fonte", fontes)
+    assert df["Fonte Limpa"].tolist() == [_mapear_fonte_anterior(v, fontes) for v in valores]
+
+
+def test_fontes_nao_mapeadas_em_um_unico_aviso(logger, caplog):
+    valores = ["Indeed", "Panfleto", "Radio", "Panfleto", "Site", "Panfleto", "Radio", None, ""] * 50
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        map_fonte(logger, pd.DataFrame({"Fonte": valores}), "Fonte", FONTES_SOBREPOSTAS)
+    assert [r.getMessage() for r in caplog.records] == [
+        "Fontes não mapeadas (2): 'Panfleto' (150), 'Radio' (100)"]
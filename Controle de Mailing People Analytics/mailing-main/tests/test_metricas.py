@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+import metricas
+from metricas import rss_atual
+
+
+@pytest.fixture
+def sem_psutil(monkeypatch):
+    # None em sys.modules faz o `import psutil` falhar com ImportError
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    metricas._processo_psutil.cache_clear()
+    yield
+    metricas._processo_psutil.cache_clear()
+
+
+def test_rss_atual_sem_psutil_resolve_a_importacao_uma_vez(sem_psutil):
+    if not os.path.exists("/proc/self/statm"):
+        pytest.skip("contadores do /proc indisponíveis")
+    valores = [rss_atual() for _ in range(50)]
+    assert all(isinstance(v, int) and v > 0 for v in valores)
+    info = metricas._processo_psutil.cache_info()
+    assert (info.misses, info.hits) == (1, 49)
+
+
+def test_rss_atual_com_psutil():
+    psutil = pytest.importorskip("psutil")
+    metricas._processo_psutil.cache_clear()
+    assert abs(rss_atual() - psutil.Process().memory_info().rss) < 64 * 2 ** 20
+    assert metricas._processo_psutil(os.getpid()).pid == os.getpid()
+
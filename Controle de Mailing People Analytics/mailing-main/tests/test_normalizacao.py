@@ -0,0 +1,82 @@
+import random
+import re
+import unicodedata
+
+import pytest
+
+from normalizacao import _clean_text, clean_text, estatisticas_cache, normalize_text
+
+
+def _normalize_text_anterior(stylized_text):
+    # Implementação anterior à tabela de tradução (NFKD do texto inteiro)
+    normalized_text = unicodedata.normalize('NFKD', stylized_text)
+    text_without_combining = ''.join(
+        [c for c in normalized_text if not unicodedata.combining(c)])
+    text_alphanumeric_only = ''.join(
+        [c for c in text_without_combining if c.isalnum() or c == ' '])
+    text_unique_spaces = re.sub(r'\s+', ' ', text_alphanumeric_only).strip()
+    if max([len(x) for x in text_unique_spaces.split(' ')]) <= 1:
+        return text_unique_spaces.replace(' ', '')
+    return text_unique_spaces
+
+
+def _clean_text_anterior(text):
+    text = re.sub(r"\s+", "", str(text).lower())
+    return _normalize_text_anterior(text)
+
+
+TEXTOS = [
+    # Acentos e maiúsculas
+    "São Paulo", "UBERLÂNDIA", "Jundiaí - SP", "Ação Conceição Óleo Ü", "ÇÃÕÉÍÚ àèìòù",
+    # Pontuação e espaços
+    "Ensino Médio (completo)!", "e-mail: maria.silva@exemplo.com", "  vários   espaços\t e\nlinhas ",
+    "R$ 1.500,00", "50+_udia", "nº 10", "a b c", "",
+    # Regra das palavras de um caractere
+    "a b c", "J. P. S.", "x", " - ", "a bc", "1 2 3",
+    # Caracteres de compatibilidade e fora do Latin-1
+    "ﬁnal", "ＡＢＣ", "x²", "straße", "Αθήνα",
+    "é", "ẛ̣", "emoji \U0001f600 fim", "① item",
+]
+
+
+@pytest.mark.parametrize("texto", TEXTOS)
+def test_normalize_text_igual_a_implementacao_anterior(texto):
+    assert normalize_text(texto) == _normalize_text_anterior(texto)
+
+
+@pytest.mark.parametrize("texto", TEXTOS + [None, float("nan"), 25, 3.5])
+def test_clean_text_igual_a_implementacao_anterior(texto):
+    assert clean_text(texto) == _clean_text_anterior(texto)
+
+
+@pytest.mark.parametrize("texto", [None, float("nan")])
+def test_normalize_text_sem_texto_falha_como_antes(texto):
+    # Os chamadores tratam valores nulos antes de normalizar (ex.: limpeza.limpa_nome)
+    with pytest.raises((TypeError, AttributeError)):
+        _normalize_text_anterior(texto)
+    with pytest.raises((TypeError, AttributeError)):
+        normalize_text(texto)
+
+
+def test_textos_aleatorios_iguais_a_implementacao_anterior():
+    rng = random.Random(0)
+    alfabeto = [chr(c) for c in range(32, 0x250)] + list("ﬁＡ²①̣́\t\n ")
+    for _ in range(2000):
+        texto = "".join(rng.choices(alfabeto, k=rng.randint(0, 20)))
+        assert normalize_text(texto) == _normalize_text_anterior(texto), repr(texto)
+        assert clean_text(texto) == _clean_text_anterior(texto), repr(texto)
+
+
+def test_estatisticas_cache_contam_acertos_e_falhas():
+    normalize_text.cache_clear()
+    _clean_text.cache_clear()
+    for texto in ["Maria", "José", "Maria", "Maria"]:
+        normalize_text(texto)
+    clean_text("São Paulo")
+    clean_text("São Paulo")
+    estatisticas = estatisticas_cache()
+    # clean_text("São Paulo") também consulta normalize_text("sãopaulo") uma vez
+    assert estatisticas["normalize_text"] == {
+        "hits": 2, "misses": 3, "tamanho": 3, "maximo": normalize_text.cache_info().maxsize}
+    assert {k: estatisticas["clean_text"][k] for k in ("hits", "misses", "tamanho")} == {
+        "hits": 1, "misses": 1, "tamanho": 1}
@@ -0,0 +1,58 @@
+import copy
+import importlib.util
+import logging
+import os
+
+from datetime import datetime
+
+import pytest
+
+from benchmark_pipeline import configura_pastas
+from config import config
+from metricas import Etapas
+from pipeline import executa_completo, executa_em_blocos
+from sinteticos import gera_entradas
+
+
+REFERENCIA = datetime(2026, 10, 18, 9, 30)
+PREFIXO = f"/{REFERENCIA:%Y_%m_%d}_manha_"
+
+
+@pytest.fixture
+def pasta_execucao(tmp_path):
+    # Saídas e caches na pasta temporária; a configuração original é restaurada ao final
+    original = copy.deepcopy(config)
+    configura_pastas(str(tmp_path))
+    config["input_path"] = str(tmp_path / "Input")
+    config["relatorios"]["formato"] = "html"
+    config["relatorios"]["workers"] = 1
+    yield tmp_path
+    config.clear()
+    config.update(original)
+
+
+@pytest.fixture
+def sem_pyarrow(monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec",
+                        lambda nome, *args: None if nome == "pyarrow" else find_spec(nome, *args))
+
+
+@pytest.mark.parametrize("modo", ["completo", "blocos"])
+def test_execucao_sem_pyarrow_nao_grava_o_dataset(logger, pasta_execucao, sem_pyarrow, caplog, modo):
+    sheets = gera_entradas(logger, config["input_path"], 200, seed=3, referencia=REFERENCIA)
+    parametros = dict(usar_cache=False, sheets=sheets, referencia=REFERENCIA, salvar_db=False,
+                      arquivos_por_planilha=1)
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        if modo == "blocos":
+            concluido = executa_em_blocos(logger, Etapas(logger), "manha", PREFIXO, PREFIXO.strip("/_"), 80,
+                                          **parametros)
+        else:
+            concluido = executa_completo(logger, Etapas(logger), "manha", PREFIXO, PREFIXO.strip("/_"),
+                                         **parametros)
+    assert concluido
+    assert "pyarrow não instalado. Dataset Parquet não atualizado." in [r.getMessage() for r in caplog.records]
+    assert not os.path.exists(config["dataset"]["path"])
+    # As demais saídas da execução são gravadas normalmente
+    assert os.path.exists(config["output_path"] + PREFIXO + "Mailing.xlsx")
+    assert os.listdir(config["central_path"])
@@ -0,0 +1,147 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import config
+from descartes import cubo_descartes, fmt_descarte
+from relatorios import (COLUNAS_DESCARTES, gera_relatorios, le_cubo, relatorios_descartes, salva_cubo,
+                        tabela_cidade)
+
+
+CIDADES = ["uberlandia", "jundiai", "aracaju"]
+
+
+@pytest.fixture
+def pasta_relatorios(tmp_path, monkeypatch):
+    monkeypatch.setitem(config, "report_path", str(tmp_path))
+    monkeypatch.setitem(config, "relatorios", dict(config["relatorios"], cache_path=str(tmp_path / "estado.json")))
+    return tmp_path
+
+
+def _leads(linhas, seed=0):
+    rng = np.random.default_rng(seed)
+    leads = pd.DataFrame({
+        "Cidade": rng.choice(np.array(CIDADES + ["recife", None], dtype=object), linhas),
+        "Fonte Limpa": rng.choice(np.array(["INDEED", "SITE", "INDIQUE", "FACEBOOK", None], dtype=object), linhas),
+    })
+    for coluna in COLUNAS_DESCARTES:
+        leads[coluna] = pd.Series(rng.random(linhas) < 0.08, dtype=object).where(rng.random(linhas) < 0.95)
+    return leads
+
+
+def _tabela_anterior(df, cidade):
+    # Matriz de descartes da cidade como era montada antes da tabela agregada (pivot por cidade)
+    df = df.copy()
+    df['Descarte'] = df[COLUNAS_DESCARTES].apply(
+        lambda row: fmt_descarte(row.index[row.eq(True)][0]) if row.eq(True).any() else None, axis=1)
+    sub = df[df['Cidade'] == cidade]
+    qtd = sub.groupby('Fonte Limpa').size().rename('Brutos')
+    qtd_limpo = sub[sub['Descarte'].isna()].groupby('Fonte Limpa').size().rename('Limpos')
+    pivot_df = sub.pivot_table(index='Fonte Limpa', columns='Descarte', aggfunc='size', fill_value=0)
+    res = pivot_df.join(qtd, how='outer').join(qtd_limpo, how='outer').fillna(0).astype(int)
+    m = res[['Brutos'] + [fmt_descarte(desc) for desc in COLUNAS_DESCARTES
+                          if fmt_descarte(desc) in pivot_df.columns] + ['Limpos']]
+    m = m.sort_values(["Brutos", "Limpos"], ascending=False)
+    m.loc['TOTAL'] = m.sum()
+    return m
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_tabela_cidade_igual_ao_pivot_por_cidade(logger, seed):
+    leads = _leads(3000, seed)
+    cubo = cubo_descartes(logger, leads, COLUNAS_DESCARTES)
+    for cidade in CIDADES:
+        pd.testing.assert_frame_equal(tabela_cidade(cubo, cidade), _tabela_anterior(leads, cidade),
+                                      check_names=False)
+    assert tabela_cidade(cubo, "barueri") is None
+
+
+def test_tabela_cidade_ordena_colunas_pela_ordem_do_descarte():
+    # Nomes fora da ordem alfabética: as colunas seguem 'Ordem Descarte'
+    cubo = pd.DataFrame({
+        "Cidade": "uberlandia",
+        "Fonte Limpa": ["SITE", "SITE", "INDEED", "INDEED", "SITE"],
+        "Ordem Descarte": pd.array([3, 1, 2, None, None], dtype="Int64"),
+        "Descarte": ["Idade", "Visto Rec.", "Cidade", None, None],
+        "Leads": [4, 1, 2, 7, 5],
+    })
+    m = tabela_cidade(cubo, "uberlandia")
+    assert list(m.columns) == ["Brutos", "Visto Rec.", "Cidade", "Idade", "Limpos"]
+    assert list(m.index) == ["SITE", "INDEED", "TOTAL"]
+    assert m.loc["TOTAL"].tolist() == [19, 1, 2, 4, 12]
+    assert m.loc["SITE"].tolist() == [10, 1, 0, 4, 5]
+
+
+@pytest.mark.parametrize("formato", ["parquet", "csv"])
+def test_cubo_gravado_e_lido_novamente(logger, pasta_relatorios, formato):
+    if formato == "parquet":
+        pytest.importorskip("pyarrow")
+    leads = _leads(2000, seed=4)
+    cubo = cubo_descartes(logger, leads, COLUNAS_DESCARTES)
+    caminho = salva_cubo(logger, cubo, "/2026_10_18_manha_", formato)
+    assert caminho.endswith("Descartes." + formato)
+    lido = le_cubo("/2026_10_18_manha_")
+    pd.testing.assert_frame_equal(lido, cubo, check_dtype=formato == "parquet")
+    # Os relatórios gerados a partir da tabela lida são os mesmos
+    assert relatorios_descartes(logger, lido, CIDADES, "/p_", "18/10/2026").keys() == \
+        relatorios_descartes(logger, cubo, CIDADES, "/p_", "18/10/2026").keys()
+    for cidade in CIDADES:
+        pd.testing.assert_frame_equal(tabela_cidade(lido, cidade), tabela_cidade(cubo, cidade))
+
+
+def _relatorios(logger, seed=0):
+    cubo = cubo_descartes(logger, _leads(1000, seed), COLUNAS_DESCARTES)
+    return relatorios_descartes(logger, cubo, CIDADES, "/2026_10_18_manha_", "18/10/2026")
+
+
+def test_relatorios_inalterados_nao_sao_gerados_novamente(logger, pasta_relatorios):
+    relatorios = _relatorios(logger)
+    gerados = gera_relatorios(logger, relatorios, "html", workers=1)
+    assert sorted(gerados) == sorted(str(pasta_relatorios) + nome + ".html" for nome in relatorios)
+    assert gera_relatorios(logger, relatorios, "html", workers=1) == []
+
+    # Apenas o relatório com a tabela alterada e o relatório cujo arquivo foi removido são refeitos
+    alterado, removido = list(relatorios)[:2]
+    tabela, legenda = relatorios[alterado]
+    relatorios[alterado] = (tabela + 1, legenda)
+    os.remove(str(pasta_relatorios) + removido + ".html")
+    assert sorted(gera_relatorios(logger, relatorios, "html", workers=1)) == sorted(
+        str(pasta_relatorios) + nome + ".html" for nome in [alterado, removido])
+    # Outro formato é outro arquivo
+    assert len(gera_relatorios(logger, relatorios, "svg", workers=1)) == len(relatorios)
+
+
+@pytest.mark.parametrize("formato", ["html", "svg"])
+def test_conteudo_dos_relatorios(logger, pasta_relatorios, formato):
+    relatorios = _relatorios(logger, seed=1)
+    nome = next(iter(relatorios))
+    tabela, legenda = relatorios[nome]
+    gera_relatorios(logger, {nome: relatorios[nome]}, formato)
+    conteudo = (pasta_relatorios / (nome.lstrip("/") + "." + formato)).read_text(encoding="utf-8")
+    if formato == "html":
+        assert conteudo.startswith("<!DOCTYPE html>")
+        assert legenda in conteudo
+        assert conteudo.count("<tr") == len(tabela) + 1
+        assert '<tr class="total">' in conteudo
+    else:
+        # SVG vetorial, sem imagem rasterizada embutida
+        assert "<svg" in conteudo and "<image" not in conteudo
+
+
+def test_estado_gravado_quando_um_relatorio_falha(logger, pasta_relatorios, monkeypatch):
+    # Geração no pool de processos mesmo em máquinas com um único núcleo
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    relatorios = _relatorios(logger, seed=2)
+    # Um relatório em uma pasta inexistente falha no processo do pool
+    relatorios["/inexistente/relatorio"] = next(iter(relatorios.values()))
+    with pytest.raises(FileNotFoundError):
+        gera_relatorios(logger, relatorios, "html", workers=2)
+    estado = json.loads((pasta_relatorios / "estado.json").read_text(encoding="utf-8"))
+    validos = [str(pasta_relatorios) + nome + ".html" for nome in relatorios if nome != "/inexistente/relatorio"]
+    assert sorted(estado) == sorted(validos)
+    # Na execução seguinte, os relatórios já gerados não são refeitos
+    del relatorios["/inexistente/relatorio"]
+    assert gera_relatorios(logger, relatorios, "html", workers=2) == []
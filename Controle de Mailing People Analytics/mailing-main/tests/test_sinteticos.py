@@ -0,0 +1,63 @@
+import logging
+import os
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from historico import le_tratativas
+from sinteticos import ARQUIVO_HISTORICO, COLUNAS_RELATORIO_RS, gera_entradas
+
+
+REFERENCIA = datetime(2026, 10, 18, 9, 30)
+
+# Leitura original do relatório do R&S (get_history_blocks antes da leitura linha a linha)
+DATAS_RELATORIO = ["DATA", "DATA CADASTRO", "DATA TRATATIVA", "DATA ENCERRAMENTO"]
+
+
+@pytest.fixture(scope="module")
+def entradas(tmp_path_factory):
+    pasta = tmp_path_factory.mktemp("entradas")
+    sheets = gera_entradas(logging.getLogger("testes"), str(pasta), 300, seed=7,
+                           referencia=REFERENCIA, linhas_historico=400)
+    return pasta, sheets
+
+
+def test_relatorio_rs_lido_pela_leitura_original(entradas):
+    pasta, _ = entradas
+    relatorio = pd.read_excel(pasta / ARQUIVO_HISTORICO, sheet_name="Tratativas", skiprows=6,
+                              parse_dates=DATAS_RELATORIO)
+    assert list(relatorio.columns) == COLUNAS_RELATORIO_RS
+    assert len(relatorio) == 400
+    for coluna in DATAS_RELATORIO:
+        assert pd.api.types.is_datetime64_any_dtype(relatorio[coluna]), coluna
+
+
+def test_datas_do_relatorio_rs_coerentes(entradas):
+    pasta, _ = entradas
+    relatorio = pd.read_excel(pasta / ARQUIVO_HISTORICO, sheet_name="Tratativas", skiprows=6,
+                              parse_dates=DATAS_RELATORIO)
+    assert (relatorio["DATA CADASTRO"] <= relatorio["DATA TRATATIVA"]).all()
+    assert (relatorio["DATA"] == relatorio["DATA CADASTRO"].dt.normalize()).all()
+    # Apenas os casos finalizados têm data de encerramento, nunca posterior à execução
+    finalizado = relatorio["FLAG FINALIZADO "] == 1
+    assert (relatorio["DATA ENCERRAMENTO"].notna() == finalizado).all()
+    encerrados = relatorio[finalizado]
+    assert (encerrados["DATA ENCERRAMENTO"] >= encerrados["DATA TRATATIVA"]).all()
+    assert (encerrados["DATA ENCERRAMENTO"] <= REFERENCIA).all()
+
+
+def test_relatorio_rs_lido_por_le_tratativas(logger, entradas):
+    pasta, _ = entradas
+    tratativas = le_tratativas(logger, str(pasta / ARQUIVO_HISTORICO))
+    assert 0 < len(tratativas) <= 400
+    # Apenas a última tratativa (FLAG ULTIMA TRATATIVA = 1) de filas diferentes de Receptivo
+    assert (tratativas["FILA"] != "Receptivo").all()
+
+
+def test_entradas_geradas_existem(entradas):
+    pasta, sheets = entradas
+    assert sheets
+    for info in sheets.values():
+        assert os.path.exists(pasta / info["path"]), info["path"]
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from descartes import get_seen_blocks
+from vistos import FiltroBloom, abre_vistos, carrega_filtro, consulta_vistos, registra_vistos, versao_vistos
+
+
+REFERENCIA = datetime(2026, 10, 18, 9, 0)
+
+
+@pytest.fixture(params=[True, False], ids=["com_filtro", "sem_filtro"])
+def parametros(request, tmp_path):
+    return {"path": str(tmp_path / "vistos.sqlite"), "dias": 30, "filtro_bloom": request.param,
+            "bits_bloom": 2 ** 20, "hashes_bloom": 7}
+
+
+def _leads(cpfs, telefones, fonte="INDEED"):
+    return pd.DataFrame({"CPF Limpo": cpfs, "Telefone Limpo": telefones, "Fonte Limpa": fonte})
+
+
+def _vistos(logger, leads, execucao, dias, parametros):
+    referencia = REFERENCIA + timedelta(days=dias)
+    return get_seen_blocks(logger, leads.copy(), execucao, referencia, parametros)[
+        "Descarte Visto Recentemente"].tolist()
+
+
+def test_primeira_execucao_nao_marca_leads(logger, parametros):
+    # CPF e telefone repetidos dentro da própria execução não são "vistos recentemente"
+    leads = _leads(["11144477735", "11144477735", None, ""], ["34999990000", None, "34999990000", ""])
+    assert _vistos(logger, leads, "2026_10_18_manha", 0, parametros) == [False] * 4
+
+
+def test_chave_vista_marcada_dentro_da_janela_e_liberada_depois(logger, parametros):
+    _vistos(logger, _leads(["11144477735", "39053344705"], ["34999990000", "34988880000"]),
+            "2026_10_18_manha", 0, parametros)
+    # 30 dias depois (limite da janela) o CPF e o telefone ainda contam
+    seguinte = _leads(["11144477735", "52998224725", "71428793860"], ["11988887777", "34999990000", None])
+    assert _vistos(logger, seguinte, "2026_11_17_manha", 30, parametros) == [True, True, False]
+    # 31 dias depois, não
+    assert _vistos(logger, _leads(["39053344705", "00000000191"], ["11911112222", "34988880000"]),
+                   "2026_11_18_manha", 31, parametros) == [False, False]
+
+
+def test_reexecucao_nao_marca_as_proprias_chaves(logger, parametros):
+    leads = _leads(["11144477735", "52998224725"], ["34999990000", "11988887777"])
+    _vistos(logger, leads.iloc[:1], "2026_10_17_manha", -1, parametros)
+    _vistos(logger, leads, "2026_10_18_manha", 0, parametros)
+    # Reexecução do mesmo turno: apenas o lead visto na execução anterior é marcado
+    assert _vistos(logger, leads, "2026_10_18_manha", 0, parametros) == [True, False]
+
+
+def test_filtro_bloom_sem_falsos_negativos():
+    rng = np.random.default_rng(0)
+    filtro = FiltroBloom(bits=2 ** 20, hashes=7)
+    chaves = rng.integers(10**10, 10**11, 50_000)
+    filtro.adiciona("cpf", chaves[:40_000])
+    assert filtro.contem("cpf", chaves[:40_000]).all()
+    # Com ~38 bits por chave, poucos falsos positivos entre as chaves não adicionadas
+    assert filtro.contem("cpf", chaves[40_000:]).mean() < 0.01
+    # Cada tipo de chave tem as suas posições
+    assert filtro.contem("telefone", chaves[:10_000]).mean() < 0.01
+
+
+def test_filtro_bloom_gravado_e_carregado(tmp_path):
+    filtro = FiltroBloom(bits=2 ** 16, hashes=5)
+    chaves = np.arange(1000, 2000, dtype=np.int64)
+    filtro.adiciona("telefone", chaves)
+    caminho = str(tmp_path / "vistos.bloom.npz")
+    filtro.salva(caminho, "v1")
+    carregado = FiltroBloom.carrega(caminho, 2 ** 16, 5, "v1")
+    np.testing.assert_array_equal(carregado.vetor, filtro.vetor)
+    assert carregado.contem("telefone", chaves).all()
+    # Outros parâmetros ou outra versão da base invalidam o filtro gravado
+    assert FiltroBloom.carrega(caminho, 2 ** 17, 5, "v1") is None
+    assert FiltroBloom.carrega(caminho, 2 ** 16, 5, "v2") is None
+    assert FiltroBloom.carrega(str(tmp_path / "outro.npz"), 2 ** 16, 5, "v1") is None
+
+
+def test_filtro_reconstruido_a_partir_da_base(logger, tmp_path):
+    conexao = abre_vistos(str(tmp_path / "vistos.sqlite"))
+    chaves = pd.Series([f"{c}" for c in range(10**10, 10**10 + 500)] + ["ABC123"])
+    registra_vistos(conexao, "cpf", chaves, pd.Series("SITE", index=chaves.index), "2026-10-18", "manha")
+    conexao.commit()
+    caminho = str(tmp_path / "vistos.bloom.npz")
+    # Sem o arquivo, o filtro é reconstruído com todas as chaves e gravado com a versão da base
+    filtro = carrega_filtro(logger, conexao, caminho, 2 ** 16, 5)
+    assert FiltroBloom.carrega(caminho, 2 ** 16, 5, versao_vistos(conexao)) is not None
+    # Nenhuma chave registrada deixa de ser encontrada (chaves não numéricas vão direto ao SQLite)
+    assert consulta_vistos(conexao, "cpf", chaves, "tarde", "2026-10-01", filtro) == set(chaves)
+    conexao.close()